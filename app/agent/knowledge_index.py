@@ -2,9 +2,15 @@
 from __future__ import annotations
 import os
 import json
-from typing import List, Iterable, Dict, Optional
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Iterable, Dict, Optional, Sequence, Tuple
 from contextlib import closing
 
+import numpy as np
+
 from .openai_client import embed_texts
 
 from config.connection_standard import open_connection, run_select
@@ -17,17 +23,25 @@ CREATE TABLE IF NOT EXISTS agent.knowledge_docs (
   title TEXT,
   meta TEXT,             -- JSON (ex: {"language":"py","period":"2024-09"})
   content TEXT,
-  embedding TEXT,        -- JSON list of floats
+  embedding TEXT,        -- (legacy) JSON list of floats, converti en embedding_f32
   mtime DOUBLE PRECISION,
   UNIQUE(path, title, kind)
 );
+ALTER TABLE agent.knowledge_docs ADD COLUMN IF NOT EXISTS embedding_f32 BYTEA;  -- float32 little-endian
+ALTER TABLE agent.knowledge_docs ADD COLUMN IF NOT EXISTS content_hash TEXT;  -- sha256 du contenu indexé
 CREATE INDEX IF NOT EXISTS idx_docs_kind ON agent.knowledge_docs(kind);
+CREATE INDEX IF NOT EXISTS idx_docs_path ON agent.knowledge_docs(path);
 """
 
+_schema_ready = False
+
 
 # --------- utils ---------
 def _ensure_schema():
-    """Crée le schéma PostgreSQL si nécessaire."""
+    """Crée le schéma PostgreSQL si nécessaire (une fois par processus)."""
+    global _schema_ready
+    if _schema_ready:
+        return
     with closing(open_connection(autocommit=False)) as conn:
         try:
             with conn.cursor() as cur:
@@ -37,11 +51,17 @@ def _ensure_schema():
                     if s:
                         cur.execute(s)
             conn.commit()
+            _schema_ready = True
         except Exception:
             conn.rollback()
             raise
 
 
+def _to_f32(vec) -> bytes:
+    """Vecteur -> bytea float32 little-endian."""
+    return np.asarray(vec, dtype="<f4").tobytes()
+
+
 def _read_file(path: str) -> str:
     with open(path, "r", encoding="utf-8", errors="ignore") as f:
         return f.read()
@@ -73,18 +93,21 @@ def _kind_for(path: str) -> str:
     return "doc"
 
 
-def upsert_path(
-    path: str,
-    title: Optional[str] = None,
-    kind: Optional[str] = None,
-    meta: Optional[Dict] = None,
-) -> int:
-    """Ingestion d'un fichier (code/doc/csv). Retourne nb de chunks indexés."""
-    _ensure_schema()
-    if not os.path.exists(path) or not os.path.isfile(path):
-        return 0
+# Budget d'un appel embed_texts (tokens estimés ~ caractères / 4, et nb d'entrées)
+EMBED_TOKEN_BUDGET = 50_000
+EMBED_MAX_INPUTS = 2048
+READ_WORKERS = 8
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _prepare_file(
+    path: str, title: Optional[str], kind: Optional[str], meta: Optional[Dict]
+) -> Dict:
+    """Lecture + extrait CSV + hash + découpage d'un fichier (thread de lecture)."""
     k = kind or _kind_for(path)
-    mtime = os.path.getmtime(path)
     content = _read_file(path)
 
     # CSV: on ne garde qu’un extrait (en-têtes + 30 premières lignes) pour l’index
@@ -94,41 +117,143 @@ def upsert_path(
         content = "\n".join(head)
 
     chunks = _chunk(content)
-    if not chunks:
-        return 0
+    base_title = title or os.path.basename(path)
+    titles = [
+        f"{base_title} [part {i}/{len(chunks)}]" if len(chunks) > 1 else base_title
+        for i in range(1, len(chunks) + 1)
+    ]
+    return {
+        "path": path,
+        "kind": k,
+        "meta": json.dumps(meta or {}),
+        "mtime": os.path.getmtime(path),
+        "hash": hashlib.sha256(content.encode("utf-8")).hexdigest(),
+        "chunks": chunks,
+        "titles": titles,
+        "embeddings": None,
+    }
+
+
+def _stored_state(paths: List[str]) -> Dict[str, Tuple[float, Optional[str]]]:
+    """path -> (mtime, content_hash) déjà indexés."""
+    if not paths:
+        return {}
+    rows = run_select(
+        "SELECT path, MAX(mtime), MAX(content_hash) FROM agent.knowledge_docs "
+        "WHERE path = ANY(%(paths)s) GROUP BY path",
+        {"paths": paths},
+    )
+    return {path: (mtime, content_hash) for path, mtime, content_hash in rows}
+
+
+def _embed_batched(docs: List[Dict], token_budget: int) -> List[Dict]:
+    """
+    Embeddings de tous les chunks, par lots de token_budget tokens estimés.
+    Retourne les documents dont un lot a échoué (non écrits).
+    """
+    batches: List[List[Tuple[Dict, int]]] = []
+    batch: List[Tuple[Dict, int]] = []
+    tokens = 0
+    for d in docs:
+        d["embeddings"] = [None] * len(d["chunks"])
+        for i, ch in enumerate(d["chunks"]):
+            t = _estimate_tokens(ch)
+            if batch and (tokens + t > token_budget or len(batch) >= EMBED_MAX_INPUTS):
+                batches.append(batch)
+                batch, tokens = [], 0
+            batch.append((d, i))
+            tokens += t
+    if batch:
+        batches.append(batch)
+
+    failed: Dict[int, Dict] = {}
+    for batch in batches:
+        try:
+            vecs = embed_texts([d["chunks"][i] for d, i in batch])
+            for (d, i), vec in zip(batch, vecs):
+                d["embeddings"][i] = _to_f32(vec)
+        except Exception:
+            for d, _ in batch:
+                failed[id(d)] = d
+    return list(failed.values())
 
-    # embeddings
-    embs = embed_texts(chunks)  # List[List[float]]
 
+def _write_docs(docs: List[Dict], touched: Dict[str, float]) -> int:
+    """
+    Écrit tous les chunks en une transaction: COPY vers une table temporaire,
+    suppression des anciennes parties des fichiers réindexés, puis upsert.
+    touched: path -> mtime des fichiers inchangés (hash identique).
+    """
     with closing(open_connection(autocommit=False)) as conn:
         try:
             cnt = 0
             with conn.cursor() as cur:
-                for i, (ch, vec) in enumerate(zip(chunks, embs), 1):
-                    row_title = title or os.path.basename(path)
-                    if len(chunks) > 1:
-                        row_title = f"{row_title} [part {i}/{len(chunks)}]"
+                if docs:
+                    cur.execute(
+                        """
+                        CREATE TEMP TABLE tmp_knowledge_docs (
+                            path TEXT, kind TEXT, title TEXT, meta TEXT,
+                            content TEXT, embedding_f32 BYTEA,
+                            mtime DOUBLE PRECISION, content_hash TEXT
+                        ) ON COMMIT DROP
+                        """
+                    )
+                    with cur.copy(
+                        "COPY tmp_knowledge_docs (path, kind, title, meta, content,"
+                        " embedding_f32, mtime, content_hash) FROM STDIN"
+                    ) as copy:
+                        for d in docs:
+                            for row_title, ch, blob in zip(
+                                d["titles"], d["chunks"], d["embeddings"]
+                            ):
+                                copy.write_row(
+                                    (
+                                        d["path"],
+                                        d["kind"],
+                                        row_title,
+                                        d["meta"],
+                                        ch,
+                                        blob,
+                                        d["mtime"],
+                                        d["hash"],
+                                    )
+                                )
+                                cnt += 1
+                    cur.execute(
+                        """
+                        DELETE FROM agent.knowledge_docs k
+                        USING (SELECT DISTINCT path, kind FROM tmp_knowledge_docs) f
+                        WHERE k.path = f.path AND k.kind = f.kind
+                          AND NOT EXISTS (
+                              SELECT 1 FROM tmp_knowledge_docs t
+                              WHERE t.path = k.path AND t.kind = k.kind
+                                AND t.title = k.title
+                          )
+                        """
+                    )
                     cur.execute(
                         """
-                            INSERT INTO agent.knowledge_docs(path, kind, title, meta, content, embedding, mtime) 
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (path, title, kind) DO UPDATE SET
-                                content = EXCLUDED.content,
-                                embedding = EXCLUDED.embedding,
-                                meta = EXCLUDED.meta,
-                                mtime = EXCLUDED.mtime
+                        INSERT INTO agent.knowledge_docs(path, kind, title, meta, content, embedding_f32, mtime, content_hash)
+                        SELECT path, kind, title, meta, content, embedding_f32, mtime, content_hash
+                        FROM tmp_knowledge_docs
+                        ON CONFLICT (path, title, kind) DO UPDATE SET
+                            content = EXCLUDED.content,
+                            embedding = NULL,
+                            embedding_f32 = EXCLUDED.embedding_f32,
+                            meta = EXCLUDED.meta,
+                            mtime = EXCLUDED.mtime,
+                            content_hash = EXCLUDED.content_hash
+                        """
+                    )
+                if touched:
+                    cur.execute(
+                        """
+                        UPDATE agent.knowledge_docs k SET mtime = u.mtime
+                        FROM unnest(%s::text[], %s::float8[]) AS u(path, mtime)
+                        WHERE k.path = u.path
                         """,
-                        (
-                            path,
-                            k,
-                            row_title,
-                            json.dumps(meta or {}),
-                            ch,
-                            json.dumps(vec),
-                            mtime,
-                        ),
+                        (list(touched), list(touched.values())),
                     )
-                    cnt += 1
             conn.commit()
             return cnt
         except Exception:
@@ -136,6 +261,85 @@ def upsert_path(
             raise
 
 
+def _mtime(path: str) -> Optional[float]:
+    """mtime du fichier, None s'il a été supprimé (ou est illisible)."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _ingest(
+    files: Sequence[Tuple[str, Optional[str], Optional[str], Optional[Dict]]],
+    token_budget: int = EMBED_TOKEN_BUDGET,
+    workers: int = READ_WORKERS,
+) -> Dict:
+    """
+    Ingestion incrémentale d'une liste de (path, title, kind, meta).
+
+    - mtime identique à l'index → ignoré sans lecture
+    - fichier disparu depuis le parcours → compté en échec
+    - lecture en parallèle; hash identique → seul le mtime est mis à jour
+    - embeddings par lots (token_budget), une seule écriture pour le lot
+    """
+    _ensure_schema()
+    start = time.perf_counter()
+    stored = _stored_state([f[0] for f in files])
+
+    to_read, failed = [], 0
+    for f in files:
+        mtime = _mtime(f[0])
+        if mtime is None:
+            failed += 1
+        elif f[0] not in stored or stored[f[0]][0] != mtime:
+            to_read.append(f)
+    skipped = len(files) - len(to_read) - failed
+
+    docs, touched = [], {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_prepare_file, *f) for f in to_read]
+        for fut in futures:
+            try:
+                doc = fut.result()
+            except Exception:
+                failed += 1
+                continue
+            if stored.get(doc["path"], (None, None))[1] == doc["hash"]:
+                touched[doc["path"]] = doc["mtime"]
+            elif doc["chunks"]:
+                docs.append(doc)
+            else:
+                skipped += 1
+    skipped += len(touched)
+
+    failed_docs = _embed_batched(docs, token_budget)
+    failed += len(failed_docs)
+    failed_ids = {id(d) for d in failed_docs}
+    docs = [d for d in docs if id(d) not in failed_ids]
+
+    chunks = _write_docs(docs, touched) if docs or touched else 0
+    return {
+        "files_seen": len(files),
+        "files_skipped": skipped,
+        "files_embedded": len(docs),
+        "files_failed": failed,
+        "chunks": chunks,
+        "elapsed_s": round(time.perf_counter() - start, 3),
+    }
+
+
+def upsert_path(
+    path: str,
+    title: Optional[str] = None,
+    kind: Optional[str] = None,
+    meta: Optional[Dict] = None,
+) -> int:
+    """Ingestion d'un fichier (code/doc/csv). Retourne nb de chunks indexés."""
+    if not os.path.exists(path) or not os.path.isfile(path):
+        return 0
+    return _ingest([(path, title, kind, meta)], workers=1)["chunks"]
+
+
 def upsert_dir(
     root: str,
     include: Iterable[str] = ("ui", "logic", "agent"),
@@ -150,13 +354,19 @@ def upsert_dir(
         ".sql",
         ".csv",
     ),
-) -> int:
-    """Ingestion récursive des sous-dossiers importants du projet."""
-    _ensure_schema()
+    token_budget: int = EMBED_TOKEN_BUDGET,
+    workers: int = READ_WORKERS,
+) -> Dict:
+    """
+    Ingestion récursive (incrémentale) des sous-dossiers importants du projet.
+
+    Retourne {files_seen, files_skipped, files_embedded, files_failed,
+    chunks, elapsed_s}.
+    """
     root = os.path.abspath(root)
     wanted_dirs = {d.lower() for d in include}
     wanted_exts = {e.lower() for e in exts}
-    total = 0
+    files = []
     for dirpath, dirnames, filenames in os.walk(root):
         # ne garder que les dossiers ciblés (si include fourni)
         if not any(
@@ -166,47 +376,126 @@ def upsert_dir(
             continue
         for fn in filenames:
             if os.path.splitext(fn)[1].lower() in wanted_exts:
-                fpath = os.path.join(dirpath, fn)
-                try:
-                    total += upsert_path(fpath)
-                except Exception:
-                    pass
-    return total
+                files.append((os.path.join(dirpath, fn), None, None, None))
+    return _ingest(files, token_budget=token_budget, workers=workers)
 
 
 # --------- recherche ---------
-def _cosine(a: List[float], b: List[float]) -> float:
-    import math
+class _EmbeddingMatrix:
+    """
+    Matrice NumPy (float32) des embeddings normalisés, gardée en mémoire.
+
+    Rechargée seulement quand la signature de la table (nb de lignes,
+    somme et max des mtime) change; le contenu des passages n'est lu que
+    pour les top-k retenus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple] = None
+        # dimension -> (ids, matrice normalisée n x dim)
+        self._by_dim: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
 
-    num = sum(x * y for x, y in zip(a, b))
-    da = math.sqrt(sum(x * x for x in a)) or 1.0
-    db = math.sqrt(sum(y * y for y in b)) or 1.0
-    return num / (da * db)
+    def get(self, dim: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        signature = tuple(
+            run_select(
+                "SELECT COUNT(*), COALESCE(SUM(mtime), 0), COALESCE(MAX(mtime), 0) "
+                "FROM agent.knowledge_docs"
+            )[0]
+        )
+        with self._lock:
+            if signature != self._signature:
+                self._by_dim = self._load()
+                self._signature = signature
+            return self._by_dim.get(dim)
+
+    @staticmethod
+    def _load() -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        _convert_legacy_embeddings()
+        rows = run_select(
+            "SELECT id, embedding_f32 FROM agent.knowledge_docs "
+            "WHERE embedding_f32 IS NOT NULL ORDER BY id"
+        )
+        groups: Dict[int, Tuple[List[int], List[np.ndarray]]] = {}
+        for doc_id, blob in rows:
+            vec = np.frombuffer(blob, dtype="<f4")
+            ids, vecs = groups.setdefault(vec.shape[0], ([], []))
+            ids.append(doc_id)
+            vecs.append(vec)
+
+        by_dim = {}
+        for dim, (ids, vecs) in groups.items():
+            matrix = np.vstack(vecs)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            by_dim[dim] = (np.asarray(ids), matrix / norms)
+        return by_dim
+
+
+_matrix = _EmbeddingMatrix()
+
+
+def _convert_legacy_embeddings():
+    """Convertit une fois les embeddings JSON (TEXT) en float32 (BYTEA)."""
+    rows = run_select(
+        "SELECT id, embedding FROM agent.knowledge_docs "
+        "WHERE embedding_f32 IS NULL AND embedding IS NOT NULL"
+    )
+    if not rows:
+        return
+    with closing(open_connection(autocommit=False)) as conn:
+        try:
+            with conn.cursor() as cur:
+                for doc_id, emb_json in rows:
+                    try:
+                        blob = _to_f32(json.loads(emb_json))
+                    except Exception:
+                        continue
+                    cur.execute(
+                        "UPDATE agent.knowledge_docs "
+                        "SET embedding_f32 = %s, embedding = NULL WHERE id = %s",
+                        (blob, doc_id),
+                    )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
 
 
 def search(query: str, top_k: int = 8) -> List[Dict]:
     """Retourne les meilleurs passages : [{title, path, kind, content, score}]"""
     _ensure_schema()
-    q_vec = embed_texts([query])[0]
+    q_vec = np.asarray(embed_texts([query])[0], dtype=np.float32)
+    loaded = _matrix.get(q_vec.shape[0])
+    if loaded is None:
+        return []
+    ids, matrix = loaded
+
+    # cosinus = produit matrice-vecteur (lignes déjà normalisées)
+    scores = matrix @ (q_vec / (np.linalg.norm(q_vec) or 1.0))
+    k = min(max(1, top_k), scores.shape[0])
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+
     rows = run_select(
-        "SELECT path, kind, title, content, embedding FROM agent.knowledge_docs"
+        "SELECT id, path, kind, title, content FROM agent.knowledge_docs "
+        "WHERE id = ANY(%(ids)s)",
+        {"ids": [int(i) for i in ids[top]]},
     )
-
-    scored = []
-    for path, kind, title, content, emb_json in rows:
-        try:
-            vec = json.loads(emb_json)
-            score = _cosine(q_vec, vec)
-            scored.append(
-                {
-                    "path": path,
-                    "kind": kind,
-                    "title": title,
-                    "content": content,
-                    "score": score,
-                }
-            )
-        except Exception:
+    by_id = {r[0]: r for r in rows}
+    results = []
+    for pos in top:
+        row = by_id.get(int(ids[pos]))
+        if row is None:
             continue
-    scored.sort(key=lambda r: r["score"], reverse=True)
-    return scored[: max(1, top_k)]
+        _, path, kind, title, content = row
+        results.append(
+            {
+                "path": path,
+                "kind": kind,
+                "title": title,
+                "content": content,
+                "score": float(scores[pos]),
+            }
+        )
+    return results
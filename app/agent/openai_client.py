@@ -30,3 +30,10 @@ def ask_text(prompt: str, model: str = "gpt-4o-mini") -> str:
         input=prompt,
     )
     return getattr(r, "output_text", "").strip() or str(r)
+
+
+def embed_texts(texts, model: str = "text-embedding-3-small") -> list:
+    """Embeddings d'une liste de textes (un vecteur de floats par texte)."""
+    client = get_client()
+    r = client.embeddings.create(model=model, input=list(texts))
+    return [d.embedding for d in r.data]
@@ -1,10 +1,19 @@
 # agent/payroll_agent.py — agent métier (Q&A + calculs)
-from app.logic.metrics import summary
-from logic.audit import run_basic_audit
+import threading
+from typing import Optional
+
+from app.logic.metrics import summary_sql
+from config.connection_standard import run_select
+from logic.audit import audit_findings_sql
 from .openai_client import ask_text
 
 MASK = "E-{idx:04d}"
 
+# Contexte mis en cache par version des données (dernier lot d'import):
+# les questions posées entre deux imports réutilisent le même contexte
+_context_lock = threading.Lock()
+_context_cache: dict[str, Optional[str]] = {"version": None, "context": None}
+
 
 def _anonymize_keys(keys):
     # transforme des identifiants/nom en pseudo-ID stables
@@ -14,9 +23,37 @@ def _anonymize_keys(keys):
     return mapping
 
 
+def _data_version() -> str:
+    """Version des données: dernier lot d'import + nombre de lots (suppressions)."""
+    row = run_select(
+        """
+        SELECT
+            (SELECT batch_id::text FROM payroll.import_batches
+             ORDER BY created_at DESC LIMIT 1),
+            (SELECT COUNT(*) FROM payroll.import_batches)
+        """
+    )
+    last_batch, batches = row[0] if row else (None, 0)
+    return f"{last_batch}:{batches}"
+
+
+def _get_context() -> str:
+    """Contexte de la version courante des données (recalculé après import)."""
+    version = _data_version()
+    with _context_lock:
+        cached = _context_cache["context"]
+        if cached is not None and _context_cache["version"] == version:
+            return cached
+        context = _build_context()
+        _context_cache.update(version=version, context=context)
+        return context
+
+
 def _build_context():
-    s = summary()
-    aud = run_basic_audit()
+    s = summary_sql()
+    if not s.get("rows"):
+        return "Aucune donnée de paie importée."
+    aud = {"findings": audit_findings_sql()}
 
     # anonymisation légère pour le contexte envoyé au LLM
     emp_keys = [k for k, _ in s.get("top_employees", [])]
@@ -50,7 +87,7 @@ def _build_context():
 
 
 def answer(question: str, model: str = "gpt-5-mini") -> str:
-    base = _build_context()
+    base = _get_context()
     prompt = f"""Contexte (données réelles résumées):
 {base}
 
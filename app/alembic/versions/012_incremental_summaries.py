@@ -0,0 +1,297 @@
+"""Replace payroll materialized views with incrementally maintained summary tables
+
+Revision ID: 012
+Revises: 011
+Create Date: 2025-11-03 10:00:00.000000
+
+Les trois vues matérialisées étaient rafraîchies entièrement après chaque
+import. Elles deviennent des vues simples sur des tables de synthèse tenues
+à jour par services/summary_tables.py pour les seules dates de paie importées:
+- payroll.summary_monthly_payroll    -> payroll.v_monthly_payroll_summary
+- payroll.summary_employee_last_pay  -> payroll.v_employee_current_salary
+- payroll.summary_employee_annual    -> payroll.v_employee_annual_history
+
+Les colonnes des vues sont inchangées. Les synthèses stockent les montants en
+centimes et les clés seulement: matricule/nom/prenom/statut viennent de
+core.employees à la lecture.
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "012"
+down_revision = "011"  # ajuste si nécessaire
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create summary tables, populate them and swap the views."""
+
+    # ========================
+    # 1. TABLES DE SYNTHÈSE
+    # ========================
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS payroll.summary_monthly_payroll (
+            pay_year INTEGER NOT NULL,
+            pay_month INTEGER NOT NULL,
+            employee_id UUID NOT NULL,
+            total_employee_cents BIGINT NOT NULL,
+            total_employer_cents BIGINT NOT NULL,
+            transaction_count BIGINT NOT NULL,
+            PRIMARY KEY (pay_year, pay_month, employee_id)
+        );
+    """
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS payroll.summary_employee_last_pay (
+            employee_id UUID PRIMARY KEY,
+            last_pay_date DATE NOT NULL,
+            last_net_cents BIGINT NOT NULL
+        );
+    """
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS payroll.summary_employee_annual (
+            year INTEGER NOT NULL,
+            employee_id UUID NOT NULL,
+            total_employee_cents BIGINT NOT NULL,
+            total_employer_cents BIGINT NOT NULL,
+            pay_periods_count BIGINT NOT NULL,
+            PRIMARY KEY (year, employee_id)
+        );
+    """
+    )
+
+    op.create_index(
+        "idx_summary_monthly_employee",
+        "summary_monthly_payroll",
+        ["employee_id"],
+        schema="payroll",
+    )
+    op.create_index(
+        "idx_summary_last_pay_date",
+        "summary_employee_last_pay",
+        ["last_pay_date"],
+        schema="payroll",
+    )
+    op.create_index(
+        "idx_summary_annual_employee",
+        "summary_employee_annual",
+        ["employee_id"],
+        schema="payroll",
+    )
+
+    # ========================
+    # 2. REMPLISSAGE INITIAL
+    # ========================
+    op.execute(
+        """
+        INSERT INTO payroll.summary_monthly_payroll
+        SELECT
+            pp.pay_year,
+            pp.pay_month,
+            pt.employee_id,
+            SUM(pt.amount_employee_norm_cents),
+            SUM(pt.amount_employer_norm_cents),
+            COUNT(*)
+        FROM payroll.payroll_transactions pt
+        JOIN payroll.pay_periods pp ON pt.period_id = pp.period_id
+        GROUP BY pp.pay_year, pp.pay_month, pt.employee_id;
+    """
+    )
+    op.execute(
+        """
+        INSERT INTO payroll.summary_employee_last_pay
+        SELECT DISTINCT ON (employee_id)
+            employee_id,
+            pay_date,
+            SUM(amount_employee_norm_cents)
+        FROM payroll.payroll_transactions
+        GROUP BY employee_id, pay_date
+        ORDER BY employee_id, pay_date DESC;
+    """
+    )
+    op.execute(
+        """
+        INSERT INTO payroll.summary_employee_annual
+        SELECT
+            EXTRACT(YEAR FROM pay_date)::INTEGER,
+            employee_id,
+            SUM(amount_employee_norm_cents),
+            SUM(amount_employer_norm_cents),
+            COUNT(DISTINCT pay_date)
+        FROM payroll.payroll_transactions
+        GROUP BY EXTRACT(YEAR FROM pay_date)::INTEGER, employee_id;
+    """
+    )
+
+    # ========================
+    # 3. VUES (mêmes colonnes que les vues matérialisées)
+    # ========================
+    op.execute(
+        "DROP MATERIALIZED VIEW IF EXISTS payroll.v_monthly_payroll_summary CASCADE;"
+    )
+    op.execute(
+        "DROP MATERIALIZED VIEW IF EXISTS payroll.v_employee_current_salary CASCADE;"
+    )
+    op.execute(
+        "DROP MATERIALIZED VIEW IF EXISTS payroll.v_employee_annual_history CASCADE;"
+    )
+
+    op.execute(
+        """
+        CREATE VIEW payroll.v_monthly_payroll_summary AS
+        SELECT
+            s.pay_year,
+            s.pay_month,
+            e.employee_id,
+            e.matricule,
+            e.nom,
+            e.prenom,
+            s.total_employee_cents / 100.0 AS total_employee_amount,
+            s.total_employer_cents / 100.0 AS total_employer_amount,
+            (s.total_employee_cents + s.total_employer_cents) / 100.0 AS total_combined_amount,
+            s.transaction_count
+        FROM payroll.summary_monthly_payroll s
+        JOIN core.employees e ON s.employee_id = e.employee_id;
+    """
+    )
+    op.execute(
+        """
+        CREATE VIEW payroll.v_employee_current_salary AS
+        SELECT
+            e.employee_id,
+            e.matricule,
+            e.nom,
+            e.prenom,
+            e.statut,
+            lp.last_pay_date,
+            lp.last_net_cents / 100.0 AS last_net_salary
+        FROM core.employees e
+        LEFT JOIN payroll.summary_employee_last_pay lp ON e.employee_id = lp.employee_id
+        WHERE e.statut = 'actif';
+    """
+    )
+    op.execute(
+        """
+        CREATE VIEW payroll.v_employee_annual_history AS
+        SELECT
+            s.year,
+            e.employee_id,
+            e.matricule,
+            e.nom,
+            e.prenom,
+            s.total_employee_cents / 100.0 AS annual_employee_total,
+            s.total_employer_cents / 100.0 AS annual_employer_total,
+            (s.total_employee_cents + s.total_employer_cents) / 100.0 AS annual_combined_total,
+            s.pay_periods_count
+        FROM payroll.summary_employee_annual s
+        JOIN core.employees e ON s.employee_id = e.employee_id;
+    """
+    )
+
+
+def downgrade() -> None:
+    """Restore the materialized views and drop the summary tables."""
+
+    op.execute("DROP VIEW IF EXISTS payroll.v_monthly_payroll_summary;")
+    op.execute("DROP VIEW IF EXISTS payroll.v_employee_current_salary;")
+    op.execute("DROP VIEW IF EXISTS payroll.v_employee_annual_history;")
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW payroll.v_monthly_payroll_summary AS
+        SELECT
+            pp.pay_year,
+            pp.pay_month,
+            e.employee_id,
+            e.matricule,
+            e.nom,
+            e.prenom,
+            SUM(pt.amount_employee_norm_cents) / 100.0 AS total_employee_amount,
+            SUM(pt.amount_employer_norm_cents) / 100.0 AS total_employer_amount,
+            SUM(pt.amount_employee_norm_cents + pt.amount_employer_norm_cents) / 100.0 AS total_combined_amount,
+            COUNT(*) AS transaction_count
+        FROM payroll.payroll_transactions pt
+        JOIN core.employees e ON pt.employee_id = e.employee_id
+        JOIN payroll.pay_periods pp ON pt.period_id = pp.period_id
+        GROUP BY pp.pay_year, pp.pay_month, e.employee_id, e.matricule, e.nom, e.prenom
+        WITH DATA;
+    """
+    )
+    op.create_index(
+        "idx_v_monthly_summary_pk",
+        "v_monthly_payroll_summary",
+        ["pay_year", "pay_month", "employee_id"],
+        unique=True,
+        schema="payroll",
+    )
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW payroll.v_employee_current_salary AS
+        WITH latest_pay AS (
+            SELECT DISTINCT ON (employee_id)
+                employee_id,
+                pay_date,
+                SUM(amount_employee_norm_cents) / 100.0 AS last_net_salary
+            FROM payroll.payroll_transactions
+            GROUP BY employee_id, pay_date
+            ORDER BY employee_id, pay_date DESC
+        )
+        SELECT
+            e.employee_id,
+            e.matricule,
+            e.nom,
+            e.prenom,
+            e.statut,
+            lp.pay_date AS last_pay_date,
+            lp.last_net_salary
+        FROM core.employees e
+        LEFT JOIN latest_pay lp ON e.employee_id = lp.employee_id
+        WHERE e.statut = 'actif'
+        WITH DATA;
+    """
+    )
+    op.create_index(
+        "idx_v_current_salary_pk",
+        "v_employee_current_salary",
+        ["employee_id"],
+        unique=True,
+        schema="payroll",
+    )
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW payroll.v_employee_annual_history AS
+        SELECT
+            EXTRACT(YEAR FROM pt.pay_date)::INTEGER AS year,
+            e.employee_id,
+            e.matricule,
+            e.nom,
+            e.prenom,
+            SUM(pt.amount_employee_norm_cents) / 100.0 AS annual_employee_total,
+            SUM(pt.amount_employer_norm_cents) / 100.0 AS annual_employer_total,
+            SUM(pt.amount_employee_norm_cents + pt.amount_employer_norm_cents) / 100.0 AS annual_combined_total,
+            COUNT(DISTINCT pt.pay_date) AS pay_periods_count
+        FROM payroll.payroll_transactions pt
+        JOIN core.employees e ON pt.employee_id = e.employee_id
+        GROUP BY EXTRACT(YEAR FROM pt.pay_date), e.employee_id, e.matricule, e.nom, e.prenom
+        WITH DATA;
+    """
+    )
+    op.create_index(
+        "idx_v_annual_hist_pk",
+        "v_employee_annual_history",
+        ["year", "employee_id"],
+        unique=True,
+        schema="payroll",
+    )
+
+    op.execute("DROP TABLE IF EXISTS payroll.summary_monthly_payroll;")
+    op.execute("DROP TABLE IF EXISTS payroll.summary_employee_last_pay;")
+    op.execute("DROP TABLE IF EXISTS payroll.summary_employee_annual;")
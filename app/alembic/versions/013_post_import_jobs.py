@@ -0,0 +1,62 @@
+"""Create post_import_jobs queue table (KPI recalc + summaries after import)
+
+Revision ID: 013
+Revises: 012
+Create Date: 2025-11-04 09:00:00.000000
+
+File de travaux post-import consommée par services/post_import_queue.py:
+un seul job 'pending' par date de paie (index unique partiel), réclamé par
+le worker via FOR UPDATE SKIP LOCKED.
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "013"
+down_revision = "012"  # ajuste si nécessaire
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create payroll.post_import_jobs."""
+
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS payroll.post_import_jobs (
+            job_id BIGSERIAL PRIMARY KEY,
+            pay_date DATE NOT NULL,
+            batch_id UUID,
+            rows_count INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'pending'
+                CHECK (status IN ('pending', 'running', 'done', 'error')),
+            attempts INTEGER NOT NULL DEFAULT 0,
+            result JSONB,
+            error_message TEXT,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMPTZ,
+            finished_at TIMESTAMPTZ
+        );
+    """
+    )
+
+    # Déduplication: un seul job en attente par date de paie
+    op.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_post_import_jobs_pending
+        ON payroll.post_import_jobs (pay_date)
+        WHERE status = 'pending';
+    """
+    )
+    op.create_index(
+        "idx_post_import_jobs_status_created",
+        "post_import_jobs",
+        ["status", "created_at"],
+        schema="payroll",
+    )
+
+
+def downgrade() -> None:
+    """Drop payroll.post_import_jobs."""
+
+    op.execute("DROP TABLE IF EXISTS payroll.post_import_jobs;")
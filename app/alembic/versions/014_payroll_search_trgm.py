@@ -0,0 +1,78 @@
+"""Normalized search columns + trigram/prefix indexes on imported_payroll_master
+
+Revision ID: 014
+Revises: 013
+Create Date: 2025-11-06 09:00:00.000000
+
+Chemin de recherche de AppBridge.search_payroll (services/payroll_search.py):
+colonnes générées normalisées (unaccent + lower, collation "C") sur
+payroll.imported_payroll_master, avec pour chacune:
+- un index GIN gin_trgm_ops (recherche par sous-chaîne, LIKE '%x%')
+- un index btree (recherche par préfixe, bornes >= / <)
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "014"
+down_revision = "013"  # ajuste si nécessaire
+branch_labels = None
+depends_on = None
+
+# colonne normalisée -> expression source
+SEARCH_COLUMNS = {
+    "matricule_norm": "lower(btrim(COALESCE(matricule, '')))",
+    "employe_norm": "lower(core.immutable_unaccent(btrim(COALESCE(employe, ''))))",
+    "code_paie_norm": "lower(btrim(COALESCE(code_paie, '')))",
+}
+
+
+def upgrade() -> None:
+    """Add normalized search columns and their indexes."""
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent;")
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+
+    # Wrapper IMMUTABLE (déjà créé par 001; requis pour une colonne générée)
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION core.immutable_unaccent(text)
+        RETURNS text AS $$
+        BEGIN
+            RETURN unaccent($1);
+        END;
+        $$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE;
+    """
+    )
+
+    for column, expression in SEARCH_COLUMNS.items():
+        op.execute(
+            f"""
+            ALTER TABLE payroll.imported_payroll_master
+            ADD COLUMN IF NOT EXISTS {column} TEXT COLLATE "C"
+            GENERATED ALWAYS AS ({expression}) STORED;
+        """
+        )
+        op.execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS idx_ipm_{column}_trgm
+            ON payroll.imported_payroll_master USING GIN ({column} gin_trgm_ops);
+        """
+        )
+        op.execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS idx_ipm_{column}_prefix
+            ON payroll.imported_payroll_master ({column});
+        """
+        )
+
+    op.execute("ANALYZE payroll.imported_payroll_master;")
+
+
+def downgrade() -> None:
+    """Drop normalized search columns (their indexes are dropped with them)."""
+
+    for column in SEARCH_COLUMNS:
+        op.execute(
+            f"ALTER TABLE payroll.imported_payroll_master DROP COLUMN IF EXISTS {column};"
+        )
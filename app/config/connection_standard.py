@@ -16,9 +16,11 @@ Auteur: Système standardisé
 Date: 2025-11-11
 """
 
+import atexit
 import os
 import sys
 import logging
+import threading
 from typing import Optional, Dict, Any
 from pathlib import Path
 
@@ -256,42 +258,61 @@ def mask_dsn(dsn: str) -> str:
 # ============================================================================
 
 _connection_pool = None
+_connection_pool_lock = threading.Lock()
+_atexit_registered = False
 
 
 def get_connection_pool():
     """
-    Retourne le pool de connexions global (singleton).
+    Retourne le pool de connexions global (singleton, thread-safe).
+
+    Toutes les lectures ponctuelles (metrics, reports, data_provider, ...)
+    passent par ce pool au lieu d'ouvrir un DataRepository éphémère. Le pool
+    est recréé s'il a été fermé et fermé automatiquement à la sortie du
+    processus (ou explicitement via close_connection_pool()).
 
     Returns:
         DataRepository avec pool de connexions configuré
     """
-    global _connection_pool
+    global _connection_pool, _atexit_registered
 
-    if _connection_pool is None:
-        from app.services.data_repo import DataRepository
+    pool = _connection_pool
+    if pool is not None and not pool.closed:
+        return pool
 
-        dsn = get_dsn()
-        _connection_pool = DataRepository(
-            connection_string=dsn, min_size=DEFAULT_POOL_MIN, max_size=DEFAULT_POOL_MAX
-        )
+    with _connection_pool_lock:
+        if _connection_pool is None or _connection_pool.closed:
+            from app.services.data_repo import DataRepository
 
-        logger.info(f"Pool de connexions initialisé: {mask_dsn(dsn)}")
+            dsn = get_dsn()
+            _connection_pool = DataRepository(
+                connection_string=dsn,
+                min_size=DEFAULT_POOL_MIN,
+                max_size=DEFAULT_POOL_MAX,
+            )
+
+            if not _atexit_registered:
+                atexit.register(close_connection_pool)
+                _atexit_registered = True
 
-    return _connection_pool
+            logger.info(f"Pool de connexions initialisé: {mask_dsn(dsn)}")
+
+        return _connection_pool
 
 
 def close_connection_pool():
     """Ferme le pool de connexions global."""
     global _connection_pool
 
-    if _connection_pool is not None:
-        try:
-            _connection_pool.close()
-            logger.info("Pool de connexions fermé")
-        except Exception as e:
-            logger.warning(f"Erreur fermeture pool: {e}")
-        finally:
-            _connection_pool = None
+    with _connection_pool_lock:
+        if _connection_pool is not None:
+            try:
+                _connection_pool.close()
+                logger.info("Pool de connexions fermé")
+            except Exception as e:
+                logger.warning(f"Erreur fermeture pool: {e}")
+            finally:
+                _connection_pool = None
 
 
 # ============================================================================
@@ -8,20 +8,35 @@ from pathlib import Path
 from typing import Dict, Any
 
 
+# Registre YAML déjà chargé: (mtime_ns, registre)
+_registry_cache: tuple = (None, None)
+
+
 def load_registry() -> Dict[str, Any]:
     """
     Charge la configuration du registre de schéma depuis le fichier YAML
 
+    Le registre est relu seulement si le fichier a changé: les appels
+    suivants renvoient le même dict (à ne pas modifier), ce qui permet à
+    detect_types de réutiliser ses regex compilées.
+
     Returns:
         Dict: Configuration du registre avec types et paramètres UI
     """
+    global _registry_cache
+
     try:
         # Chemin vers le fichier de configuration
         registry_path = Path(__file__).parent / "schema_registry.yaml"
 
         if registry_path.exists():
+            mtime = registry_path.stat().st_mtime_ns
+            if _registry_cache[0] == mtime:
+                return _registry_cache[1]
             with open(registry_path, "r", encoding="utf-8") as f:
-                return yaml.safe_load(f)
+                registry = yaml.safe_load(f)
+            _registry_cache = (mtime, registry)
+            return registry
         else:
             # Configuration par défaut si le fichier n'existe pas
             return get_default_registry()
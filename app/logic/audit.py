@@ -69,6 +69,68 @@ def run_basic_audit(period=None):
         }
 
 
+def audit_findings_sql(pay_date=None):
+    """
+    Constats d'audit (mêmes règles que run_basic_audit) par agrégats SQL,
+    sans charger les lignes: [{rule, count, detail}].
+
+    Args:
+        pay_date: Date de paie YYYY-MM-DD (None = toutes les dates)
+    """
+    where = "WHERE date_paie = %(pay_date)s::date" if pay_date else ""
+    params = {"pay_date": str(pay_date)[:10] if pay_date else None}
+    params["codes"] = CODES_SENSIBLES
+
+    row = run_select(
+        f"""
+        WITH lignes AS (
+            SELECT matricule, employe, btrim(code_paie) AS code_paie, montant
+            FROM payroll.imported_payroll_master
+            {where}
+        )
+        SELECT
+            (SELECT COUNT(*) FROM (
+                SELECT 1 FROM lignes
+                GROUP BY matricule
+                HAVING COALESCE(SUM(montant), 0) < -0.01
+            ) n),
+            (SELECT COUNT(DISTINCT employe) FROM lignes
+             WHERE employe = upper(employe) AND employe <> lower(employe)),
+            (SELECT COUNT(DISTINCT code_paie) FROM lignes
+             WHERE code_paie = ANY(%(codes)s))
+        """,
+        params,
+    )
+    nets_negatifs, majuscules, codes_sensibles = row[0] if row else (0, 0, 0)
+
+    findings = []
+    if nets_negatifs:
+        findings.append(
+            {
+                "rule": "nets_negatifs",
+                "count": int(nets_negatifs),
+                "detail": "Nets négatifs par employé",
+            }
+        )
+    if majuscules:
+        findings.append(
+            {
+                "rule": "noms_majuscules",
+                "count": int(majuscules),
+                "detail": "Noms en MAJUSCULES",
+            }
+        )
+    if codes_sensibles:
+        findings.append(
+            {
+                "rule": "codes_sensibles",
+                "count": int(codes_sensibles),
+                "detail": f"Codes sensibles : {', '.join(CODES_SENSIBLES)}",
+            }
+        )
+    return findings
+
+
 def compare_periods(p1, p2):
     try:
         df1 = _load_period_data(p1)
@@ -8,9 +8,7 @@ from pathlib import Path
 
 import pandas as pd
 
-# Import DataRepository pour PostgreSQL
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from app.services.data_repo import DataRepository
 
 # PostgreSQL: table source
 SCHEMA = "payroll"
@@ -103,23 +101,19 @@ def _is_all_upper(s: str) -> bool:
 # === Chargement/Canonisation ==================================================
 def _load_df() -> pd.DataFrame:
     """Charge les données depuis PostgreSQL."""
-    # Utiliser config_manager pour DSN centralisé
-    from config.config_manager import get_dsn
+    # Pool partagé du processus (config.connection_standard)
+    from config.connection_standard import get_connection_pool
 
-    dsn = get_dsn()
-    repo = DataRepository(dsn, min_size=1, max_size=2)
-    try:
-        rows = repo.run_query(f"SELECT * FROM {SCHEMA}.{TABLE}", fetch_all=True)
+    repo = get_connection_pool()
+    rows = repo.run_query(f"SELECT * FROM {SCHEMA}.{TABLE}", fetch_all=True)
 
-        # Récupérer les noms de colonnes
-        with repo.get_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(f"SELECT * FROM {SCHEMA}.{TABLE} LIMIT 0")
-                columns = [desc[0] for desc in cur.description]
+    # Récupérer les noms de colonnes
+    with repo.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT * FROM {SCHEMA}.{TABLE} LIMIT 0")
+            columns = [desc[0] for desc in cur.description]
 
-        df = pd.DataFrame(rows, columns=columns)
-    finally:
-        repo.close()
+    df = pd.DataFrame(rows, columns=columns)
 
     if df.empty:
         return df
@@ -179,6 +173,86 @@ def summary() -> dict:
     }
 
 
+# Mnt/Cmb (TEXT) -> numérique, comme _to_number (espaces/NBSP retirés, virgule
+# décimale, valeur invalide = 0); une ligne à 0 est une ligne méta (_IsMetaRow)
+_MNTCMB_CLEAN_SQL = (
+    r"regexp_replace(replace(mnt_cmb::text, ',', '.'), '[[:space:]\u00a0]', '', 'g')"
+)
+_MNTCMB_NUM_SQL = f"""
+CASE WHEN {_MNTCMB_CLEAN_SQL} ~ '^[-+]?[0-9]*[.]?[0-9]+$'
+     THEN {_MNTCMB_CLEAN_SQL}::numeric
+     ELSE 0
+END"""
+
+
+def summary_sql(top_n: int = 10, periods: int = 6) -> dict:
+    """
+    Résumé calculé en un seul parcours SQL (GROUPING SETS), sans charger la
+    table dans pandas.
+
+    Mêmes clés que summary(), plus latest_periods (dernières dates de paie),
+    by_period [(AAAAMM, net)], by_category et top_employees [(matricule, net)].
+    """
+    from config.connection_standard import get_connection_pool
+
+    repo = get_connection_pool()
+    rows = repo.run_query(
+        f"""
+        SELECT
+            GROUPING(date_paie) AS g_date,
+            GROUPING(categorie) AS g_cat,
+            GROUPING(matricule) AS g_emp,
+            date_paie,
+            categorie,
+            matricule,
+            COUNT(*) AS nb,
+            COALESCE(SUM(montant), 0) AS montant,
+            COALESCE(SUM(montant) FILTER (WHERE {_MNTCMB_NUM_SQL} <> 0), 0) AS net
+        FROM (
+            SELECT
+                date_paie,
+                COALESCE(btrim(categorie_paie), '') AS categorie,
+                btrim(matricule) AS matricule,
+                montant,
+                mnt_cmb
+            FROM {SCHEMA}.{TABLE}
+        ) t
+        GROUP BY GROUPING SETS ((), (date_paie), (categorie), (matricule))
+        """
+    )
+
+    total = next((r for r in rows if r[0] and r[1] and r[2]), None)
+    if not total or not total[6]:
+        return {"rows": 0}
+
+    par_date = sorted(
+        ((r[3], float(r[8])) for r in rows if not r[0] and r[3] is not None),
+        key=lambda x: x[0],
+    )
+    par_mois: dict[str, float] = {}
+    for d, net in par_date:
+        par_mois[d.strftime("%Y%m")] = par_mois.get(d.strftime("%Y%m"), 0.0) + net
+    categories = [(r[4], float(r[8])) for r in rows if not r[1]]
+    employes = [(r[5], float(r[7]), float(r[8])) for r in rows if not r[2]]
+
+    return {
+        "rows": int(total[6]),
+        "employees": len(employes),
+        "net_total": float(total[8]),
+        "neg_pct": sum(1 for _, m, _ in employes if m < -0.01) * 100.0 / len(employes),
+        "latest_periods": [d.strftime("%Y-%m-%d") for d, _ in par_date[-periods:]][
+            ::-1
+        ],
+        "by_period": sorted(par_mois.items()),
+        "by_category": sorted(categories, key=lambda x: x[1], reverse=True)[:top_n],
+        "top_employees": [
+            (k, net)
+            for k, _, net in sorted(employes, key=lambda x: x[2], reverse=True)[:top_n]
+            if k is not None
+        ],
+    }
+
+
 def get_latest_pay_date() -> str | None:
     """
     Retourne la dernière date de paie disponible dans la DB (format YYYY-MM-DD).
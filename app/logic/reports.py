@@ -10,9 +10,7 @@ from PyQt6.QtCore import QSizeF
 from logic.formatting import _normalize_period, _parse_number_safe
 from logic.audit import run_basic_audit, compare_periods
 
-# Import DataRepository pour PostgreSQL
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from app.services.data_repo import DataRepository
 
 
 def df_resume_mois(period):
@@ -150,11 +148,10 @@ def df_rep_poste_budgetaire(period):
 
 def df_evolution_12p(period):
     try:
-        # PostgreSQL: charger toutes les données
-        from config.config_manager import get_dsn
+        # PostgreSQL: charger toutes les données (pool partagé du processus)
+        from config.connection_standard import get_connection_pool
 
-        dsn = get_dsn()
-        repo = DataRepository(dsn, min_size=1, max_size=2)
+        repo = get_connection_pool()
         rows = repo.run_query(
             "SELECT * FROM payroll.imported_payroll_master", fetch_all=True
         )
@@ -164,7 +161,6 @@ def df_evolution_12p(period):
             with conn.cursor() as cur:
                 cur.execute("SELECT * FROM payroll.imported_payroll_master LIMIT 0")
                 columns = [desc[0] for desc in cur.description]
-        repo.close()
 
         df = pd.DataFrame(rows, columns=columns)
 
@@ -427,10 +423,10 @@ def _export_pdf_generic(df, filepath, title, subtitle):
 def _load_period_data(period):
     """Charge les données de période depuis PostgreSQL."""
     try:
-        from config.config_manager import get_dsn
+        from config.connection_standard import get_connection_pool
 
-        dsn = get_dsn()
-        repo = DataRepository(dsn, min_size=1, max_size=2)
+        # Pool partagé du processus
+        repo = get_connection_pool()
 
         if period:
             period_str = (
@@ -452,7 +448,6 @@ def _load_period_data(period):
             with conn.cursor() as cur:
                 cur.execute("SELECT * FROM payroll.imported_payroll_master LIMIT 0")
                 columns = [desc[0] for desc in cur.description]
-        repo.close()
 
         return pd.DataFrame(rows, columns=columns)
     except Exception as e:
@@ -4,7 +4,7 @@ import hashlib
 import json
 import os
 import sys
-import tempfile
+import threading
 import unicodedata
 from datetime import date, datetime
 from decimal import Decimal
@@ -20,8 +20,10 @@ load_dotenv()
 from PyQt6.QtCore import (  # noqa: E402
     QCoreApplication,
     QObject,
+    QRunnable,
     Qt,
     QThread,
+    QThreadPool,
     QUrl,
     pyqtSignal,
     pyqtSlot,
@@ -37,7 +39,24 @@ from PyQt6.QtWidgets import QApplication, QMainWindow  # noqa: E402
 
 # Import provider PostgreSQL
 try:
+    from providers.pagination import (
+        KeysetKey,
+        count_rows,
+        decode_cursor,
+        default_count_mode,
+        keyset_condition,
+        normalize_count_mode,
+        order_by_sql,
+        split_page,
+    )
     from providers.postgres_provider import PostgresProvider
+
+    # Clés keyset de search_payroll (ORDER BY date_paie DESC, matricule, id)
+    SEARCH_KEYS = (
+        KeysetKey("date_paie", "date", descending=True),
+        KeysetKey("COALESCE(matricule, '')", "text"),
+        KeysetKey("id", "bigint"),
+    )
 except ModuleNotFoundError:
     PostgresProvider = None
     print(
@@ -255,11 +274,83 @@ def parse_excel_date_robust(date_value, row_idx):
     return None, f"Type non géré: {type(date_value).__name__} = {date_value}"
 
 
+# Slots exécutables via AppBridge.call_async (lectures lourdes + import)
+ASYNC_BRIDGE_METHODS = frozenset(
+    {
+        "get_kpis",
+        "get_kpi",
+        "get_kpi_details",
+        "get_dashboard_charts",
+        "get_table",
+        "getEmployees",
+        "get_employees",
+        "list_employees",
+        "get_masse_series",
+        "get_chart_data",
+        "get_db_stats",
+        "get_imported_files",
+        "get_periods",
+        "get_periods_list",
+        "search_payroll",
+        "get_period_report",
+        "get_employee_detail",
+        "preview_import",
+        "confirm_import",
+        "preview_import_file",
+        "confirm_import_file",
+        "export",
+        "ask_ai",
+    }
+)
+
+# Écritures parmi ASYNC_BRIDGE_METHODS: jamais remplacées ni annulées par
+# call_async, exécutées une à la fois (pool dédié à un seul thread)
+WRITE_BRIDGE_METHODS = frozenset({"confirm_import", "confirm_import_file"})
+
+
+class BridgeTask(QRunnable):
+    """Exécute un slot AppBridge dans le QThreadPool et livre le résultat par signal"""
+
+    def __init__(self, bridge, request_id, method_name, args):
+        super().__init__()
+        self.bridge = bridge
+        self.request_id = request_id
+        self.method_name = method_name
+        self.args = args
+
+    def run(self):
+        if not self.bridge._async_begin(self.request_id):
+            self.bridge.asyncResult.emit(
+                self.request_id, self.method_name, "cancelled", ""
+            )
+            return
+
+        status = "done"
+        try:
+            payload = getattr(self.bridge, self.method_name)(*self.args)
+        except Exception as e:
+            print(f"❌ Erreur {self.method_name} (async): {e}")
+            status = "error"
+            payload = json.dumps({"success": False, "message": str(e)})
+
+        # Requête remplacée pendant l'exécution: résultat écarté
+        if not self.bridge._async_end(self.request_id):
+            status, payload = "cancelled", ""
+        self.bridge.asyncResult.emit(self.request_id, self.method_name, status, payload)
+
+
 class AppBridge(QObject):
     """Pont Python ↔ JavaScript pour communiquer avec l'UI Tabler - Source de vérité PostgreSQL"""
 
     # Signal de progression pour l'import
     importProgress = pyqtSignal(int, str, dict)  # (percent, message, metrics)
+    # Fin des travaux post-import (KPI + synthèses), émis sur le thread GUI
+    importFinished = pyqtSignal(str, str, int)  # (pay_date, batch_id, rows_count)
+    # Relais interne: callback du worker post-import -> thread GUI (file Qt)
+    _postImportDone = pyqtSignal(str, str, int)
+    # Résultat d'un appel call_async: (request_id, method, status, payload_json)
+    # status: done | error | cancelled
+    asyncResult = pyqtSignal(str, str, str, str)
 
     def __init__(self, main_window):
         super().__init__()
@@ -268,6 +359,18 @@ class AppBridge(QObject):
         self.current_importer = None  # Référence à l'importeur en cours pour annulation
         self.active_period: Optional[dict] = None
 
+        # Appels asynchrones: pool borné + dernière requête par canal
+        self.async_pool = QThreadPool()
+        self.async_pool.setMaxThreadCount(int(os.getenv("PAYROLL_BRIDGE_WORKERS", "4")))
+        self._async_lock = threading.Lock()
+        self._async_seq = 0
+        self._async_latest: dict[str, str] = {}  # canal -> request_id courant
+        self._async_channels: dict[str, str] = {}  # request_id -> canal
+        self._async_cancelled: set[str] = set()
+        # Écritures (imports): sérialisées, hors canaux de remplacement
+        self.write_pool = QThreadPool()
+        self.write_pool.setMaxThreadCount(1)
+
         # Utiliser PostgresProvider comme source de vérité unique
         try:
             self.provider = PostgresProvider()
@@ -280,6 +383,36 @@ class AppBridge(QObject):
         print("✅ Provider PostgreSQL actif - accès direct aux données réelles")
         self._refresh_active_period()
 
+        # File des travaux post-import (KPI + synthèses) hors chemin critique.
+        # Le callback de fin arrive sur le thread worker: connexion en file
+        # pour que cache, période active et importFinished restent côté GUI
+        self._postImportDone.connect(
+            self._deliver_import_finished, Qt.ConnectionType.QueuedConnection
+        )
+        from services.kpi_snapshot_service import KPISnapshotService
+        from services.post_import_queue import PostImportQueue
+
+        self.post_import_queue = PostImportQueue(
+            self.provider.repo, KPISnapshotService(self.provider.repo)
+        )
+        self.post_import_queue.start()
+
+        # Recherche indexée (trigrammes / préfixes, migration 014)
+        from services.payroll_search import PayrollSearch
+
+        self.payroll_search = PayrollSearch(self.provider.repo)
+
+        # Feuilles parsées à l'aperçu, réutilisées par confirm_import
+        # (répertoire de session privé, Parquet; vidé après chaque import)
+        from services.parsed_file_cache import ParsedFileCache
+
+        self.parsed_cache = ParsedFileCache()
+
+        # Fichiers d'import reçus par blocs (begin_upload / upload_chunk)
+        from services.upload_store import UploadStore
+
+        self.upload_store = UploadStore()
+
     @pyqtSlot()
     def cancelImport(self):
         """Annule l'import en cours."""
@@ -287,6 +420,127 @@ class AppBridge(QObject):
             self.current_importer.cancel()
             print("⚠️ Annulation de l'import demandée")
 
+    # ========== APPELS ASYNCHRONES ==========
+
+    @pyqtSlot(str, str, str, result=str)
+    def call_async(self, method, args_json="[]", channel=""):
+        """
+        Lance un slot dans le pool de threads et retourne immédiatement.
+
+        Le résultat arrive par le signal asyncResult(request_id, method,
+        status, payload). Lectures: une nouvelle requête sur le même canal
+        (défaut: nom du slot) annule la précédente: non démarrée, elle n'est
+        pas exécutée; en cours, son résultat est écarté (status 'cancelled').
+
+        Écritures (WRITE_BRIDGE_METHODS, imports): ni canal ni annulation;
+        exécutées une à la fois dans l'ordre d'arrivée (write_pool), chacune
+        livre son résultat. L'annulation d'un import passe par cancelImport.
+
+        Args:
+            method: Nom du slot (voir ASYNC_BRIDGE_METHODS)
+            args_json: Arguments positionnels en liste JSON
+            channel: Clé de remplacement (ex: 'dashboard-kpis'); ignorée
+                pour les écritures
+
+        Returns:
+            JSON avec success, request_id et superseded (requête annulée)
+        """
+        if method not in ASYNC_BRIDGE_METHODS:
+            return json.dumps(
+                {"success": False, "message": f"Méthode non autorisée: {method}"}
+            )
+
+        try:
+            args = json.loads(args_json or "[]")
+            if not isinstance(args, list):
+                raise ValueError("args_json doit être une liste JSON")
+        except ValueError as e:
+            return json.dumps({"success": False, "message": str(e)})
+
+        if method in WRITE_BRIDGE_METHODS:
+            with self._async_lock:
+                self._async_seq += 1
+                request_id = f"req-{self._async_seq}"
+            self.write_pool.start(BridgeTask(self, request_id, method, args))
+            return json.dumps(
+                {"success": True, "request_id": request_id, "superseded": None}
+            )
+
+        channel = channel or method
+        with self._async_lock:
+            self._async_seq += 1
+            request_id = f"req-{self._async_seq}"
+            superseded = self._async_latest.get(channel)
+            if superseded:
+                self._async_cancelled.add(superseded)
+            self._async_latest[channel] = request_id
+            self._async_channels[request_id] = channel
+
+        self.async_pool.start(BridgeTask(self, request_id, method, args))
+        return json.dumps(
+            {"success": True, "request_id": request_id, "superseded": superseded}
+        )
+
+    @pyqtSlot(str, result=str)
+    def cancel_request(self, request_id):
+        """Annule une lecture call_async (écartée si déjà démarrée), pas une écriture."""
+        with self._async_lock:
+            known = request_id in self._async_channels
+            if known:
+                self._async_cancelled.add(request_id)
+        return json.dumps({"success": known, "request_id": request_id})
+
+    def _async_begin(self, request_id) -> bool:
+        """Appelé par BridgeTask avant exécution: False si annulée."""
+        with self._async_lock:
+            if request_id in self._async_cancelled:
+                self._forget_request(request_id)
+                return False
+            return True
+
+    def _async_end(self, request_id) -> bool:
+        """Appelé par BridgeTask après exécution: False si annulée entre-temps."""
+        with self._async_lock:
+            delivered = request_id not in self._async_cancelled
+            self._forget_request(request_id)
+            return delivered
+
+    def _forget_request(self, request_id):
+        channel = self._async_channels.pop(request_id, None)
+        if channel and self._async_latest.get(channel) == request_id:
+            del self._async_latest[channel]
+        self._async_cancelled.discard(request_id)
+
+    @pyqtSlot(str, result=str)
+    def get_post_import_status(self, job_id):
+        """
+        État des travaux post-import (KPI + synthèses) pour le polling de l'UI
+
+        Args:
+            job_id: Identifiant retourné par confirm_import
+
+        Returns:
+            JSON avec success et job (status: pending/running/done/error)
+        """
+        try:
+            job = self.post_import_queue.get_status(job_id=int(job_id))
+            if not job:
+                return json.dumps({"success": False, "message": "Job introuvable"})
+            return json.dumps({"success": True, "job": job})
+        except Exception as e:
+            print(f"❌ Erreur get_post_import_status: {e}")
+            return json.dumps({"success": False, "message": str(e)})
+
+    def _on_import_finished(self, pay_date, batch_id, rows_count):
+        """Callback de la file post-import (thread worker): relayé au thread GUI"""
+        self._postImportDone.emit(str(pay_date), batch_id or "", int(rows_count or 0))
+
+    def _deliver_import_finished(self, pay_date, batch_id, rows_count):
+        """Thread GUI: invalide le cache puis notifie l'UI (importFinished)"""
+        self.provider.cache.invalidate(pay_date)
+        self._refresh_active_period()
+        self.importFinished.emit(pay_date, batch_id, rows_count)
+
     @pyqtSlot(result=str)
     def ping(self):
         """Test connexion WebChannel"""
@@ -933,6 +1187,9 @@ class AppBridge(QObject):
             result = self.provider.repo.run_query(sql_size, {})
             stats["db_size_mb"] = round(result[0][0], 2) if result else 0
 
+            # Cache des lectures du provider (hits/misses)
+            stats["read_cache"] = self.provider.cache.stats()
+
             return json.dumps(stats)
 
         except Exception as e:
@@ -1354,6 +1611,9 @@ class AppBridge(QObject):
 
             print(f"✅ Suppression TOTALE terminée: {pay_date}")
 
+            # Synthèses maintenues par date de paie: retirer la date supprimée
+            self._refresh_summaries([pay_date])
+            self.provider.cache.invalidate(pay_date)
             active_period = self._refresh_active_period()
             return json.dumps(
                 {
@@ -1417,6 +1677,8 @@ class AppBridge(QObject):
             print(f"  ✅ {count_employees_deleted} employés orphelins supprimés")
 
             print("✅ Base de données vidée avec succès")
+            self._refresh_summaries()
+            self.provider.cache.invalidate()
 
             return json.dumps(
                 {
@@ -1433,9 +1695,41 @@ class AppBridge(QObject):
             traceback.print_exc()
             return json.dumps({"success": False, "error": str(e)})
 
+    def _refresh_summaries(self, pay_dates=None):
+        """
+        Remet les tables de synthèse en accord après une suppression.
+
+        Args:
+            pay_dates: Dates de paie supprimées (None: reconstruction complète)
+        """
+        from services.summary_tables import SummaryTablesService
+
+        try:
+            service = SummaryTablesService(self.provider.repo)
+            if pay_dates is None:
+                timings = service.rebuild_all()
+            else:
+                timings = service.refresh_for_pay_dates(pay_dates)
+            if len(timings) < 3:
+                print(
+                    f"⚠️ Synthèses partiellement à jour ({len(timings)}/3), "
+                    "utiliser refresh_materialized_views"
+                )
+        except Exception as e:
+            print(f"⚠️ Erreur mise à jour des synthèses: {e}")
+
     @pyqtSlot(str, result=str)
     def search_payroll(self, filters_json):
-        """Recherche sécurisée dans les données de paie avec paramètres"""
+        """Recherche sécurisée dans les données de paie avec paramètres
+
+        Pagination: "cursor" présent dans les filtres (null = 1re page) →
+        keyset sur (date_paie DESC, matricule, id), sinon limit/offset.
+        "count": "exact" | "estimate" | "none" (total calculé seulement si demandé).
+        Filtres texte via PayrollSearch: préfixe pour les termes courts ou
+        terminés par '*', sous-chaîne (trigrammes) sinon; accents ignorés.
+        Un terme de moins de 3 caractères ne correspond qu'au début de la
+        valeur ("12" → matricules commençant par 12, et non les contenant).
+        """
         if not self.provider or not self.provider.repo:
             return json.dumps({"error": "DB non disponible", "rows": [], "total": 0})
 
@@ -1450,69 +1744,78 @@ class AppBridge(QObject):
             limit = int(filters.get("limit", 100))
             offset = int(filters.get("offset", 0))
 
-            # Construire WHERE clause dynamiquement
-            where_conditions = []
-            if matricule:
-                where_conditions.append("matricule ILIKE '%%' || %(matricule)s || '%%'")
-            if employe:
-                where_conditions.append("employe ILIKE '%%' || %(employe)s || '%%'")
-            if code:
-                where_conditions.append("code_paie ILIKE '%%' || %(code)s || '%%'")
+            keyset = "cursor" in filters
+            cursor_values = decode_cursor(filters.get("cursor"))
+            count_mode = normalize_count_mode(
+                filters.get("count"), default_count_mode(keyset, cursor_values)
+            )
+
+            # Filtres texte: colonnes normalisées indexées (préfixe/sous-chaîne)
+            where_conditions, params = self.payroll_search.build_conditions(
+                {"matricule": matricule, "employe": employe, "code": code}
+            )
             if date_paie:
                 where_conditions.append("date_paie = %(date)s::date")
+                params["date"] = date_paie
 
-            where_clause = (
+            from_where = "FROM payroll.v_imported_payroll " + (
                 "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
             )
+            keyset_sql, keyset_params = keyset_condition(
+                SEARCH_KEYS, cursor_values if keyset else None
+            )
 
             # Requête paramétrée (sécurisée contre injection SQL)
             sql_data = f"""
             SELECT 
                 matricule, employe, date_paie, code_paie, desc_code,
-                poste_budgetaire, montant, part_employeur, categorie
-            FROM payroll.v_imported_payroll
-            {where_clause}
-            ORDER BY date_paie DESC, matricule, id
+                poste_budgetaire, montant, part_employeur, categorie,
+                {", ".join(k.expr for k in SEARCH_KEYS)}
+            {from_where}
+            {"AND" if where_conditions else "WHERE"} {keyset_sql}
+            ORDER BY {order_by_sql(SEARCH_KEYS)}
             LIMIT %(limit)s OFFSET %(offset)s
             """
 
-            sql_count = f"""
-            SELECT COUNT(*) 
-            FROM payroll.v_imported_payroll
-            {where_clause}
-            """
-
-            params = {
-                "matricule": matricule,
-                "employe": employe,
-                "code": code,
-                "date": date_paie,
-                "limit": limit,
-                "offset": offset,
-            }
-
-            # Exécuter les requêtes
-            result_data = self.provider.repo.run_query(sql_data, params)
-            result_count = self.provider.repo.run_query(sql_count, params)
-
-            total = result_count[0][0] if result_count else 0
+            # Exécuter les requêtes (limit + 1: détecte la page suivante)
+            result_data = self.provider.repo.run_query(
+                sql_data,
+                {
+                    **params,
+                    **keyset_params,
+                    "limit": limit + 1,
+                    "offset": 0 if keyset else offset,
+                },
+            )
+            page, next_cursor = split_page(
+                list(result_data or []), limit, key_positions=(9, 10, 11)
+            )
+            total, total_estimated = count_rows(
+                self.provider.repo, from_where, params, count_mode
+            )
 
             rows = []
-            if result_data:
-                for row in result_data:
-                    json_row = []
-                    for val in row:
-                        if isinstance(val, (datetime, date)):
-                            json_row.append(str(val))
-                        elif isinstance(val, Decimal):
-                            json_row.append(float(val))
-                        elif val is None:
-                            json_row.append(None)
-                        else:
-                            json_row.append(str(val))
-                    rows.append(json_row)
+            for row in page:
+                json_row = []
+                for val in row[: len(row) - len(SEARCH_KEYS)]:
+                    if isinstance(val, (datetime, date)):
+                        json_row.append(str(val))
+                    elif isinstance(val, Decimal):
+                        json_row.append(float(val))
+                    elif val is None:
+                        json_row.append(None)
+                    else:
+                        json_row.append(str(val))
+                rows.append(json_row)
 
-            return json.dumps({"rows": rows, "total": total})
+            return json.dumps(
+                {
+                    "rows": rows,
+                    "total": total,
+                    "total_estimated": total_estimated,
+                    "next_cursor": next_cursor,
+                }
+            )
 
         except Exception as e:
             print(f"❌ Erreur search_payroll: {e}")
@@ -1561,6 +1864,8 @@ class AppBridge(QObject):
             )
 
             if result:
+                # get_periods (entrée globale) doit lister la nouvelle période
+                self.provider.cache.invalidate(pay_date)
                 return json.dumps(
                     {
                         "success": True,
@@ -1596,6 +1901,8 @@ class AppBridge(QObject):
             self.provider.repo.run_query(
                 sql, {"period_id": period_id, "user_id": user_id}
             )
+            # Statut servi par get_periods (cache): période connue par son id
+            self.provider.cache.invalidate()
 
             return json.dumps({"success": True, "message": "Période fermée"})
 
@@ -1616,6 +1923,7 @@ class AppBridge(QObject):
             WHERE period_id = %(period_id)s AND status = 'fermée'
             """
             self.provider.repo.run_query(sql, {"period_id": period_id})
+            self.provider.cache.invalidate()
 
             return json.dumps({"success": True, "message": "Période réouverte"})
 
@@ -1653,6 +1961,7 @@ class AppBridge(QObject):
             # Supprimer la période
             sql = "DELETE FROM payroll.pay_periods WHERE period_id = %(period_id)s"
             self.provider.repo.run_query(sql, {"period_id": period_id})
+            self.provider.cache.invalidate()
 
             return json.dumps({"success": True, "message": "Période supprimée"})
 
@@ -1809,28 +2118,21 @@ class AppBridge(QObject):
 
     @pyqtSlot(result=str)
     def refresh_materialized_views(self):
-        """Refresh les vues matérialisées"""
+        """Reconstruit entièrement les tables de synthèse (réparation)"""
         if not self.provider or not self.provider.repo:
             return json.dumps({"success": False, "message": "DB non disponible"})
 
         try:
-            views = [
-                "payroll.v_monthly_payroll_summary",
-                "payroll.v_employee_current_salary",
-                "payroll.v_employee_annual_history",
-            ]
+            from services.summary_tables import SummaryTablesService
 
-            for view in views:
-                sql = f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"
-                try:
-                    self.provider.repo.run_query(sql, {})
-                except Exception as _exc:
-                    # Si CONCURRENTLY échoue, essayer sans
-                    sql = f"REFRESH MATERIALIZED VIEW {view}"
-                    self.provider.repo.run_query(sql, {})
+            timings = SummaryTablesService(self.provider.repo).rebuild_all()
 
             return json.dumps(
-                {"success": True, "message": f"{len(views)} vues actualisées"}
+                {
+                    "success": len(timings) == 3,
+                    "message": f"{len(timings)}/3 synthèses reconstruites",
+                    "timings": timings,
+                }
             )
 
         except Exception as e:
@@ -2022,6 +2324,8 @@ class AppBridge(QObject):
             # Supprimer
             sql_delete = "DELETE FROM payroll.payroll_transactions WHERE period_id = %(period_id)s"
             self.provider.repo.run_query(sql_delete, {"period_id": period_id})
+            self._refresh_summaries([pay_date])
+            self.provider.cache.invalidate(pay_date)
 
             return json.dumps(
                 {
@@ -2142,86 +2446,146 @@ class AppBridge(QObject):
         # Message générique pour les erreurs non traduites
         return f"Une erreur s'est produite lors de l'importation : {error_message[:100]}{'...' if len(error_message) > 100 else ''}"
 
+    # ========== ENVOI DE FICHIER PAR BLOCS ==========
+
+    @pyqtSlot(str, result=str)
+    def begin_upload(self, file_name):
+        """
+        Ouvre un envoi de fichier par blocs (upload_chunk puis finish_upload).
+
+        Le fichier est écrit sur disque au fil des blocs: ni la chaîne
+        complète ni les octets décodés ne sont gardés en mémoire.
+        """
+        try:
+            upload_id = self.upload_store.begin(file_name)
+            return json.dumps({"success": True, "upload_id": upload_id})
+        except Exception as e:
+            print(f"❌ Erreur begin_upload: {e}")
+            return json.dumps({"success": False, "message": str(e)})
+
+    @pyqtSlot(str, str, result=str)
+    def upload_chunk(self, upload_id, chunk_base64):
+        """Ajoute un bloc (base64) à l'envoi; retourne les octets reçus."""
+        import base64
+
+        try:
+            received = self.upload_store.append(
+                upload_id, base64.b64decode(chunk_base64)
+            )
+            return json.dumps({"success": True, "received": received})
+        except Exception as e:
+            print(f"❌ Erreur upload_chunk: {e}")
+            self.upload_store.abort(upload_id)
+            return json.dumps({"success": False, "message": str(e)})
+
+    @pyqtSlot(str, result=str)
+    def finish_upload(self, upload_id):
+        """Termine l'envoi: upload_id et checksum pour *_import_file."""
+        try:
+            info = self.upload_store.finish(upload_id)
+            # Le chemin local reste côté Python (résolu par upload_id)
+            info.pop("path", None)
+            return json.dumps({"success": True, **info})
+        except Exception as e:
+            print(f"❌ Erreur finish_upload: {e}")
+            return json.dumps({"success": False, "message": str(e)})
+
+    @pyqtSlot(str, result=str)
+    def cancel_upload(self, upload_id):
+        """Abandonne un envoi en cours."""
+        self.upload_store.abort(upload_id)
+        return json.dumps({"success": True, "upload_id": upload_id})
+
+    def _store_payload(self, file_data, file_name) -> str:
+        """
+        Écrit un fichier reçu en une seule chaîne (base64, texte pour CSV).
+
+        Returns:
+            upload_id de l'envoi terminé
+        """
+        import base64
+
+        upload_id = self.upload_store.begin(file_name)
+        try:
+            if file_name.lower().endswith(".csv"):
+                self.upload_store.append(upload_id, file_data.encode("utf-8"))
+            else:
+                self.upload_store.append(upload_id, base64.b64decode(file_data))
+        except Exception:
+            self.upload_store.abort(upload_id)
+            raise
+        self.upload_store.finish(upload_id)
+        return upload_id
+
     @pyqtSlot(str, str, result=str)
     def preview_import(self, file_data, file_name):
-        """Analyse un fichier et retourne un aperçu SANS l'enregistrer"""
+        """
+        Aperçu d'un fichier transmis en une seule chaîne (compatibilité).
+
+        Préférer begin_upload / upload_chunk / finish_upload puis
+        preview_import_file.
+        """
+        try:
+            upload_id = self._store_payload(file_data, file_name)
+        except Exception as e:
+            print(f"❌ Erreur preview_import: {e}")
+            return json.dumps(
+                {"success": False, "message": f"Fichier illisible: {str(e)}"}
+            )
+
+        try:
+            return self.preview_import_file(upload_id)
+        finally:
+            # La feuille parsée reste dans parsed_cache (clé = checksum)
+            self.upload_store.release(upload_id)
+
+    @pyqtSlot(str, result=str)
+    def preview_import_file(self, upload_id):
+        """
+        Analyse un fichier envoyé et retourne un aperçu SANS l'enregistrer
+
+        Args:
+            upload_id: Identifiant retourné par finish_upload (aucun chemin
+                n'est accepté depuis le contenu web)
+        """
         if not self.provider or not self.provider.repo:
             return json.dumps(
                 {"success": False, "message": "PostgreSQL non disponible"}
             )
 
         try:
-            import base64
-            import csv
-            import io
+            file_path = str(self.upload_store.path(upload_id))
+        except KeyError as e:
+            print(f"❌ Erreur preview_import_file: {e}")
+            return json.dumps({"success": False, "message": "Envoi introuvable"})
 
+        try:
             import pandas as pd
 
-            # Limite de taille (50 MB)
-            MAX_SIZE = 50 * 1024 * 1024
-            if len(file_data) > MAX_SIZE:
+            file_name = os.path.basename(file_path)
+            if not os.path.isfile(file_path):
                 return json.dumps(
-                    {
-                        "success": False,
-                        "message": f"Fichier trop volumineux ({len(file_data)} octets). Limite : 50 MB",
-                    }
+                    {"success": False, "message": f"Fichier introuvable: {file_name}"}
                 )
 
             # Parser le fichier
-            print(f"📥 Aperçu démarré: {file_name} ({len(file_data)} octets)")
+            print(
+                f"📥 Aperçu démarré: {file_name} ({os.path.getsize(file_path)} octets)"
+            )
 
             if file_name.lower().endswith(".csv"):
-                # CSV : Détection auto séparateur avec csv.Sniffer
-                df = None
-                detected_sep = None
-                detected_enc = None
-
-                for enc in ("utf-8-sig", "utf-8", "latin1", "cp1252"):
-                    try:
-                        # Lire échantillon pour détecter séparateur
-                        sample = file_data[:10000]  # 10 KB
-                        sniffer = csv.Sniffer()
-                        dialect = sniffer.sniff(sample, delimiters=",;\t")
-                        detected_sep = dialect.delimiter
-
-                        # Parser avec séparateur détecté
-                        df = pd.read_csv(
-                            io.StringIO(file_data),
-                            sep=detected_sep,
-                            encoding=enc,
-                            engine="python",
-                        )
-                        if df.shape[1] >= 3:  # Minimum 3 colonnes
-                            detected_enc = enc
-                            print(
-                                f"✓ CSV parsé (auto: enc={enc}, sep='{detected_sep}')"
-                            )
-                            break
-                    except Exception as _exc:
-                        pass
+                # CSV : encodage + séparateur détectés une fois sur un
+                # échantillon, lecture en une passe (pyarrow si disponible)
+                from services.csv_reader import read_csv_fast
 
-                # Fallback : essai manuel
-                if df is None or df.shape[1] < 3:
-                    for enc in ("utf-8-sig", "utf-8", "latin1", "cp1252"):
-                        for sep in (";", ",", "\t"):
-                            try:
-                                df = pd.read_csv(
-                                    io.StringIO(file_data),
-                                    sep=sep,
-                                    encoding=enc,
-                                    engine="python",
-                                )
-                                if df.shape[1] >= 3:
-                                    detected_sep = sep
-                                    detected_enc = enc
-                                    print(
-                                        f"✓ CSV parsé (fallback: enc={enc}, sep='{sep}')"
-                                    )
-                                    break
-                            except Exception as _exc:
-                                pass
-                        if df is not None and df.shape[1] >= 3:
-                            break
+                try:
+                    df, csv_format = read_csv_fast(file_path)
+                    detected_sep = csv_format.delimiter
+                    detected_enc = csv_format.encoding
+                    print(f"✓ CSV parsé (enc={detected_enc}, sep='{detected_sep}')")
+                except Exception as e:
+                    print(f"❌ Erreur lecture CSV: {e}")
+                    df = None
 
                 if df is None or df.shape[1] < 3:
                     return json.dumps(
@@ -2231,19 +2595,25 @@ class AppBridge(QObject):
                         }
                     )
             else:
-                # Excel : données en Base64, décoder puis lire
+                # Excel : lu depuis le chemin local
                 try:
-                    # Décoder Base64 → bytes
-                    excel_bytes = base64.b64decode(file_data)
-                    print(f"✓ Excel décodé: {len(excel_bytes)} octets")
+                    checksum = self.upload_store.checksum(file_path)
 
-                    # Lire Excel avec types natifs - date_utils gère la conversion
-                    df = pd.read_excel(io.BytesIO(excel_bytes), engine="openpyxl")
+                    # Même parseur que l'import (feuille retenue, types natifs);
+                    # résultat mis en cache pour confirm_import (clé = checksum)
+                    from services.import_service_complete import (
+                        ImportServiceComplete,
+                    )
+
+                    parser = ImportServiceComplete(
+                        self.provider.repo, None, parsed_cache=self.parsed_cache
+                    )
+                    df = parser.parse_excel_cached(file_path, checksum)
                     print(
                         f"✓ Excel parsé ({len(df.columns)} colonnes, types natifs pandas)"
                     )
                 except Exception as e:
-                    print(f"❌ Erreur décodage/lecture Excel: {e}")
+                    print(f"❌ Erreur lecture Excel: {e}")
                     import traceback
 
                     traceback.print_exc()
@@ -2350,61 +2720,62 @@ class AppBridge(QObject):
                     row_dict[str(col)] = str(val) if pd.notna(val) else ""
                 sample_rows.append(row_dict)
 
-            # CALCULER APERÇU (sans enregistrer)
-            periods_preview = {}
-            employees_preview = set()
-            total_brut = 0
-            total_deductions = 0
-            invalid_dates = 0
+            # CALCULER APERÇU (sans enregistrer): une conversion par valeur
+            # distincte de date / montant, agrégation par date de paie
+            from services.import_service_complete import _map_distinct
 
-            for idx, row in df.iterrows():
+            def preview_date(value):
                 try:
-                    # Date de paie (PARSING ROBUSTE)
-                    pay_date_raw = row[col_map["date"]]
-                    pay_date, error_msg = parse_excel_date_robust(pay_date_raw, idx)
-
-                    if error_msg or not pay_date:
-                        invalid_dates += 1
-                        continue
-
-                    # Matricule / Employé
-                    matricule = (
-                        str(
-                            row[col_map.get("matricule", col_map.get("nom", ""))]
-                        ).strip()
-                        if "matricule" in col_map or "nom" in col_map
-                        else f"EMP{idx:05d}"
-                    )
-                    employees_preview.add(matricule)
-
-                    # Montant (NETTOYAGE ROBUSTE avec parseur neutre)
-                    montant_raw = row[col_map["montant"]]
-                    montant_float = parse_amount_neutral(montant_raw)
-
-                    if montant_float is None:
-                        continue
-
-                    # Accumuler par période
-                    if pay_date not in periods_preview:
-                        periods_preview[pay_date] = {
-                            "brut": 0,
-                            "deductions": 0,
-                            "net": 0,
-                            "count": 0,
-                        }
-
-                    if montant_float > 0:
-                        periods_preview[pay_date]["brut"] += montant_float
-                        total_brut += montant_float
-                    else:
-                        periods_preview[pay_date]["deductions"] += montant_float
-                        total_deductions += montant_float
+                    pay_date, error_msg = parse_excel_date_robust(value, None)
+                except Exception as _exc:
+                    return None
+                return None if error_msg else pay_date
 
-                    periods_preview[pay_date]["net"] += montant_float
-                    periods_preview[pay_date]["count"] += 1
+            dates = pd.Series(
+                _map_distinct(df[col_map["date"]], preview_date),
+                index=df.index,
+                dtype=object,
+            )
+            valid = dates.notna()
+            invalid_dates = int((~valid).sum())
+
+            # Matricule / Employé (lignes à date valide)
+            if "matricule" in col_map or "nom" in col_map:
+                emp_col = col_map.get("matricule", col_map.get("nom"))
+                employees_preview = set(
+                    df.loc[valid, emp_col].astype(str).str.strip().tolist()
+                )
+            else:
+                employees_preview = {f"EMP{idx:05d}" for idx in df.index[valid]}
 
-                except Exception as _exc:
-                    continue
+            # Montant (parseur neutre), lignes non parsables ignorées
+            montants = pd.Series(
+                _map_distinct(df.loc[valid, col_map["montant"]], parse_amount_neutral),
+                index=df.index[valid],
+                dtype="float64",
+            )
+            lignes = pd.DataFrame({"date": dates[valid], "montant": montants}).dropna()
+            lignes["brut"] = lignes["montant"].where(lignes["montant"] > 0, 0.0)
+            lignes["deductions"] = lignes["montant"].where(lignes["montant"] <= 0, 0.0)
+
+            total_brut = float(lignes["brut"].sum())
+            total_deductions = float(lignes["deductions"].sum())
+            periods_preview = {
+                pay_date: {
+                    "brut": float(row["brut"]),
+                    "deductions": float(row["deductions"]),
+                    "net": float(row["net"]),
+                    "count": int(row["count"]),
+                }
+                for pay_date, row in lignes.groupby("date")
+                .agg(
+                    brut=("brut", "sum"),
+                    deductions=("deductions", "sum"),
+                    net=("montant", "sum"),
+                    count=("montant", "size"),
+                )
+                .iterrows()
+            }
 
             # Retourner aperçu pour validation utilisateur
             return json.dumps(
@@ -2466,30 +2837,53 @@ class AppBridge(QObject):
 
     @pyqtSlot(str, str, bool, result=str)
     def confirm_import(self, file_data, file_name, apply_sign_correction=True):
+        """
+        Import d'un fichier transmis en une seule chaîne (compatibilité).
+
+        Préférer begin_upload / upload_chunk / finish_upload puis
+        confirm_import_file.
+        """
+        try:
+            upload_id = self._store_payload(file_data, file_name)
+        except Exception as e:
+            print(f"❌ Erreur confirm_import: {e}")
+            return json.dumps(
+                {"success": False, "message": f"Fichier illisible: {str(e)}"}
+            )
+        return self.confirm_import_file(upload_id, apply_sign_correction)
+
+    @pyqtSlot(str, bool, result=str)
+    def confirm_import_file(self, upload_id, apply_sign_correction=True):
         """
         Enregistre dans PostgreSQL avec SERVICE ROBUSTE.
         Utilise ImportServiceComplete pour parsing robuste.
-        RETOURNE IMMÉDIATEMENT pour ne pas bloquer l'interface.
 
         Args:
-            file_data: Données du fichier (base64 ou texte)
-            file_name: Nom du fichier
+            upload_id: Identifiant retourné par finish_upload (aucun chemin
+                n'est accepté depuis le contenu web); l'envoi est supprimé
+                après l'import
             apply_sign_correction: Si True, applique la politique de signes automatique
         """
+        try:
+            file_path = str(self.upload_store.path(upload_id))
+        except KeyError as e:
+            print(f"❌ Erreur confirm_import_file: {e}")
+            return json.dumps({"success": False, "message": "Envoi introuvable"})
+
+        file_name = os.path.basename(file_path)
         print(f"📥 Import CONFIRMÉ démarré: {file_name}")
         print(f"🔧 Correction des signes: {'OUI' if apply_sign_correction else 'NON'}")
 
         if not self.provider or not self.provider.repo:
             from services.error_messages import translate_error
 
+            self.upload_store.release(upload_id)
             user_msg, solution = translate_error(Exception("PostgreSQL non disponible"))
             return json.dumps(
                 {"success": False, "message": user_msg, "solution": solution}
             )
 
         try:
-            import base64
-
             # ========== UTILISER SERVICE ROBUSTE ==========
             from services.import_service_complete import ImportServiceComplete
             from services.kpi_snapshot_service import KPISnapshotService
@@ -2505,19 +2899,16 @@ class AppBridge(QObject):
             # Initialiser le service robuste avec callback de progression
             kpi_service = KPISnapshotService(self.provider.repo)
             import_service = ImportServiceComplete(
-                self.provider.repo, kpi_service, progress_callback=progress_callback
+                self.provider.repo,
+                kpi_service,
+                import_finished_callback=self._on_import_finished,
+                progress_callback=progress_callback,
+                job_queue=self.post_import_queue,
+                parsed_cache=self.parsed_cache,
             )
 
-            # Créer fichier temporaire avec gestion des verrous Windows
-            with tempfile.NamedTemporaryFile(
-                delete=False, suffix=os.path.splitext(file_name)[1]
-            ) as temp_file:
-                if file_name.lower().endswith(".csv"):
-                    temp_file.write(file_data.encode("utf-8"))
-                else:
-                    excel_bytes = base64.b64decode(file_data)
-                    temp_file.write(excel_bytes)
-                temp_path = temp_file.name
+            # Checksum mémorisé par finish_upload (sinon une lecture du fichier)
+            checksum = self.upload_store.checksum(file_path)
 
             try:
                 # Stocker la référence pour annulation
@@ -2525,16 +2916,18 @@ class AppBridge(QObject):
 
                 # Utiliser le service robuste
                 result = import_service.import_payroll_file(
-                    file_path=temp_path,
+                    file_path=file_path,
                     pay_date=datetime(2025, 8, 28),  # Date de Classeur1.xlsx
                     user_id="00000000-0000-0000-0000-000000000000",  # UUID par défaut pour Qt app
                     apply_sign_policy=apply_sign_correction,  # Appliquer ou non la correction des signes
+                    checksum=checksum,
                 )
 
                 # Nettoyer la référence
                 self.current_importer = None
 
                 if result["status"] == "success":
+                    self.provider.cache.invalidate(result["pay_date"])
                     self._refresh_active_period()
                     active_period = self._get_active_period()
                     return json.dumps(
@@ -2543,6 +2936,7 @@ class AppBridge(QObject):
                             "message": f"Import réussi: {result['rows_count']} lignes",
                             "rows_count": result["rows_count"],
                             "batch_id": result["batch_id"],
+                            "job_id": result.get("job_id"),
                             "active_period": (
                                 active_period.get("pay_date") if active_period else None
                             ),
@@ -2564,17 +2958,12 @@ class AppBridge(QObject):
             except Exception as e:
                 raise e
             finally:
-                # Nettoyer fichier temporaire avec gestion des verrous Windows
-                try:
-                    if os.path.exists(temp_path):
-                        os.unlink(temp_path)
-                except PermissionError:
-                    # Fichier encore utilisé, on l'ignore
-                    print(
-                        f"⚠️ Impossible de supprimer le fichier temporaire: {temp_path}"
-                    )
-                except Exception as cleanup_error:
-                    print(f"⚠️ Erreur lors du nettoyage: {cleanup_error}")
+                # Feuille parsée à l'aperçu: inutile après import, réussi,
+                # échoué ou annulé (données personnelles, pas de rétention)
+                self.parsed_cache.discard(checksum)
+                # Supprimer l'envoi (fichier verrouillé sous Windows: purgé
+                # au prochain démarrage)
+                self.upload_store.release(upload_id)
 
         except Exception as e:
             print(f"❌ Erreur confirm_import: {e}")
@@ -2965,9 +3354,33 @@ if __name__ == "__main__":
 
     # Fermeture propre du pool DB pour éviter l'avertissement psycopg_pool
     def _cleanup_db():
+        # Le pont est exposé sous win.app_bridge (cf. _setup_web_channel)
+        bridge = getattr(win, "app_bridge", None)
         try:
-            if getattr(win, "bridge", None) and getattr(win.bridge, "provider", None):
-                win.bridge.provider.close()
+            if bridge and getattr(bridge, "async_pool", None):
+                bridge.async_pool.clear()
+                bridge.async_pool.waitForDone(5000)
+            if bridge and getattr(bridge, "write_pool", None):
+                # Import en cours annulé (rollback), imports en attente écartés
+                bridge.write_pool.clear()
+                bridge.cancelImport()
+                bridge.write_pool.waitForDone(5000)
+        except Exception:
+            pass
+        try:
+            if bridge and getattr(bridge, "post_import_queue", None):
+                bridge.post_import_queue.stop()
+        except Exception:
+            pass
+        try:
+            if bridge and getattr(bridge, "provider", None):
+                bridge.provider.close()
+        except Exception:
+            pass
+        try:
+            from config.connection_standard import close_connection_pool
+
+            close_connection_pool()
         except Exception:
             pass
 
@@ -0,0 +1,192 @@
+"""
+Pagination: keyset (curseur) et comptage estimé pour les listes paginées
+
+LIMIT/OFFSET relit et jette toutes les lignes des pages précédentes, et le
+COUNT(*) exact double le coût de chaque page. Ce module fournit:
+- un curseur opaque (clés ORDER BY de la dernière ligne, base64 JSON)
+- la condition WHERE « après le curseur » pour un ORDER BY donné
+- un comptage estimé via EXPLAIN (Plan Rows), sans parcourir les données
+
+Modes de comptage (paramètre "count" des endpoints):
+- "exact": COUNT(*) sur l'ensemble filtré
+- "estimate": estimation du planificateur (total_estimated=True)
+- "none": pas de total
+
+Usage:
+    keys = (KeysetKey("t.pay_date", "date", descending=True),
+            KeysetKey("t.transaction_id::text", "text"))
+    where, params = keyset_condition(keys, decode_cursor(cursor))
+    ... SELECT ..., t.pay_date, t.transaction_id::text
+        WHERE ... AND {where} ORDER BY {order_by_sql(keys)} LIMIT limit + 1
+    rows, next_cursor = split_page(rows, limit, key_positions=(5, 6))
+    total, estimated = count_rows(repo, "FROM ... WHERE ...", params, "estimate")
+"""
+
+import base64
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE)
+
+
+@dataclass(frozen=True)
+class KeysetKey:
+    """Clé de tri: expression SQL, type de cast du paramètre, sens."""
+
+    expr: str
+    sql_type: str
+    descending: bool = False
+
+
+def order_by_sql(keys: Sequence[KeysetKey]) -> str:
+    """Clause ORDER BY correspondant aux clés (sans le mot-clé)."""
+    return ", ".join(f"{k.expr} {'DESC' if k.descending else 'ASC'}" for k in keys)
+
+
+def keyset_condition(
+    keys: Sequence[KeysetKey], values: Optional[list]
+) -> tuple[str, dict[str, Any]]:
+    """
+    Condition « strictement après » la ligne de curseur pour l'ORDER BY donné.
+
+    Sens homogènes: comparaison de tuples (k1, k2) < (v1, v2), utilisable par
+    un index composite. Sens mixtes: forme développée
+    (k1 < v1) OR (k1 = v1 AND k2 > v2) ..., précédée de la borne redondante
+    k1 <= v1 (k1 >= v1 en ASC): condition d'intervalle sur la clé de tête,
+    sans laquelle chaque page relirait et trierait tout l'ensemble filtré.
+
+    Args:
+        keys: Clés ORDER BY (expressions non NULL)
+        values: Valeurs de la dernière ligne (decode_cursor), None = 1re page
+
+    Returns:
+        (condition SQL ou "TRUE", paramètres nommés cursor_0..n)
+    """
+    if not values:
+        return "TRUE", {}
+    if len(values) != len(keys):
+        raise ValueError("Curseur incompatible avec le tri demandé")
+
+    params = {f"cursor_{i}": value for i, value in enumerate(values)}
+    placeholders = [f"%(cursor_{i})s::{k.sql_type}" for i, k in enumerate(keys)]
+
+    if len({k.descending for k in keys}) == 1:
+        op = "<" if keys[0].descending else ">"
+        exprs = ", ".join(k.expr for k in keys)
+        return f"({exprs}) {op} ({', '.join(placeholders)})", params
+
+    branches = []
+    for i, key in enumerate(keys):
+        egalites = [f"{keys[j].expr} = {placeholders[j]}" for j in range(i)]
+        op = "<" if key.descending else ">"
+        branches.append(
+            "(" + " AND ".join(egalites + [f"{key.expr} {op} {placeholders[i]}"]) + ")"
+        )
+    lead_op = "<=" if keys[0].descending else ">="
+    lead = f"{keys[0].expr} {lead_op} {placeholders[0]}"
+    return f"({lead} AND ({' OR '.join(branches)}))", params
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Valeurs de clés -> curseur opaque (base64 URL-safe de JSON)."""
+    raw = json.dumps([_cursor_value(v) for v in values], separators=(",", ":")).encode(
+        "utf-8"
+    )
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _cursor_value(value: Any) -> Any:
+    """Valeur de clé -> forme JSON (dates ISO, Decimal/UUID en texte)."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[list]:
+    """Curseur opaque -> valeurs de clés (None si absent)."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Curseur invalide: {e}") from e
+    if not isinstance(values, list):
+        raise ValueError("Curseur invalide")
+    return values
+
+
+def split_page(
+    rows: list, limit: int, key_positions: Sequence[int]
+) -> tuple[list, Optional[str]]:
+    """
+    Sépare la page (limit lignes) et calcule le curseur suivant.
+
+    La requête doit demander limit + 1 lignes: la ligne en trop indique
+    qu'une page suivante existe.
+
+    Returns:
+        (lignes de la page, curseur suivant ou None si dernière page)
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor([last[i] for i in key_positions])
+
+
+def normalize_count_mode(mode: Optional[str], default: str) -> str:
+    """Valide le mode de comptage demandé (repli sur default)."""
+    return mode if mode in COUNT_MODES else default
+
+
+def default_count_mode(keyset: bool, cursor_values: Optional[list]) -> str:
+    """
+    Mode de comptage par défaut: exact en pagination offset (compatibilité),
+    estimé en 1re page keyset, aucun sur les pages suivantes (le client a
+    déjà le total de la 1re page).
+    """
+    if not keyset:
+        return COUNT_EXACT
+    return COUNT_NONE if cursor_values else COUNT_ESTIMATE
+
+
+def count_rows(
+    repo, from_where_sql: str, params: Any, mode: str
+) -> tuple[Optional[int], bool]:
+    """
+    Compte les lignes de « FROM ... WHERE ... » selon le mode.
+
+    Args:
+        repo: DataRepository
+        from_where_sql: Fragment SQL commençant par FROM (sans ORDER/LIMIT)
+        params: Paramètres du fragment
+        mode: "exact", "estimate" ou "none"
+
+    Returns:
+        (total ou None, True si estimé)
+    """
+    if mode == COUNT_NONE:
+        return None, False
+
+    if mode == COUNT_ESTIMATE:
+        try:
+            with repo.get_connection() as conn:
+                plan = repo.run_select(
+                    conn, f"EXPLAIN (FORMAT JSON) SELECT 1 {from_where_sql}", params
+                )
+            return int(plan[0][0][0]["Plan"]["Plan Rows"]), True
+        except Exception as e:
+            logger.warning(f"Estimation du total impossible, comptage exact: {e}")
+
+    result = repo.run_query(f"SELECT COUNT(*) {from_where_sql}", params, fetch_one=True)
+    return int(result[0]) if result else 0, False
@@ -15,6 +15,17 @@ import psycopg
 from psycopg import OperationalError
 
 from .data_provider import AbstractDataProvider
+from .pagination import (
+    KeysetKey,
+    count_rows,
+    decode_cursor,
+    default_count_mode,
+    keyset_condition,
+    normalize_count_mode,
+    order_by_sql,
+    split_page,
+)
+from .read_cache import ReadCache, cached_read
 
 if TYPE_CHECKING:
     from app.services.data_repo import DataRepository
@@ -73,6 +84,18 @@ except Exception:
 APP_ENV = os.getenv("APP_ENV", "development")
 USE_COPY = os.getenv("USE_COPY", "0") == "1"
 
+# Clés keyset (ORDER BY existants + identifiant unique comme départage)
+_TABLE_KEYS = (
+    KeysetKey("t.pay_date", "date", descending=True),
+    KeysetKey("COALESCE(e.matricule_norm, '')", "text"),
+    KeysetKey("t.transaction_id::text", "text"),
+)
+_TABLE_KEY_POSITIONS = (5, 6, 7)
+_EMPLOYEE_KEYS = (
+    KeysetKey("unaccent(lower(COALESCE(e.nom_complet, '')))", "text"),
+    KeysetKey("e.employee_id::text", "text"),
+)
+
 
 def _mask_dsn(dsn: str) -> str:
     """Masque le mot de passe dans le DSN"""
@@ -124,6 +147,15 @@ def _has_password_in_dsn(dsn: str) -> bool:
     return False
 
 
+# Résultats de repli retournés après une erreur DB: jamais mis en cache
+_FALLBACK_SOURCES = ("mock_fallback", "error_fallback")
+
+
+def _not_fallback(result: Dict[str, Any]) -> bool:
+    """Ne pas mettre en cache le repli retourné après une erreur."""
+    return result.get("source") not in _FALLBACK_SOURCES
+
+
 class PostgresProvider(AbstractDataProvider):
     """
     Provider PostgreSQL avec architecture dimension/fait.
@@ -145,6 +177,13 @@ class PostgresProvider(AbstractDataProvider):
         """
         logger = logging.getLogger(__name__)
 
+        # Cache des lectures (invalidé à l'import / à la suppression)
+        ttl_env = os.getenv("PAYROLL_CACHE_TTL_S")
+        self.cache = ReadCache(
+            maxsize=int(os.getenv("PAYROLL_CACHE_SIZE", "256")),
+            ttl_s=float(ttl_env) if ttl_env else None,
+        )
+
         # Priorité: paramètre > PAYROLL_DSN > DATABASE_URL
         self.dsn = dsn or os.getenv("PAYROLL_DSN") or os.getenv("DATABASE_URL")
 
@@ -233,6 +272,7 @@ class PostgresProvider(AbstractDataProvider):
             logger = logging.getLogger(__name__)
             logger.warning(f"Impossible de configurer les paramètres de connexion: {e}")
 
+    @cached_read(cacheable=_not_fallback)
     def get_kpis(self, pay_date: Optional[str] = None) -> Dict[str, Any]:
         """
         Récupère les KPI depuis la nouvelle structure référentiel.
@@ -462,6 +502,7 @@ class PostgresProvider(AbstractDataProvider):
         except Exception:
             return 0.0
 
+    @cached_read(cacheable=_not_fallback)
     def get_kpi_details(self, pay_date: Optional[str]) -> Dict[str, Any]:
         """
         Retourne les détails KPI sans passer par l'API FastAPI.
@@ -587,8 +628,9 @@ class PostgresProvider(AbstractDataProvider):
         except Exception:
             logger = logging.getLogger(__name__)
             logger.exception("Erreur get_kpi_details")
-            return empty
+            return {**empty, "source": "error_fallback"}
 
+    @cached_read(scoped=False, cacheable=bool)
     def get_dashboard_charts(self, pay_date: Optional[str] = None) -> Dict[str, Any]:
         """
         Séries de graphiques pour le dashboard (dernières 30 dates).
@@ -675,6 +717,13 @@ class PostgresProvider(AbstractDataProvider):
         Récupère les données paginées depuis la nouvelle structure.
 
         Architecture: JOIN payroll.payroll_transactions + core.employees
+
+        Pagination:
+        - filters["cursor"] présent (None = 1re page): keyset sur
+          (pay_date DESC, matricule, transaction_id), offset ignoré
+        - sinon: LIMIT/OFFSET (compatibilité)
+        filters["count"]: "exact" | "estimate" | "none" (défaut: exact en
+        mode offset, estimate en 1re page keyset, none ensuite)
         """
         if not self.repo:
             return self._mock_table(offset, limit, filters)
@@ -692,73 +741,89 @@ class PostgresProvider(AbstractDataProvider):
             matricule_filter = filters.get("matricule", "")
             categorie_filter = filters.get("categorie", "")
 
+            keyset = "cursor" in filters
+            cursor_values = decode_cursor(filters.get("cursor"))
+            count_mode = normalize_count_mode(
+                filters.get("count"),
+                default_count_mode(keyset, cursor_values),
+            )
+
             # Normaliser la date de paie si fournie
             pay_date_normalized = None
             if pay_date_filter:
                 pay_date_normalized = self._normalize_pay_date(pay_date_filter)
 
-            # Requête sur nouvelle structure
-            sql = """
-            SELECT 
-                e.matricule_norm,
-                e.nom_complet AS nom,
-                t.pay_date::text AS date_paie,
-                t.pay_code AS categorie,
-                t.amount_cents / 100.0 AS montant
+            from_where = """
             FROM payroll.payroll_transactions t
             JOIN core.employees e ON t.employee_id = e.employee_id
             WHERE 1=1
                 AND (%(pay_date)s::date IS NULL OR t.pay_date = %(pay_date)s::date)
                 AND (%(matricule)s = '' OR e.matricule_norm = %(matricule)s)
                 AND (%(categorie)s = '' OR t.pay_code ILIKE '%%' || %(categorie)s || '%%')
-            ORDER BY t.pay_date DESC, e.matricule_norm
-            LIMIT %(limit)s OFFSET %(offset)s
             """
-
-            # Requête count pour pagination
-            sql_count = """
-            SELECT COUNT(*) AS total
-            FROM payroll.payroll_transactions t
-            JOIN core.employees e ON t.employee_id = e.employee_id
-            WHERE 1=1
-                AND (%(pay_date)s::date IS NULL OR t.pay_date = %(pay_date)s::date)
-                AND (%(matricule)s = '' OR e.matricule_norm = %(matricule)s)
-                AND (%(categorie)s = '' OR t.pay_code ILIKE '%%' || %(categorie)s || '%%')
-            """
-
             params = {
                 "pay_date": pay_date_normalized,
                 "matricule": matricule_filter,
                 "categorie": categorie_filter,
-                "limit": limit,
-                "offset": offset,
             }
 
-            # Exécuter les requêtes
-            rows_result = self.repo.run_query(sql, params)
-            count_result = self.repo.run_query(sql_count, params)
+            keyset_sql, keyset_params = keyset_condition(
+                _TABLE_KEYS, cursor_values if keyset else None
+            )
 
-            total = int(count_result[0][0]) if count_result else 0
+            # Requête sur nouvelle structure (limit + 1: détecte la page suivante)
+            sql = f"""
+            SELECT 
+                e.matricule_norm,
+                e.nom_complet AS nom,
+                t.pay_date::text AS date_paie,
+                t.pay_code AS categorie,
+                t.amount_cents / 100.0 AS montant,
+                {", ".join(k.expr for k in _TABLE_KEYS)}
+            {from_where}
+                AND {keyset_sql}
+            ORDER BY {order_by_sql(_TABLE_KEYS)}
+            LIMIT %(limit)s OFFSET %(offset)s
+            """
+
+            rows_result = self.repo.run_query(
+                sql,
+                {
+                    **params,
+                    **keyset_params,
+                    "limit": limit + 1,
+                    "offset": 0 if keyset else offset,
+                },
+            )
+            page, next_cursor = split_page(
+                list(rows_result or []), limit, key_positions=_TABLE_KEY_POSITIONS
+            )
+
+            # Total seulement si demandé (estimation: plan, sans parcours)
+            total, total_estimated = count_rows(
+                self.repo, from_where, params, count_mode
+            )
 
             # Formater les résultats
             rows = []
-            if rows_result:
-                for row in rows_result:
-                    rows.append(
-                        {
-                            "matricule": row[0] or "N/A",
-                            "nom": row[1] or "N/A",
-                            "date_paie": row[2] or "",
-                            "categorie": row[3] or "N/A",
-                            "montant": float(row[4] or 0),
-                        }
-                    )
+            for row in page:
+                rows.append(
+                    {
+                        "matricule": row[0] or "N/A",
+                        "nom": row[1] or "N/A",
+                        "date_paie": row[2] or "",
+                        "categorie": row[3] or "N/A",
+                        "montant": float(row[4] or 0),
+                    }
+                )
 
             return {
                 "rows": rows,
                 "total": total,
+                "total_estimated": total_estimated,
                 "offset": offset,
                 "limit": limit,
+                "next_cursor": next_cursor,
                 "source": "referentiel_employees",
             }
 
@@ -906,6 +971,7 @@ class PostgresProvider(AbstractDataProvider):
     # GESTION NOUVEAUX EMPLOYÉS (par fichier/batch)
     # ========================================================================
 
+    @cached_read(scoped=False)
     def get_all_pay_dates(self) -> list:
         """
         Liste toutes les dates de paie (fichiers importés).
@@ -1101,59 +1167,70 @@ class PostgresProvider(AbstractDataProvider):
                 ...
             ]
         """
-        # Essayer d'abord payroll.pay_periods
+        # Erreur de lecture: repli sur les transactions, non mis en cache
+        # (une erreur passagère ne doit pas figer la liste)
         try:
-            if filter_year:
-                # Format détaillé pour periods.html
-                sql = """
-                    SELECT 
-                        period_id::text,
-                        pay_date::text,
-                        pay_day,
-                        pay_month,
-                        pay_year,
-                        period_seq_in_year,
-                        status,
-                        closed_by::text,
-                        (SELECT COUNT(*) FROM payroll.payroll_transactions WHERE period_id = pp.period_id) as transaction_count
-                    FROM payroll.pay_periods pp
-                    WHERE pay_year = %(year)s
-                    ORDER BY pay_date DESC
-                """
-                rows = self.repo.run_query(sql, {"year": filter_year})
-                if rows:
-                    return [
-                        {
-                            "period_id": r[0],
-                            "pay_date": r[1],
-                            "pay_day": r[2],
-                            "pay_month": r[3],
-                            "pay_year": r[4],
-                            "period_seq_in_year": r[5],
-                            "status": r[6],
-                            "closed_by": r[7],
-                            "transaction_count": r[8] or 0,
-                        }
-                        for r in rows
-                    ]
-            else:
-                # Format simplifié pour employees.js
-                sql = """
-                    SELECT period_id::text, TO_CHAR(pay_date, 'YYYY-MM-DD') AS date_str
-                    FROM payroll.pay_periods
-                    ORDER BY pay_date DESC
-                    LIMIT 100
-                """
-                rows = self.repo.run_query(sql)
-                if rows:
-                    return [{"id": r[0], "label": r[1], "date": r[1]} for r in rows]
+            return self._get_periods_cached(filter_year)
         except Exception as e:
             logger = logging.getLogger(__name__)
             logger.warning(
                 "Erreur lecture payroll.pay_periods, fallback sur transactions: %s", e
             )
+            return self._get_periods_from_transactions(filter_year)
 
-        # Fallback: utiliser payroll_transactions si pay_periods vide ou inexistant
+    @cached_read(scoped=False)
+    def _get_periods_cached(self, filter_year: Optional[int] = None) -> list:
+        """get_periods mis en cache: toute erreur DB est propagée."""
+        if filter_year:
+            # Format détaillé pour periods.html
+            sql = """
+                SELECT 
+                    period_id::text,
+                    pay_date::text,
+                    pay_day,
+                    pay_month,
+                    pay_year,
+                    period_seq_in_year,
+                    status,
+                    closed_by::text,
+                    (SELECT COUNT(*) FROM payroll.payroll_transactions WHERE period_id = pp.period_id) as transaction_count
+                FROM payroll.pay_periods pp
+                WHERE pay_year = %(year)s
+                ORDER BY pay_date DESC
+            """
+            rows = self.repo.run_query(sql, {"year": filter_year})
+            if rows:
+                return [
+                    {
+                        "period_id": r[0],
+                        "pay_date": r[1],
+                        "pay_day": r[2],
+                        "pay_month": r[3],
+                        "pay_year": r[4],
+                        "period_seq_in_year": r[5],
+                        "status": r[6],
+                        "closed_by": r[7],
+                        "transaction_count": r[8] or 0,
+                    }
+                    for r in rows
+                ]
+        else:
+            # Format simplifié pour employees.js
+            sql = """
+                SELECT period_id::text, TO_CHAR(pay_date, 'YYYY-MM-DD') AS date_str
+                FROM payroll.pay_periods
+                ORDER BY pay_date DESC
+                LIMIT 100
+            """
+            rows = self.repo.run_query(sql)
+            if rows:
+                return [{"id": r[0], "label": r[1], "date": r[1]} for r in rows]
+
+        # payroll.pay_periods vide: périodes déduites des transactions
+        return self._get_periods_from_transactions(filter_year)
+
+    def _get_periods_from_transactions(self, filter_year: Optional[int]) -> list:
+        """Périodes déduites de payroll_transactions (sans payroll.pay_periods)."""
         if filter_year:
             # Format détaillé depuis transactions
             sql = """
@@ -1262,6 +1339,10 @@ class PostgresProvider(AbstractDataProvider):
     ) -> dict:
         """
         Liste les employés avec filtres et pagination (accents ignorés).
+
+        filters["cursor"] présent (None = 1re page): pagination keyset sur
+        (nom sans accents, employee_id), page ignorée; la réponse contient
+        next_cursor. filters["count"]: "exact" | "estimate" | "none".
         """
         if not self.repo:
             return {"items": [], "total": 0}
@@ -1272,42 +1353,44 @@ class PostgresProvider(AbstractDataProvider):
         except Exception:
             page, page_size = 1, 10
 
-        offset = (page - 1) * page_size
-        params = []
+        filters = filters or {}
+        keyset = "cursor" in filters
+        cursor_values = decode_cursor(filters.get("cursor"))
+        count_mode = normalize_count_mode(
+            filters.get("count"), default_count_mode(keyset, cursor_values)
+        )
+
+        offset = 0 if keyset else (page - 1) * page_size
+        params: Dict[str, Any] = {}
         where = ["1=1"]
 
-        q = (filters or {}).get("q")
+        q = filters.get("q")
         if q:
-            params += [q, q]
+            params["q"] = q
             where.append(
                 """
                 (
-                  unaccent(lower(e.nom_complet)) LIKE unaccent(lower('%%' || %s || '%%'))
-                  OR e.matricule_norm ILIKE '%%' || %s || '%%'
+                  unaccent(lower(e.nom_complet)) LIKE unaccent(lower('%%' || %(q)s || '%%'))
+                  OR e.matricule_norm ILIKE '%%' || %(q)s || '%%'
                 )
             """
             )
 
-        status = (filters or {}).get("status")
+        status = filters.get("status")
         if status:
-            params.append(status)
-            where.append("e.statut = %s")
+            params["status"] = status
+            where.append("e.statut = %(status)s")
 
         where_sql = " AND ".join(where)
 
-        sql_base = f"""
-            FROM core.employees e
-            LEFT JOIN LATERAL (
-                SELECT MAX(t.pay_date) AS last_pay_date
-                FROM payroll.payroll_transactions t
-                WHERE t.employee_id = e.employee_id
-            ) act ON true
-            WHERE {where_sql}
-        """
+        # Le comptage ne dépend pas de la dernière paie: pas de LATERAL
+        total, total_estimated = count_rows(
+            self.repo, f"FROM core.employees e WHERE {where_sql}", params, count_mode
+        )
 
-        total = self.repo.run_query(
-            f"SELECT COUNT(*) {sql_base}", tuple(params), fetch_one=True
-        )[0]
+        keyset_sql, keyset_params = keyset_condition(
+            _EMPLOYEE_KEYS, cursor_values if keyset else None
+        )
 
         rows = (
             self.repo.run_query(
@@ -1318,16 +1401,30 @@ class PostgresProvider(AbstractDataProvider):
                 COALESCE(e.nom_complet, '') AS nom,
                 '' AS dept,
                 COALESCE(e.statut, 'actif') AS statut,
-                COALESCE(act.last_pay_date, NULL) AS last_pay_date
-            {sql_base}
-            ORDER BY unaccent(lower(e.nom_complet)) ASC, e.employee_id ASC
-            LIMIT %s OFFSET %s
+                COALESCE(act.last_pay_date, NULL) AS last_pay_date,
+                {", ".join(k.expr for k in _EMPLOYEE_KEYS)}
+            FROM core.employees e
+            LEFT JOIN LATERAL (
+                SELECT MAX(t.pay_date) AS last_pay_date
+                FROM payroll.payroll_transactions t
+                WHERE t.employee_id = e.employee_id
+            ) act ON true
+            WHERE {where_sql}
+              AND {keyset_sql}
+            ORDER BY {order_by_sql(_EMPLOYEE_KEYS)}
+            LIMIT %(limit)s OFFSET %(offset)s
         """,
-                tuple(params) + (page_size, offset),
+                {
+                    **params,
+                    **keyset_params,
+                    "limit": page_size + 1,
+                    "offset": offset,
+                },
                 fetch_all=True,
             )
             or []
         )
+        rows, next_cursor = split_page(list(rows), page_size, key_positions=(6, 7))
 
         items = []
         for r in rows:
@@ -1342,7 +1439,12 @@ class PostgresProvider(AbstractDataProvider):
                 }
             )
 
-        return {"items": items, "total": int(total)}
+        return {
+            "items": items,
+            "total": total,
+            "total_estimated": total_estimated,
+            "next_cursor": next_cursor,
+        }
 
     def get_employee_detail(self, employee_id: int) -> dict:
         """
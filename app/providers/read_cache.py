@@ -0,0 +1,209 @@
+"""
+Read Cache: cache LRU (+ TTL optionnel) des lectures du PostgresProvider
+
+Les endpoints de lecture (KPI, détails, graphiques, périodes) sont appelés à
+chaque changement d'onglet de l'UI alors que les données ne changent qu'au
+commit d'un import ou d'une suppression. Les résultats sont mis en cache par
+méthode + arguments normalisés, et invalidés explicitement par date de paie.
+
+Portée des entrées:
+- "scoped": liée à une date de paie (ex: get_kpis('2025-08-28'))
+- globale: dépend de toutes les dates (ex: get_periods, get_kpis(None))
+  → invalidée par toute invalidation
+
+Lecture concurrente d'une invalidation: cached_read relève la génération du
+cache avant la lecture; set() ignore le résultat si une invalidation est
+survenue entre-temps (valeur calculée sur des données périmées).
+
+Usage:
+    class Provider:
+        def __init__(self):
+            self.cache = ReadCache(maxsize=256, ttl_s=None)
+
+        @cached_read(scoped=True)
+        def get_kpis(self, pay_date=None): ...
+
+    provider.cache.invalidate('2025-08-28')  # après import / suppression
+    provider.cache.invalidate()              # tout vider
+"""
+
+import copy
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Optional
+
+
+class ReadCache:
+    """Cache LRU thread-safe avec TTL optionnel et invalidation par date de paie."""
+
+    def __init__(self, maxsize: int = 256, ttl_s: Optional[float] = None):
+        """
+        Args:
+            maxsize: Nombre maximal d'entrées (éviction LRU au-delà)
+            ttl_s: Durée de vie d'une entrée en secondes (None = sans expiration)
+        """
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        # clé -> (pay_date ou None si globale, expiration ou None, valeur)
+        self._entries: OrderedDict[tuple, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        # Incrémentée à chaque invalidation (cf. set)
+        self._generation = 0
+
+    def generation(self) -> int:
+        """Génération courante, à relever avant de calculer une valeur."""
+        with self._lock:
+            return self._generation
+
+    def get(self, key: tuple) -> tuple[bool, Any]:
+        """Retourne (trouvé, valeur); une entrée expirée compte comme un miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return True, copy.deepcopy(entry[2])
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return False, None
+
+    def set(
+        self,
+        key: tuple,
+        value: Any,
+        pay_date: Optional[str] = None,
+        generation: Optional[int] = None,
+    ) -> bool:
+        """
+        Stocke une valeur (copiée) rattachée à une date de paie ou globale.
+
+        Args:
+            generation: Génération relevée avant le calcul de la valeur; si
+                une invalidation a eu lieu depuis, la valeur n'est pas stockée
+
+        Returns:
+            True si la valeur a été stockée
+        """
+        expires = time.monotonic() + self.ttl_s if self.ttl_s else None
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._entries[key] = (pay_date, expires, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            return True
+
+    def invalidate(self, pay_date: Optional[str] = None) -> int:
+        """
+        Invalide les entrées d'une date de paie et toutes les entrées globales.
+
+        Args:
+            pay_date: Date YYYY-MM-DD; None vide tout le cache
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        with self._lock:
+            if pay_date is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                keys = [
+                    key
+                    for key, (scope, _, _) in self._entries.items()
+                    if scope is None or scope == pay_date
+                ]
+                for key in keys:
+                    del self._entries[key]
+                removed = len(keys)
+            self._invalidations += 1
+            self._generation += 1
+            return removed
+
+    def stats(self) -> dict[str, Any]:
+        """Compteurs pour get_db_stats."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl_s,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+
+def _freeze(value: Any) -> Any:
+    """Valeur d'argument -> forme hashable stable (dict/list via JSON trié)."""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return json.dumps(value, sort_keys=True, default=str)
+
+
+def cached_read(
+    scoped: bool = True,
+    cacheable: Optional[Callable[[Any], bool]] = None,
+) -> Callable:
+    """
+    Décorateur de méthode de provider: met en cache via self.cache (ReadCache).
+
+    La clé est (nom de méthode, arguments liés avec valeurs par défaut); le
+    paramètre pay_date est normalisé par self._normalize_pay_date.
+
+    Args:
+        scoped: True = entrée liée au pay_date de l'appel (globale si None)
+        cacheable: Prédicat sur le résultat; False = ne pas mettre en cache
+            (ex: repli mock après erreur)
+    """
+
+    def decorator(method: Callable) -> Callable:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache: Optional[ReadCache] = getattr(self, "cache", None)
+            if cache is None:
+                return method(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(list(bound.arguments.items())[1:])
+
+            pay_date = None
+            if arguments.get("pay_date"):
+                pay_date = self._normalize_pay_date(arguments["pay_date"])
+                arguments["pay_date"] = pay_date or arguments["pay_date"]
+
+            key = (method.__name__,) + tuple(
+                (name, _freeze(value)) for name, value in sorted(arguments.items())
+            )
+            found, value = cache.get(key)
+            if found:
+                return value
+
+            generation = cache.generation()
+            value = method(self, *args, **kwargs)
+            if cacheable is None or cacheable(value):
+                cache.set(key, value, pay_date if scoped else None, generation)
+            return value
+
+        return wrapper
+
+    return decorator
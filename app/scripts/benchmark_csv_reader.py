@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la lecture CSV des imports (services/csv_reader.py)
+
+Compare, sur un export de paie synthétique (1 000 000 lignes par défaut,
+séparateur ';', encodage cp1252, montants FR-CA, cellules vides):
+    ancien _parse_csv_robust    (boucle d'encodages, Sniffer, moteur C)
+    ancien aperçu CSV           (encodages × séparateurs, moteur python)
+    read_csv_fast               (détection une fois, pyarrow ou moteur C)
+
+Usage:
+    python scripts/benchmark_csv_reader.py
+    python scripts/benchmark_csv_reader.py --rows 200000 --skip-preview
+"""
+
+import argparse
+import csv
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.csv_reader import CSV_ENGINE, read_csv_fast
+
+NBSP = "\u00a0"
+
+
+def generer_csv(chemin: Path, nb_lignes: int, seed: int) -> None:
+    """Export synthétique au format des fichiers de paie (cp1252, ';')"""
+    rng = np.random.default_rng(seed)
+    nb_employes = max(1, nb_lignes // 150)
+    employes = rng.integers(1, 99999, nb_employes)
+    choix = rng.integers(0, nb_employes, nb_lignes)
+
+    montants = np.round(rng.uniform(-5000, 5000, nb_lignes), 2)
+    texte = pd.Series(montants).map(
+        lambda v: f"{v:,.2f}".replace(",", NBSP).replace(".", ",")
+    )
+    texte[rng.random(nb_lignes) < 0.03] = ""
+
+    pd.DataFrame(
+        {
+            "Matricule": employes[choix],
+            "Nom et prénom": [f"Employé {i}, Hélène" for i in choix],
+            "Date de paie": rng.choice(
+                ["2025-01-15", "2025-01-29", "2025-02-12"], nb_lignes
+            ),
+            "Catégorie de paie": rng.choice(["Gains", "Déductions"], nb_lignes),
+            "Code de paie": rng.choice([802, 101, 405, 999], nb_lignes),
+            "Poste budgétaire": rng.choice(
+                ["0-000-03270-000", "0-000-03273-000", ""], nb_lignes
+            ),
+            "Montant": texte,
+            "Part employeur": np.round(rng.uniform(0, 500, nb_lignes), 2),
+        }
+    ).to_csv(chemin, sep=";", index=False, encoding="cp1252")
+
+
+def ancien_import(chemin: Path) -> pd.DataFrame:
+    """Ancien ImportServiceComplete._parse_csv_robust (sans _clean_dataframe)"""
+    for encoding in ["utf-8-sig", "utf-8", "latin-1"]:
+        try:
+            with open(chemin, "r", encoding=encoding) as f:
+                sample = f.read(1024)
+                f.seek(0)
+                delimiter = csv.Sniffer().sniff(sample).delimiter
+                return pd.read_csv(f, encoding=encoding, delimiter=delimiter)
+        except Exception:
+            continue
+    raise ValueError("CSV illisible")
+
+
+def ancien_apercu(chemin: Path) -> pd.DataFrame:
+    """Ancienne lecture CSV de AppBridge.preview_import"""
+    with open(chemin, "rb") as f:
+        head = f.read(10000)
+    for enc in ("utf-8-sig", "utf-8", "latin1", "cp1252"):
+        try:
+            sample = head.decode(enc, errors="ignore")
+            sep = csv.Sniffer().sniff(sample, delimiters=",;\t").delimiter
+            df = pd.read_csv(chemin, sep=sep, encoding=enc, engine="python")
+            if df.shape[1] >= 3:
+                return df
+        except Exception:
+            pass
+    for enc in ("utf-8-sig", "utf-8", "latin1", "cp1252"):
+        for sep in (";", ",", "\t"):
+            try:
+                df = pd.read_csv(chemin, sep=sep, encoding=enc, engine="python")
+                if df.shape[1] >= 3:
+                    return df
+            except Exception:
+                pass
+    raise ValueError("CSV illisible")
+
+
+def chronometrer(fonction, chemin: Path) -> tuple[float, pd.DataFrame]:
+    debut = time.perf_counter()
+    df = fonction(chemin)
+    return time.perf_counter() - debut, df
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000000, help="Lignes générées")
+    parser.add_argument("--seed", type=int, default=42, help="Graine aléatoire")
+    parser.add_argument(
+        "--skip-preview",
+        action="store_true",
+        help="Ne pas mesurer l'ancien aperçu (moteur python, lent)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = Path(dossier) / "export_paie.csv"
+        generer_csv(chemin, args.rows, args.seed)
+        taille = chemin.stat().st_size / (1024 * 1024)
+
+        print("=" * 70)
+        print(f"LECTURE CSV ({args.rows} lignes, {taille:.0f} Mo, moteur {CSV_ENGINE})")
+        print("=" * 70)
+
+        mesures = [("Ancien import", *chronometrer(ancien_import, chemin))]
+        if not args.skip_preview:
+            mesures.append(("Ancien aperçu", *chronometrer(ancien_apercu, chemin)))
+        duree_fast, (df_fast, fmt) = chronometrer(read_csv_fast, chemin)
+
+    print(f"   Format détecté:       encoding={fmt.encoding}, sep='{fmt.delimiter}'")
+    for nom, duree, _ in mesures:
+        print(f"   {nom + ':':<22}{duree:.2f}s (x{duree / duree_fast:.1f})")
+    print(f"   {'read_csv_fast:':<22}{duree_fast:.2f}s")
+
+    erreurs = []
+    for nom, _, df in mesures:
+        if df.shape != df_fast.shape:
+            erreurs.append(f"{nom}: forme {df.shape} != {df_fast.shape}")
+        elif list(df.columns) != list(df_fast.columns):
+            erreurs.append(f"{nom}: colonnes différentes")
+        elif not df.isna().sum().equals(df_fast.isna().sum()):
+            erreurs.append(f"{nom}: cellules vides différentes")
+    for erreur in erreurs:
+        print(f"   ❌ {erreur}")
+
+    print("\n" + ("✅ Parité OK" if not erreurs else "❌ Écarts détectés"))
+    return 0 if not erreurs else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Benchmark et parité du mapping vectorisé d'ImportServiceComplete
+
+Compare, sur un fichier de paie synthétique (300 000 lignes par défaut,
+montants numériques et texte FR-CA, valeurs invalides, cellules vides):
+    _map_rows + _apply_sign_policy                          (ligne par ligne)
+    _map_rows_vectorise + _apply_sign_policy_vectorise      (par colonne)
+
+Les sign_policies sont servies par un dépôt en mémoire: aucune base requise.
+
+Usage:
+    python scripts/benchmark_map_rows.py
+    python scripts/benchmark_map_rows.py --rows 50000 --excel
+"""
+
+import argparse
+import logging
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.import_service_complete import ImportServiceComplete
+
+NBSP = "\u00a0"
+
+SIGN_POLICIES = [("802", -1, 1), ("101", 1, 1), ("405", -1, -1)]
+
+
+class SignPoliciesEnMemoire:
+    """Dépôt minimal: répond à la requête reference.sign_policies"""
+
+    def run_query(self, sql, params=None, fetch_one=False):
+        codes = set(params["pay_codes"])
+        return [p for p in SIGN_POLICIES if p[0] in codes]
+
+
+def montant_aleatoire(rng: random.Random):
+    choix = rng.random()
+    if choix < 0.03:
+        return None
+    if choix < 0.05:
+        return rng.choice(["", "abc", "n/d", "  "])
+    if choix < 0.75:
+        return round(rng.uniform(-5000, 5000), 2)
+    valeur = f"{rng.uniform(0, 9000):,.2f}".replace(",", NBSP).replace(".", ",")
+    return f"({valeur})" if rng.random() < 0.3 else valeur
+
+
+def generer_dataframe(nb_lignes: int, seed: int) -> pd.DataFrame:
+    """DataFrame tel que produit par _normalize_columns_fallback"""
+    rng = random.Random(seed)
+    nb_employes = max(1, nb_lignes // 150)
+    employes = [(rng.randint(1, 99999), f"Nom{i}, Prénom") for i in range(nb_employes)]
+    lignes = [employes[rng.randrange(nb_employes)] for _ in range(nb_lignes)]
+
+    df = pd.DataFrame(
+        {
+            "numero_ligne": range(nb_lignes),
+            "matricule": [m if rng.random() > 0.01 else f" {m} " for m, _ in lignes],
+            "nom_employe": [n if rng.random() > 0.02 else None for _, n in lignes],
+            "code_paie": [
+                rng.choice([802, 101, 405, 999, "101"]) for _ in range(nb_lignes)
+            ],
+            "poste_budgetaire": [
+                rng.choice(["0-000-03270-000", "0-000-03273-000", None])
+                for _ in range(nb_lignes)
+            ],
+            "montant_employe": [montant_aleatoire(rng) for _ in range(nb_lignes)],
+            "part_employeur": [montant_aleatoire(rng) for _ in range(nb_lignes)],
+        }
+    )
+    # Index avec trous, comme après suppression des lignes vides
+    return df[df["numero_ligne"] % 97 != 0]
+
+
+def cas_limites() -> dict[str, pd.DataFrame]:
+    """Petits fichiers: colonnes texte absentes, cellules None/NaN"""
+    return {
+        "sans code de paie": pd.DataFrame(
+            {
+                "matricule": [1001, 1002],
+                "nom_employe": ["Nom1, Prénom", "Nom2, Prénom"],
+                "montant_employe": [10.0, 20.0],
+            }
+        ),
+        "sans matricule": pd.DataFrame(
+            {"code_paie": ["101", 802], "montant_employe": ["1,00", None]}
+        ),
+        "cellules vides": pd.DataFrame(
+            {
+                "matricule": [None, np.nan, " 1003 ", 1004.0],
+                "code_paie": [np.nan, "101", None, " 405 "],
+                "nom_employe": [None, "Nom, Prénom", np.nan, ""],
+                "montant_employe": [1.0, 2.0, 3.0, 4.0],
+            }
+        ),
+    }
+
+
+def relire_via_excel(df: pd.DataFrame) -> pd.DataFrame:
+    """Écrit puis relit le DataFrame en .xlsx (types tels que rendus par Excel)"""
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = Path(dossier) / "paie_synthetique.xlsx"
+        df.to_excel(chemin, index=False)
+        return pd.read_excel(chemin, engine="openpyxl")
+
+
+def _normaliser(valeur):
+    if isinstance(valeur, float) and np.isnan(valeur):
+        return "NaN"
+    return valeur
+
+
+def comparer(ref: list[dict], vec: list[dict]) -> list:
+    ecarts = []
+    if len(ref) != len(vec):
+        return [("longueur", len(ref), len(vec))]
+    for pos, (a, b) in enumerate(zip(ref, vec)):
+        for cle in a.keys() | b.keys():
+            va, vb = _normaliser(a.get(cle)), _normaliser(b.get(cle))
+            if va != vb or type(va) is not type(vb):
+                ecarts.append((pos, cle, va, vb))
+    return ecarts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=300000, help="Lignes générées")
+    parser.add_argument("--seed", type=int, default=42, help="Graine aléatoire")
+    parser.add_argument(
+        "--excel", action="store_true", help="Passer par un vrai fichier .xlsx"
+    )
+    args = parser.parse_args()
+
+    # Le chemin ligne par ligne journalise chaque montant invalide
+    logging.getLogger("services.import_service_complete").setLevel(logging.ERROR)
+
+    service = ImportServiceComplete(SignPoliciesEnMemoire(), kpi_service=None)
+    pay_date = datetime(2025, 1, 15)
+
+    df = generer_dataframe(args.rows, args.seed)
+    if args.excel:
+        df = relire_via_excel(df)
+
+    print("=" * 70)
+    print(f"MAPPING + SIGN POLICY ({len(df)} lignes)")
+    print("=" * 70)
+
+    debut = time.perf_counter()
+    ref = service._apply_sign_policy(
+        service._map_rows(df, pay_date, "paie_synthetique.xlsx")
+    )
+    duree_ref = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    frame = service._apply_sign_policy_vectorise(
+        service._map_rows_vectorise(df, pay_date, "paie_synthetique.xlsx")
+    )
+    duree_calc = time.perf_counter() - debut
+    vec = service._frame_to_rows(frame)
+    duree_vec = time.perf_counter() - debut
+
+    ecarts = comparer(ref, vec)
+
+    # Cas limites: mêmes valeurs, et le champ obligatoire vide reste rejeté
+    for nom, petit in cas_limites().items():
+        ref_cas = service._map_rows(petit, pay_date, "cas.xlsx")
+        vec_cas = service._frame_to_rows(
+            service._map_rows_vectorise(petit, pay_date, "cas.xlsx")
+        )
+        ecarts += [
+            (f"{nom}: {pos}", cle, va, vb)
+            for pos, cle, va, vb in comparer(ref_cas, vec_cas)
+        ]
+        try:
+            service._validate_rows(service._apply_unsigned_cents(vec_cas))
+            ecarts.append((nom, "_validate_rows", "rejet", "accepté"))
+        except ImportError:
+            pass
+
+    print(f"   Ligne par ligne:      {duree_ref:.2f}s")
+    print(f"   Vectorisé:            {duree_calc:.2f}s")
+    print(f"   Vectorisé + list:     {duree_vec:.2f}s")
+    print(f"   Accélération:         x{duree_ref / duree_vec:.1f}")
+    print(f"   Écarts:               {len(ecarts)}")
+    for pos, cle, va, vb in ecarts[:10]:
+        print(f"   ❌ ligne {pos} {cle}: {va!r} != {vb!r}")
+
+    print("\n" + ("✅ Parité OK" if not ecarts else "❌ Écarts détectés"))
+    return 0 if not ecarts else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
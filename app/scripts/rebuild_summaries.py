@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Reconstruction des tables de synthèse paie (réparation)
+
+Les synthèses (v_monthly_payroll_summary, v_employee_current_salary,
+v_employee_annual_history) sont mises à jour de façon incrémentale à chaque
+import. Ce script les reconstruit entièrement, ou seulement pour certaines
+dates de paie.
+
+Usage:
+    python scripts/rebuild_summaries.py
+    python scripts/rebuild_summaries.py --pay-date 2025-08-28 --pay-date 2025-09-11
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.connection_standard import get_connection_pool
+from services.summary_tables import SummaryTablesService
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--pay-date",
+        action="append",
+        default=[],
+        help="Date de paie YYYY-MM-DD (répétable); sinon reconstruction complète",
+    )
+    args = parser.parse_args()
+
+    service = SummaryTablesService(get_connection_pool())
+
+    print("=" * 70)
+    if args.pay_date:
+        print(f"SYNTHÈSES - dates de paie {', '.join(args.pay_date)}")
+        timings = service.refresh_for_pay_dates(args.pay_date)
+    else:
+        print("SYNTHÈSES - reconstruction complète")
+        timings = service.rebuild_all()
+    print("=" * 70)
+
+    for view, duree in timings.items():
+        print(f"   ✅ {view}: {duree:.3f}s")
+
+    echecs = 3 - len(timings)
+    if echecs:
+        print(f"\n❌ {echecs} synthèse(s) en erreur (voir journal)")
+    return 0 if not echecs else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Vérification EXPLAIN: la recherche de paie utilise les index (migration 014)
+
+Pour chaque cas (préfixe, sous-chaîne, accents, filtres combinés), le plan
+de PayrollSearch.explain() est calculé avec enable_seqscan = off: un
+parcours séquentiel de imported_payroll_master ou l'absence de l'index
+attendu signifie que la condition générée n'est plus indexable.
+
+Usage:
+    python scripts/verifier_index_recherche.py
+    python scripts/verifier_index_recherche.py --verbose
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.connection_standard import get_connection_pool
+from services.payroll_search import PayrollSearch
+
+# (libellé, filtres, index attendus)
+CAS = [
+    ("matricule préfixe court", {"matricule": "12"}, ["idx_ipm_matricule_norm_prefix"]),
+    (
+        "matricule préfixe '*'",
+        {"matricule": "1234*"},
+        ["idx_ipm_matricule_norm_prefix"],
+    ),
+    ("matricule sous-chaîne", {"matricule": "2345"}, ["idx_ipm_matricule_norm_trgm"]),
+    (
+        "employé sous-chaîne accentuée",
+        {"employe": "Hélène"},
+        ["idx_ipm_employe_norm_trgm"],
+    ),
+    ("employé préfixe court", {"employe": "Lé"}, ["idx_ipm_employe_norm_prefix"]),
+    ("code sous-chaîne", {"code": "sal"}, ["idx_ipm_code_paie_norm_trgm"]),
+    (
+        "filtres combinés",
+        {"matricule": "2345", "employe": "tremblay"},
+        ["idx_ipm_matricule_norm_trgm", "idx_ipm_employe_norm_trgm"],
+    ),
+]
+
+TABLE = "imported_payroll_master"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--verbose", action="store_true", help="Afficher les plans")
+    args = parser.parse_args()
+
+    search = PayrollSearch(get_connection_pool())
+
+    print("=" * 70)
+    print("RECHERCHE PAIE - vérification des plans (EXPLAIN)")
+    print("=" * 70)
+
+    echecs = 0
+    for libelle, filtres, attendus in CAS:
+        resultat = search.explain(filtres)
+        # Au moins un des index attendus (le planificateur peut n'en
+        # combiner qu'une partie pour des filtres multiples)
+        ok = TABLE not in resultat["seq_scans"] and any(
+            index in resultat["index_names"] for index in attendus
+        )
+        echecs += 0 if ok else 1
+        print(
+            f"   {'✅' if ok else '❌'} {libelle}: {resultat['strategies']} "
+            f"→ {', '.join(resultat['index_names']) or 'aucun index'}"
+        )
+        if args.verbose or not ok:
+            print(json.dumps(resultat["plan"], indent=2, ensure_ascii=False))
+
+    if echecs:
+        print(f"\n❌ {echecs} cas sans parcours d'index")
+    return 0 if not echecs else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
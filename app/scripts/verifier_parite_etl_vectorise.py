@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Parité et performance des transformations vectorisées d'ETLPaie
+
+Compare, sur des données générées aléatoirement (montants avec parenthèses,
+espaces insécables, virgules décimales, symboles; dates multi-formats; noms
+accentués), les sorties de:
+    transformer_dataframe / valider_dataframe              (parseurs scalaires)
+    transformer_dataframe_vectorise / valider_dataframe_vectorise
+
+La parité est aussi vérifiée par la suite pytest
+(tests/test_etl_paie_vectorise.py); ce script mesure en plus l'accélération.
+
+Usage:
+    python scripts/verifier_parite_etl_vectorise.py
+    python scripts/verifier_parite_etl_vectorise.py --rows 500000 --seed 7
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.etl_paie import ETLPaie
+
+NBSP = "\u00a0"
+NNBSP = "\u202f"
+
+COLONNES_COMPAREES = [
+    "matricule",
+    "nom_prenom_norm",
+    "code_paie",
+    "montant_cents",
+    "part_employeur_cents",
+    "date_paie_parsed",
+    "is_valid",
+    "validation_errors",
+]
+
+
+def montant_aleatoire(rng: random.Random):
+    """Montant brut tel qu'on en trouve dans les exports de paie"""
+    choix = rng.random()
+    if choix < 0.05:
+        return None
+    if choix < 0.08:
+        return float("nan")
+    if choix < 0.25:
+        return round(rng.uniform(-5000, 5000), rng.choice([0, 1, 2, 3]))
+    if choix < 0.30:
+        return rng.randint(-1000, 1000)
+    if choix < 0.33:
+        return rng.choice(["", "  ", "abc", "12-34", "1_000", "nan", "--5", "CAD"])
+
+    valeur = rng.uniform(0, 250000)
+    entier = f"{int(valeur):,}"
+    decimales = f"{valeur % 1:.2f}"[1:]
+    style = rng.choice(["point", "virgule", "europe", "espace", "brut"])
+    if style == "point":
+        texte = entier.replace(",", "") + decimales
+    elif style == "virgule":
+        texte = entier.replace(",", "") + decimales.replace(".", ",")
+    elif style == "europe":
+        texte = entier.replace(",", ".") + decimales.replace(".", ",")
+    elif style == "espace":
+        sep = rng.choice([" ", NBSP, NNBSP])
+        texte = entier.replace(",", sep) + decimales.replace(".", ",")
+    else:
+        texte = f"{valeur}"
+
+    if rng.random() < 0.2:
+        texte = rng.choice(["$", "$ ", ""]) + texte + rng.choice(["", " $", " CA"])
+    if rng.random() < 0.2:
+        texte = f"({texte})"
+    if rng.random() < 0.1:
+        texte = f"  {texte} "
+    if rng.random() < 0.05:
+        texte = "-" + texte
+    return texte
+
+
+def date_aleatoire(rng: random.Random):
+    """Date brute (texte multi-formats, Timestamp, date, invalide)"""
+    choix = rng.random()
+    if choix < 0.05:
+        return None
+    d = date(2020, 1, 1) + pd.Timedelta(days=rng.randint(0, 2500))
+    if choix < 0.10:
+        return pd.Timestamp(d)
+    if choix < 0.13:
+        return d
+    if choix < 0.15:
+        return datetime(d.year, d.month, d.day, 8, 30)
+    if choix < 0.20:
+        return rng.choice(["", "31/02/2024", "2024-13-01", "hier", "45000", 45000])
+    fmt = rng.choice(["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%Y/%m/%d", None])
+    texte = d.strftime(fmt) if fmt else f"{d.year}-{d.month}-{d.day}"
+    if rng.random() < 0.1:
+        texte = f" {texte}  "
+    return texte
+
+
+def nom_aleatoire(rng: random.Random):
+    if rng.random() < 0.05:
+        return None
+    noms = ["Côté", "Gagnon", "Lévesque", "Bélanger", "Ōtsuka", "Müller", "Ørsted"]
+    prenoms = ["Élise", "François", "Zoë", "Jean-René", "Noël", "Chloé"]
+    return f" {rng.choice(noms)}, {rng.choice(prenoms)} "
+
+
+def matricule_aleatoire(rng: random.Random):
+    choix = rng.random()
+    if choix < 0.03:
+        return None
+    if choix < 0.05:
+        return ""
+    if choix < 0.10:
+        return rng.randint(0, 99999)
+    if choix < 0.15:
+        return "000"
+    return (
+        rng.choice(["", "0", "00"])
+        + str(rng.randint(1, 99999))
+        + rng.choice(["", "", "a", " "])
+    )
+
+
+def generer_dataframe(nb_lignes: int, seed: int) -> pd.DataFrame:
+    rng = random.Random(seed)
+    return pd.DataFrame(
+        {
+            "matricule": [matricule_aleatoire(rng) for _ in range(nb_lignes)],
+            "nom_prenom": [nom_aleatoire(rng) for _ in range(nb_lignes)],
+            "code_paie": [
+                rng.choice(["SAL", " 101 ", "", None, 205]) for _ in range(nb_lignes)
+            ],
+            "montant": [montant_aleatoire(rng) for _ in range(nb_lignes)],
+            "part_employeur": [montant_aleatoire(rng) for _ in range(nb_lignes)],
+            "date_paie": [date_aleatoire(rng) for _ in range(nb_lignes)],
+        }
+    )
+
+
+def generer_dataframe_realiste(
+    nb_lignes: int, seed: int, excel: bool = True
+) -> pd.DataFrame:
+    """
+    Export de paie type: peu d'employés et de dates
+
+    excel=True: colonnes typées comme les rend pd.read_excel (montants float,
+    dates datetime64); excel=False: montants et dates texte FR-CA (CSV).
+    """
+    rng = random.Random(seed)
+    nb_employes = max(1, nb_lignes // 150)
+    employes = [
+        (f"{rng.randint(1, 99999):06d}", nom_aleatoire(rng)) for _ in range(nb_employes)
+    ]
+    dates = ["2025-01-15", "2025-01-29"]
+    lignes = [employes[rng.randrange(nb_employes)] for _ in range(nb_lignes)]
+
+    def montant_fr() -> str:
+        valeur = f"{rng.uniform(0, 9000):,.2f}".replace(",", NBSP).replace(".", ",")
+        return f"({valeur})" if rng.random() < 0.3 else valeur
+
+    df = pd.DataFrame(
+        {
+            "matricule": [m for m, _ in lignes],
+            "nom_prenom": [n for _, n in lignes],
+            "code_paie": [rng.choice(["101", "SAL", "205"]) for _ in range(nb_lignes)],
+            "montant": [montant_fr() for _ in range(nb_lignes)],
+            "part_employeur": [montant_fr() for _ in range(nb_lignes)],
+            "date_paie": [rng.choice(dates) for _ in range(nb_lignes)],
+        }
+    )
+    if excel:
+        df["montant"] = [round(rng.uniform(-9000, 9000), 2) for _ in range(nb_lignes)]
+        df["part_employeur"] = [round(rng.uniform(0, 900), 2) for _ in range(nb_lignes)]
+        df["date_paie"] = pd.to_datetime(df["date_paie"])
+    return df
+
+
+def mesurer(etl: ETLPaie, df: pd.DataFrame) -> int:
+    """Chronomètre les deux chemins et retourne le nombre d'écarts"""
+    debut = time.perf_counter()
+    ref = etl.valider_dataframe(etl.transformer_dataframe(df))
+    duree_ref = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    vec = etl.valider_dataframe_vectorise(etl.transformer_dataframe_vectorise(df))
+    duree_vec = time.perf_counter() - debut
+
+    ecarts = comparer(ref, vec)
+
+    print(f"   Scalaire:  {duree_ref:.2f}s")
+    print(f"   Vectorisé: {duree_vec:.2f}s")
+    print(f"   Accélération: x{duree_ref / duree_vec:.1f}")
+    print(f"   Écarts: {len(ecarts)}")
+    return len(ecarts)
+
+
+def _normaliser(valeur):
+    """Uniformise les valeurs manquantes et les scalaires numpy pour comparaison"""
+    if isinstance(valeur, list):
+        return valeur
+    if valeur is None or (isinstance(valeur, float) and np.isnan(valeur)):
+        return None
+    if isinstance(valeur, np.generic):
+        return valeur.item()
+    return valeur
+
+
+def comparer(ref: pd.DataFrame, vec: pd.DataFrame) -> list:
+    ecarts = []
+    for col in COLONNES_COMPAREES:
+        a = [_normaliser(v) for v in ref[col].tolist()]
+        b = [_normaliser(v) for v in vec[col].tolist()]
+        for pos, (va, vb) in enumerate(zip(a, b)):
+            if va != vb:
+                ecarts.append((col, pos, va, vb))
+    return ecarts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000, help="Lignes générées")
+    parser.add_argument("--seed", type=int, default=42, help="Graine aléatoire")
+    parser.add_argument(
+        "--iterations", type=int, default=5, help="Jeux de données de parité"
+    )
+    args = parser.parse_args()
+
+    # Les parseurs scalaires journalisent chaque valeur invalide
+    logging.getLogger("services.etl_paie").setLevel(logging.ERROR)
+
+    etl = ETLPaie.__new__(ETLPaie)  # pas de connexion ni de YAML nécessaires
+
+    print("=" * 70)
+    print("PARITÉ TRANSFORMATIONS VECTORISÉES")
+    print("=" * 70)
+
+    total_ecarts = 0
+    for i in range(args.iterations):
+        df = generer_dataframe(2000, args.seed + i)
+        ref = etl.valider_dataframe(etl.transformer_dataframe(df))
+        vec = etl.valider_dataframe_vectorise(etl.transformer_dataframe_vectorise(df))
+        ecarts = comparer(ref, vec)
+        total_ecarts += len(ecarts)
+        for col, pos, va, vb in ecarts[:10]:
+            print(f"   ❌ {col}[{pos}] brut={df.iloc[pos].to_dict()} {va!r} != {vb!r}")
+        print(f"   Jeu {i + 1}: {len(ecarts)} écart(s)")
+
+    print("\n" + "=" * 70)
+    print(f"PERFORMANCE - export Excel type ({args.rows} lignes)")
+    print("=" * 70)
+    total_ecarts += mesurer(etl, generer_dataframe_realiste(args.rows, args.seed))
+
+    print("\n" + "=" * 70)
+    print(f"PERFORMANCE - export CSV texte ({args.rows} lignes)")
+    print("=" * 70)
+    total_ecarts += mesurer(
+        etl, generer_dataframe_realiste(args.rows, args.seed, excel=False)
+    )
+
+    print("\n" + "=" * 70)
+    print(f"PERFORMANCE - données aléatoires ({args.rows} lignes)")
+    print("=" * 70)
+    total_ecarts += mesurer(etl, generer_dataframe(args.rows, args.seed))
+
+    print("\n" + ("✅ Parité OK" if total_ecarts == 0 else "❌ Écarts détectés"))
+    return 0 if total_ecarts == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
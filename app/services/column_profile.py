@@ -0,0 +1,421 @@
+# services/column_profile.py
+# ========================================
+# PROFIL COLONNES PARTAGÉ (échantillon d'un fichier)
+# ========================================
+# Features par colonne calculées une fois par échantillon et partagées par
+# detect_types, schema_detector et ProfileManager.generate_fingerprint
+# Cache par signature des en-têtes + hash de l'échantillon
+
+import hashlib
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Any, Tuple
+
+# Import du parseur neutre depuis le module parsers
+from services.parsers import parse_amount_neutral, parse_date_robust
+
+
+# ========== UTILITAIRES FEATURES ==========
+
+
+def build_mask(value: str, allow_chars: List[str]) -> str:
+    """
+    Construit un masque pour une valeur
+
+    Mapping:
+        A = lettre (a-zA-Z)
+        9 = chiffre (0-9)
+        - = tiret littéral
+        _ = underscore littéral
+        . = point littéral
+        (autres) = préservés
+
+    Args:
+        value: Valeur à masquer
+        allow_chars: Caractères autorisés dans le masque
+
+    Returns:
+        str: Masque (ex: "A999-AA" pour "B123-CD")
+    """
+    mask = []
+    for c in str(value):
+        if c.isalpha():
+            mask.append("A" if "A" in allow_chars else c)
+        elif c.isdigit():
+            mask.append("9" if "9" in allow_chars else c)
+        elif c in allow_chars:
+            mask.append(c)
+        else:
+            mask.append(".")  # Wildcard pour caractères non attendus
+    return "".join(mask)
+
+
+def calculate_entropy(values: List[Any]) -> float:
+    """
+    Calcule l'entropie de Shannon d'une distribution
+
+    Args:
+        values: Liste de valeurs
+
+    Returns:
+        float: Entropie (0 = constant, >4 = très varié)
+    """
+    if not values:
+        return 0.0
+
+    counts = Counter(str(v) for v in values if v is not None)
+    total = sum(counts.values())
+
+    if total == 0:
+        return 0.0
+
+    entropy = 0.0
+    for count in counts.values():
+        p = count / total
+        if p > 0:
+            entropy -= p * math.log2(p)
+
+    return entropy
+
+
+def get_cardinality_stats(values: List[Any]) -> Dict[str, Any]:
+    """
+    Statistiques de cardinalité
+
+    Returns:
+        dict: {
+            "total": int,
+            "unique": int,
+            "unique_ratio": float,
+            "most_common_value": Any,
+            "most_common_count": int,
+            "most_common_ratio": float
+        }
+    """
+    non_null = [v for v in values if v is not None and str(v).strip() != ""]
+    total = len(non_null)
+
+    if total == 0:
+        return {
+            "total": 0,
+            "unique": 0,
+            "unique_ratio": 0.0,
+            "most_common_value": None,
+            "most_common_count": 0,
+            "most_common_ratio": 0.0,
+        }
+
+    counts = Counter(str(v) for v in non_null)
+    unique = len(counts)
+    most_common = counts.most_common(1)[0] if counts else (None, 0)
+
+    return {
+        "total": total,
+        "unique": unique,
+        "unique_ratio": unique / total,
+        "most_common_value": most_common[0],
+        "most_common_count": most_common[1],
+        "most_common_ratio": most_common[1] / total,
+    }
+
+
+# ========== FEATURES PARTAGÉES ==========
+
+# Regex des détecteurs, compilées une fois
+_DIGITS_RE = re.compile(r"\d+")
+_WORD_RE = re.compile(r"\w+")
+_ALPHA_RE = re.compile(r"[A-Za-z]+")
+
+
+def _distinct_counts(values: List[Any]) -> List[Tuple[Any, int]]:
+    """
+    (valeur, occurrences) par valeur distincte, dans l'ordre d'apparition.
+
+    La clé inclut le type: 1, 1.0 et True sont égaux en Python mais ne se
+    parsent pas forcément de la même façon.
+    """
+    counts: Dict[Any, list] = {}
+    unhashable = []
+    for v in values:
+        try:
+            entry = counts.get((type(v), v))
+        except TypeError:  # valeur non hashable
+            unhashable.append((v, 1))
+            continue
+        if entry is None:
+            counts[(type(v), v)] = [v, 1]
+        else:
+            entry[1] += 1
+    return [(v, n) for v, n in counts.values()] + unhashable
+
+
+class ColumnFeatures:
+    """
+    Caractéristiques d'une colonne, calculées une seule fois et partagées
+    par tous les détecteurs et validateurs (tous types confondus).
+
+    Chaque caractéristique est calculée à la première demande puis gardée;
+    les parseurs (dates, montants) et les regex ne sont appliqués qu'une fois
+    par valeur distincte.
+    """
+
+    def __init__(self, values: List[Any]):
+        self.values = values
+        # Valeurs non vides: brutes, str() et str().strip()
+        self.non_null: List[Any] = []
+        self.raw: List[str] = []
+        self.stripped: List[str] = []
+        for v in values:
+            if v is None:
+                continue
+            s = str(v)
+            stripped = s.strip()
+            if stripped:
+                self.non_null.append(v)
+                self.raw.append(s)
+                self.stripped.append(stripped)
+        self._cache: Dict[Any, Any] = {}
+
+    def _cached(self, key, compute):
+        try:
+            return self._cache[key]
+        except KeyError:
+            self._cache[key] = compute()
+            return self._cache[key]
+
+    @property
+    def stripped_counts(self) -> Counter:
+        """Occurrences de chaque valeur nettoyée (ordre d'apparition)."""
+        return self._cached("stripped_counts", lambda: Counter(self.stripped))
+
+    def _ratio_stripped(self, key, predicate) -> float:
+        """Part des valeurs nettoyées vérifiant predicate (une fois par distincte)."""
+
+        def compute():
+            if not self.stripped:
+                return 0.0
+            hits = sum(n for v, n in self.stripped_counts.items() if predicate(v))
+            return hits / len(self.stripped)
+
+        return self._cached(key, compute)
+
+    def _count_parsed(self, key, parser) -> int:
+        """Nombre de valeurs brutes non vides que parser accepte (non None)."""
+        return self._cached(
+            ("count", key),
+            lambda: sum(
+                n for v, n in _distinct_counts(self.non_null) if parser(v) is not None
+            ),
+        )
+
+    def _ratio_parsed(self, key, parser) -> float:
+        """Part des valeurs brutes non vides que parser accepte (non None)."""
+        if not self.non_null:
+            return 0.0
+        return self._count_parsed(key, parser) / len(self.non_null)
+
+    @property
+    def numeric_ratio(self) -> float:
+        return self._ratio_stripped("numeric", _DIGITS_RE.fullmatch)
+
+    @property
+    def comma_ratio(self) -> float:
+        def compute():
+            if not self.raw:
+                return 0.0
+            return sum(1 for v in self.raw if "," in v) / len(self.raw)
+
+        return self._cached("comma", compute)
+
+    @property
+    def date_ratio(self) -> float:
+        return self._ratio_parsed("date", parse_date_robust)
+
+    @property
+    def number_ratio(self) -> float:
+        return self._ratio_parsed("number", parse_amount_neutral)
+
+    # Les parseurs rejettent None et les chaînes vides: ces comptes valent
+    # aussi sur toutes les valeurs de la colonne
+    @property
+    def date_count(self) -> int:
+        return self._count_parsed("date", parse_date_robust)
+
+    @property
+    def number_count(self) -> int:
+        return self._count_parsed("number", parse_amount_neutral)
+
+    def pattern_ratio(self, pattern) -> float:
+        """Part des valeurs nettoyées en fullmatch du pattern (str ou compilé)."""
+        compiled = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern)
+        return self._ratio_stripped(("pattern", compiled), compiled.fullmatch)
+
+    @property
+    def text_counts(self) -> Counter:
+        """
+        Occurrences de str(v or "").strip() sur toutes les valeurs (None, 0
+        et chaînes vides → ""), convention de schema_detector.
+        """
+        return self._cached(
+            "text_counts",
+            lambda: Counter(str(v or "").strip() for v in self.values),
+        )
+
+    def text_pattern_ratio(self, pattern) -> float:
+        """Part de toutes les valeurs dont le texte (text_counts) est en fullmatch."""
+        compiled = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern)
+
+        def compute():
+            hits = sum(n for s, n in self.text_counts.items() if compiled.fullmatch(s))
+            return hits / max(1, len(self.values))
+
+        return self._cached(("text_pattern", compiled), compute)
+
+    @property
+    def token_stats(self) -> Tuple[int, int]:
+        """(tokens \\w+, tokens alphabétiques ASCII) sur les valeurs nettoyées."""
+
+        def compute():
+            total = alpha = 0
+            for v, n in self.stripped_counts.items():
+                tokens = _WORD_RE.findall(v)
+                total += len(tokens) * n
+                alpha += sum(1 for t in tokens if _ALPHA_RE.fullmatch(t)) * n
+            return total, alpha
+
+        return self._cached("tokens", compute)
+
+    @property
+    def avg_length(self) -> float:
+        def compute():
+            if not self.stripped:
+                return 0.0
+            return sum(len(v) for v in self.stripped) / len(self.stripped)
+
+        return self._cached("avg_length", compute)
+
+    def dominant_mask(self, allow: List[str]) -> Tuple[str, int]:
+        """Masque dominant (build_mask) et son nombre d'occurrences."""
+
+        def compute():
+            masks: Counter = Counter()
+            for v, n in self.stripped_counts.items():
+                masks[build_mask(v, allow)] += n
+            return masks.most_common(1)[0]
+
+        return self._cached(("mask", tuple(allow)), compute)
+
+    @property
+    def cardinality(self) -> Dict[str, Any]:
+        """get_cardinality_stats des valeurs (vides ignorées)."""
+        return self._cached("cardinality", lambda: get_cardinality_stats(self.non_null))
+
+    @property
+    def entropy_non_null(self) -> float:
+        return self._cached("entropy_non_null", lambda: calculate_entropy(self.raw))
+
+    @property
+    def entropy_all(self) -> float:
+        """calculate_entropy de toutes les valeurs (chaînes vides comprises)."""
+        return self._cached("entropy_all", lambda: calculate_entropy(self.values))
+
+
+def as_features(values) -> ColumnFeatures:
+    """ColumnFeatures tel quel, ou calculé pour une liste de valeurs."""
+    if isinstance(values, ColumnFeatures):
+        return values
+    return ColumnFeatures(values)
+
+
+def extract_columns(sample_data: List[List[Any]], n_cols: int) -> List[List[Any]]:
+    """Colonnes de l'échantillon (une seule passe; cellules manquantes → None)."""
+    columns: List[List[Any]] = [[] for _ in range(n_cols)]
+    for row in sample_data:
+        row_len = len(row)
+        for col_idx, column in enumerate(columns):
+            column.append(row[col_idx] if col_idx < row_len else None)
+    return columns
+
+
+# ========== PROFIL FICHIER ==========
+
+
+class FileProfile:
+    """
+    Échantillon d'un fichier (en-têtes + lignes) et ColumnFeatures de chaque
+    colonne. Les détecteurs qui reçoivent le même profil partagent les
+    parsings, regex et statistiques déjà calculés.
+    """
+
+    def __init__(self, headers: List[str], rows: List[List[Any]]):
+        self.headers = headers
+        self.rows = rows
+        self.columns = [ColumnFeatures(c) for c in extract_columns(rows, len(headers))]
+        self._fingerprint_patterns: Dict[int, List[str]] = {}
+
+    def fingerprint_patterns(self, n_rows: int = 10) -> List[str]:
+        """
+        "type dominant:longueur moyenne" par colonne, sur les n_rows premières
+        lignes (valeurs non None), pour ProfileManager.generate_fingerprint.
+        """
+        patterns = self._fingerprint_patterns.get(n_rows)
+        if patterns is not None:
+            return patterns
+
+        patterns = []
+        for features in self.columns:
+            col_values = features.values[:n_rows]
+            types = [type(v).__name__ for v in col_values if v is not None]
+            lengths = [len(str(v)) for v in col_values if v is not None]
+
+            avg_len = sum(lengths) / len(lengths) if lengths else 0
+            dominant_type = max(set(types), key=types.count) if types else "None"
+
+            patterns.append(f"{dominant_type}:{int(avg_len)}")
+
+        self._fingerprint_patterns[n_rows] = patterns
+        return patterns
+
+
+# Profils récents: clé = signature en-têtes + hash échantillon
+_PROFILE_CACHE: "OrderedDict[str, FileProfile]" = OrderedDict()
+_PROFILE_CACHE_MAX = 8
+_PROFILE_CACHE_LOCK = threading.Lock()
+
+
+def profile_key(headers: List[str], rows: List[List[Any]]) -> str:
+    """Signature des en-têtes + hash de l'échantillon (valeurs et types)."""
+    header_sig = hashlib.sha1(
+        "\x1f".join(headers).encode("utf-8", "backslashreplace")
+    ).hexdigest()
+    sample_hash = hashlib.sha1(
+        repr(rows).encode("utf-8", "backslashreplace")
+    ).hexdigest()
+    return f"{header_sig}:{sample_hash}"
+
+
+def build_profile(headers: List[Any], rows: List[List[Any]]) -> FileProfile:
+    """
+    FileProfile de l'échantillon, réutilisé si le même échantillon (mêmes
+    en-têtes, mêmes valeurs) a déjà été profilé.
+
+    Args:
+        headers: En-têtes des colonnes (convertis en str)
+        rows: Lignes de l'échantillon (sans la ligne d'en-têtes)
+    """
+    headers = [str(h) for h in headers]
+    key = profile_key(headers, rows)
+    with _PROFILE_CACHE_LOCK:
+        profile = _PROFILE_CACHE.get(key)
+        if profile is not None:
+            _PROFILE_CACHE.move_to_end(key)
+            return profile
+
+    profile = FileProfile(headers, rows)
+    with _PROFILE_CACHE_LOCK:
+        _PROFILE_CACHE[key] = profile
+        while len(_PROFILE_CACHE) > _PROFILE_CACHE_MAX:
+            _PROFILE_CACHE.popitem(last=False)
+    return profile
@@ -0,0 +1,199 @@
+"""
+CSV Reader: lecture rapide des exports CSV de paie (import et aperçu)
+
+Encodage et séparateur sont détectés une seule fois sur un échantillon
+d'octets du début du fichier, puis le fichier est lu en une passe:
+- pyarrow.csv (multithread, colonnes typées) quand pyarrow est installé
+- sinon moteur C de pandas
+
+Détection:
+- encodage: BOM UTF-8 → utf-8-sig, UTF-8 valide → utf-8, sinon cp1252
+  (exports Windows), latin-1 en dernier recours
+- l'échantillon peut être valide alors que la suite ne l'est pas (UTF-8 au
+  début, cp1252 plus loin): la lecture est alors reprise avec cp1252 puis
+  latin-1
+- séparateur: csv.Sniffer sur les premières lignes (';', ',', tab, '|'),
+  sinon le candidat le plus régulier d'une ligne à l'autre
+
+Usage:
+    df, fmt = read_csv_fast("export.csv")
+    print(fmt.encoding, fmt.delimiter)
+"""
+
+import codecs
+import csv
+import logging
+from collections import Counter
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    _HAS_ARROW = True
+except ImportError:
+    _HAS_ARROW = False
+
+CSV_ENGINE = "pyarrow" if _HAS_ARROW else "c"
+
+SAMPLE_BYTES = 64 * 1024
+SNIFF_LINES = 50
+DELIMITERS = ";,\t|"
+# Encodages de repli, essayés dans l'ordre après l'encodage détecté
+FALLBACK_ENCODINGS = ("cp1252", "latin-1")
+# Blocs lus par chaque thread pyarrow
+ARROW_BLOCK_BYTES = 4 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class CsvFormat:
+    """Format détecté d'un fichier CSV."""
+
+    encoding: str
+    delimiter: str
+
+
+def detect_csv_format(
+    file_path: str | Path, sample_bytes: int = SAMPLE_BYTES
+) -> CsvFormat:
+    """Encodage et séparateur, détectés sur les sample_bytes premiers octets."""
+    with open(file_path, "rb") as f:
+        sample = f.read(sample_bytes)
+    truncated = len(sample) == sample_bytes
+
+    encoding = _detect_encoding(sample, truncated)
+    text = codecs.getincrementaldecoder(encoding)(errors="replace").decode(sample)
+    lines = text.splitlines()
+    if truncated and len(lines) > 1:
+        lines = lines[:-1]  # dernière ligne coupée par l'échantillon
+    return CsvFormat(encoding, _detect_delimiter(lines[:SNIFF_LINES]))
+
+
+def read_csv_fast(
+    file_path: str | Path, fmt: Optional[CsvFormat] = None
+) -> tuple[pd.DataFrame, CsvFormat]:
+    """
+    Lit un CSV en une passe.
+
+    Args:
+        file_path: Chemin du fichier
+        fmt: Format déjà connu (sinon détecté)
+
+    Returns:
+        (DataFrame, format effectivement utilisé); colonnes nommées comme
+        pd.read_csv (en-têtes vides → 'Unnamed: i', doublons suffixés .1, .2)
+    """
+    fmt = fmt or detect_csv_format(file_path)
+
+    encodings = [fmt.encoding]
+    encodings += [e for e in FALLBACK_ENCODINGS if e not in encodings]
+    for encoding in encodings:
+        try:
+            df = _read_csv(file_path, encoding, fmt.delimiter)
+            break
+        except UnicodeDecodeError as e:
+            if encoding == encodings[-1]:
+                raise
+            logger.warning(
+                f"⚠️ CSV non décodable en {encoding} au-delà de l'échantillon "
+                f"({e.reason}), nouvel essai"
+            )
+    fmt = replace(fmt, encoding=encoding)
+
+    logger.info(
+        f"✓ CSV lu ({CSV_ENGINE}): {len(df)} lignes, encoding={fmt.encoding}, "
+        f"delimiter='{fmt.delimiter}'"
+    )
+    return df, fmt
+
+
+def _read_csv(file_path: str | Path, encoding: str, delimiter: str) -> pd.DataFrame:
+    """Lecture en une passe; UnicodeDecodeError si l'encodage ne convient pas."""
+    if not _HAS_ARROW:
+        return pd.read_csv(
+            file_path, sep=delimiter, encoding=encoding, engine="c", low_memory=False
+        )
+
+    table = pa_csv.read_csv(
+        str(file_path),
+        read_options=pa_csv.ReadOptions(
+            encoding=_arrow_encoding(encoding),
+            use_threads=True,
+            block_size=ARROW_BLOCK_BYTES,
+        ),
+        parse_options=pa_csv.ParseOptions(delimiter=delimiter),
+        # Cellules vides → NaN/None, comme pd.read_csv
+        convert_options=pa_csv.ConvertOptions(strings_can_be_null=True),
+    )
+    # UTF-8 invalide: pyarrow ne lève pas d'erreur mais type la colonne en
+    # binaire (valeurs bytes)
+    for name, type_ in zip(table.column_names, table.schema.types):
+        if pa.types.is_binary(type_) or pa.types.is_large_binary(type_):
+            raise UnicodeDecodeError(
+                encoding, b"", 0, 0, f"octets invalides dans la colonne {name!r}"
+            )
+    df = table.to_pandas(date_as_object=False)
+    df.columns = _pandas_column_names(table.column_names)
+    return df
+
+
+def _detect_encoding(sample: bytes, truncated: bool) -> str:
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # Décodeur incrémental: un caractère coupé en fin d'échantillon
+        # n'est pas une erreur
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=not truncated)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        sample.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def _detect_delimiter(lines: list[str]) -> str:
+    lines = [line for line in lines if line.strip()]
+    if not lines:
+        return ","
+    try:
+        return csv.Sniffer().sniff("\n".join(lines), delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        pass
+
+    # Repli: séparateur présent sur le plus de lignes avec le même nombre
+    # d'occurrences (le plus fréquent en cas d'égalité)
+    best, best_score = ",", (0, 0)
+    for delimiter in DELIMITERS:
+        counts = Counter(line.count(delimiter) for line in lines)
+        count, lines_with_count = counts.most_common(1)[0]
+        if count and (lines_with_count, count) > best_score:
+            best, best_score = delimiter, (lines_with_count, count)
+    return best
+
+
+def _arrow_encoding(encoding: str) -> str:
+    # pyarrow lit l'UTF-8 nativement (BOM ignoré); autres encodages transcodés
+    return "utf8" if encoding in ("utf-8", "utf-8-sig") else encoding
+
+
+def _pandas_column_names(names: list[str]) -> list[str]:
+    columns = []
+    seen: dict[str, int] = {}
+    for i, name in enumerate(names):
+        name = name if name.strip() else f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
@@ -10,6 +10,8 @@ Usage:
 
 import logging
 import os
+import threading
+import time
 from contextlib import contextmanager
 from typing import Any, Callable, Optional, Union
 
@@ -46,6 +48,14 @@ class DataRepository:
         self.pool: Optional[ConnectionPool] = None
         self.min_size = min_size
         self.max_size = max_size
+
+        # Métriques d'emprunt (get_connection), exposées par healthcheck()
+        self._metrics_lock = threading.Lock()
+        self._checkouts = 0
+        self._checkouts_active = 0
+        self._wait_s_total = 0.0
+        self._wait_s_max = 0.0
+
         self._init_pool()
 
     def _init_pool(self) -> None:
@@ -91,6 +101,11 @@ class DataRepository:
             self.pool.close()
             logger.info("Connection pool fermé")
 
+    @property
+    def closed(self) -> bool:
+        """True si le pool n'existe pas ou a été fermé."""
+        return self.pool is None or self.pool.closed
+
     @contextmanager
     def get_connection(self):
         """
@@ -103,12 +118,58 @@ class DataRepository:
         if not self.pool:
             raise RuntimeError("Connection pool non initialisé")
 
+        start = time.perf_counter()
         conn = self.pool.getconn()
+        wait = time.perf_counter() - start
+        with self._metrics_lock:
+            self._checkouts += 1
+            self._checkouts_active += 1
+            self._wait_s_total += wait
+            self._wait_s_max = max(self._wait_s_max, wait)
         try:
             yield conn
         finally:
+            with self._metrics_lock:
+                self._checkouts_active -= 1
             self.pool.putconn(conn)
 
+    def pool_metrics(self) -> dict[str, Any]:
+        """
+        Métriques du pool: taille, emprunts, attente, renouvellement des connexions.
+
+        Les compteurs d'emprunt sont mesurés par get_connection(); les
+        compteurs de connexions viennent de ConnectionPool.get_stats()
+        (cumulés depuis l'ouverture du pool).
+        """
+        if not self.pool:
+            return {}
+
+        stats = self.pool.get_stats()
+        with self._metrics_lock:
+            checkouts = self._checkouts
+            active = self._checkouts_active
+            wait_total = self._wait_s_total
+            wait_max = self._wait_s_max
+
+        return {
+            "size": stats.get("pool_size", 0),
+            "available": stats.get("pool_available", 0),
+            "min_size": stats.get("pool_min", self.min_size),
+            "max_size": stats.get("pool_max", self.max_size),
+            "checkouts": checkouts,
+            "checkouts_active": active,
+            "requests_waiting": stats.get("requests_waiting", 0),
+            "wait_ms_total": round(wait_total * 1000, 1),
+            "wait_ms_avg": (
+                round(wait_total * 1000 / checkouts, 2) if checkouts else 0.0
+            ),
+            "wait_ms_max": round(wait_max * 1000, 1),
+            "connections_opened": stats.get("connections_num", 0),
+            "connections_lost": stats.get("connections_lost", 0),
+            "connections_errors": stats.get("connections_errors", 0),
+            "returns_bad": stats.get("returns_bad", 0),
+        }
+
     def healthcheck(self) -> dict[str, Any]:
         """
         Vérifie la santé de la connexion DB.
@@ -123,17 +184,10 @@ class DataRepository:
                     result = cursor.fetchone()
 
                     if result and result[0] == 1:
-                        pool_stats = {}
-                        if self.pool:
-                            stats = self.pool.get_stats()
-                            pool_stats = {
-                                "size": stats.get("pool_size", 0),
-                                "available": stats.get("pool_available", 0),
-                            }
                         return {
                             "status": "ok",
                             "message": "Database connection healthy",
-                            "pool_stats": pool_stats,
+                            "pool_stats": self.pool_metrics(),
                         }
                     else:
                         return {
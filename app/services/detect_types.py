@@ -6,119 +6,25 @@
 # Support segments (changements structure en cours de fichier)
 
 import re
-import math
-from collections import Counter
 from typing import Dict, List, Any, Tuple, Optional
 
-# Import du parseur neutre depuis le module parsers
-from services.parsers import parse_amount_neutral, parse_date_robust
-
-
-# ========== UTILITAIRES FEATURES ==========
-
-
-def build_mask(value: str, allow_chars: List[str]) -> str:
-    """
-    Construit un masque pour une valeur
-
-    Mapping:
-        A = lettre (a-zA-Z)
-        9 = chiffre (0-9)
-        - = tiret littéral
-        _ = underscore littéral
-        . = point littéral
-        (autres) = préservés
-
-    Args:
-        value: Valeur à masquer
-        allow_chars: Caractères autorisés dans le masque
-
-    Returns:
-        str: Masque (ex: "A999-AA" pour "B123-CD")
-    """
-    mask = []
-    for c in str(value):
-        if c.isalpha():
-            mask.append("A" if "A" in allow_chars else c)
-        elif c.isdigit():
-            mask.append("9" if "9" in allow_chars else c)
-        elif c in allow_chars:
-            mask.append(c)
-        else:
-            mask.append(".")  # Wildcard pour caractères non attendus
-    return "".join(mask)
-
-
-def calculate_entropy(values: List[Any]) -> float:
-    """
-    Calcule l'entropie de Shannon d'une distribution
-
-    Args:
-        values: Liste de valeurs
-
-    Returns:
-        float: Entropie (0 = constant, >4 = très varié)
-    """
-    if not values:
-        return 0.0
-
-    counts = Counter(str(v) for v in values if v is not None)
-    total = sum(counts.values())
-
-    if total == 0:
-        return 0.0
-
-    entropy = 0.0
-    for count in counts.values():
-        p = count / total
-        if p > 0:
-            entropy -= p * math.log2(p)
-
-    return entropy
-
-
-def get_cardinality_stats(values: List[Any]) -> Dict[str, Any]:
-    """
-    Statistiques de cardinalité
-
-    Returns:
-        dict: {
-            "total": int,
-            "unique": int,
-            "unique_ratio": float,
-            "most_common_value": Any,
-            "most_common_count": int,
-            "most_common_ratio": float
-        }
-    """
-    non_null = [v for v in values if v is not None and str(v).strip() != ""]
-    total = len(non_null)
-
-    if total == 0:
-        return {
-            "total": 0,
-            "unique": 0,
-            "unique_ratio": 0.0,
-            "most_common_value": None,
-            "most_common_count": 0,
-            "most_common_ratio": 0.0,
-        }
-
-    counts = Counter(str(v) for v in non_null)
-    unique = len(counts)
-    most_common = counts.most_common(1)[0] if counts else (None, 0)
-
-    return {
-        "total": total,
-        "unique": unique,
-        "unique_ratio": unique / total,
-        "most_common_value": most_common[0],
-        "most_common_count": most_common[1],
-        "most_common_ratio": most_common[1] / total,
-    }
+# Features partagées (aussi utilisées par schema_detector et ProfileManager);
+# build_mask, calculate_entropy, etc. restent importables depuis ce module
+from services.column_profile import (  # noqa: F401
+    ColumnFeatures,
+    FileProfile,
+    as_features,
+    build_mask,
+    build_profile,
+    calculate_entropy,
+    extract_columns,
+    get_cardinality_stats,
+)
 
 
 # ========== DÉTECTEURS ==========
+# Chaque détecteur accepte une liste de valeurs ou un ColumnFeatures déjà
+# calculé (moteur detect_types: une instance par colonne pour tous les types)
 
 
 def detector_mask_dominance(values: List[Any], config: Dict) -> float:
@@ -134,23 +40,13 @@ def detector_mask_dominance(values: List[Any], config: Dict) -> float:
     coverage_min = config.get("coverage_min", 0.60)
     noise_max = config.get("noise_max", 0.15)
 
-    non_null = [
-        str(v).strip() for v in values if v is not None and str(v).strip() != ""
-    ]
-
-    if not non_null:
+    features = as_features(values)
+    if not features.stripped:
         return 0.0
 
-    # Construire masques
-    masks = [build_mask(v, allow) for v in non_null]
-    mask_counts = Counter(masks)
-
     # Masque dominant
-    if not mask_counts:
-        return 0.0
-
-    dominant_mask, dominant_count = mask_counts.most_common(1)[0]
-    coverage = dominant_count / len(non_null)
+    dominant_mask, dominant_count = features.dominant_mask(allow)
+    coverage = dominant_count / len(features.stripped)
     noise = 1.0 - coverage
 
     # Vérifier longueur masque dominant
@@ -174,16 +70,11 @@ def detector_all_numeric_ratio(values: List[Any], config: Dict) -> float:
     """
     min_ratio = config.get("min_ratio", 0.80)
 
-    non_null = [
-        str(v).strip() for v in values if v is not None and str(v).strip() != ""
-    ]
-
-    if not non_null:
+    features = as_features(values)
+    if not features.stripped:
         return 0.0
 
-    numeric_count = sum(1 for v in non_null if re.fullmatch(r"\d+", v))
-    ratio = numeric_count / len(non_null)
-
+    ratio = features.numeric_ratio
     return ratio if ratio >= min_ratio else ratio * 0.5
 
 
@@ -196,14 +87,11 @@ def detector_contains_comma_ratio(values: List[Any], config: Dict) -> float:
     """
     min_ratio = config.get("min_ratio", 0.45)
 
-    non_null = [str(v) for v in values if v is not None and str(v).strip() != ""]
-
-    if not non_null:
+    features = as_features(values)
+    if not features.raw:
         return 0.0
 
-    comma_count = sum(1 for v in non_null if "," in v)
-    ratio = comma_count / len(non_null)
-
+    ratio = features.comma_ratio
     return ratio if ratio >= min_ratio else ratio * 0.5
 
 
@@ -216,21 +104,7 @@ def detector_alpha_token_ratio(values: List[Any], config: Dict) -> float:
     """
     min_ratio = config.get("min_ratio", 0.80)
 
-    non_null = [
-        str(v).strip() for v in values if v is not None and str(v).strip() != ""
-    ]
-
-    if not non_null:
-        return 0.0
-
-    total_tokens = 0
-    alpha_tokens = 0
-
-    for v in non_null:
-        tokens = re.findall(r"\w+", v)
-        total_tokens += len(tokens)
-        alpha_tokens += sum(1 for t in tokens if re.fullmatch(r"[A-Za-z]+", t))
-
+    total_tokens, alpha_tokens = as_features(values).token_stats
     if total_tokens == 0:
         return 0.0
 
@@ -248,17 +122,15 @@ def detector_high_entropy_alpha(values: List[Any], config: Dict) -> float:
     min_entropy = config.get("min_entropy", 2.5)
     max_const_ratio = config.get("max_const_ratio", 0.25)
 
-    non_null = [v for v in values if v is not None and str(v).strip() != ""]
-
-    if not non_null:
+    features = as_features(values)
+    if not features.non_null:
         return 0.0
 
     # Entropie
-    entropy = calculate_entropy(non_null)
+    entropy = features.entropy_non_null
 
     # Ratio constante
-    card_stats = get_cardinality_stats(non_null)
-    const_ratio = card_stats["most_common_ratio"]
+    const_ratio = features.cardinality["most_common_ratio"]
 
     # Score composé
     entropy_score = min(1.0, entropy / min_entropy) if min_entropy > 0 else 0.0
@@ -276,14 +148,11 @@ def detector_date_parse_ratio(values: List[Any], config: Dict) -> float:
     """
     min_ratio = config.get("min_ratio", 0.70)
 
-    non_null = [v for v in values if v is not None and str(v).strip() != ""]
-
-    if not non_null:
+    features = as_features(values)
+    if not features.non_null:
         return 0.0
 
-    parsable_count = sum(1 for v in non_null if parse_date_robust(v) is not None)
-    ratio = parsable_count / len(non_null)
-
+    ratio = features.date_ratio
     return ratio if ratio >= min_ratio else ratio * 0.5
 
 
@@ -296,40 +165,32 @@ def detector_number_parse_ratio(values: List[Any], config: Dict) -> float:
     """
     min_ratio = config.get("min_ratio", 0.70)
 
-    non_null = [v for v in values if v is not None and str(v).strip() != ""]
-
-    if not non_null:
+    features = as_features(values)
+    if not features.non_null:
         return 0.0
 
-    parsable_count = sum(1 for v in non_null if parse_amount_neutral(v) is not None)
-    ratio = parsable_count / len(non_null)
-
+    ratio = features.number_ratio
     return ratio if ratio >= min_ratio else ratio * 0.5
 
 
 def detector_pattern_any(values: List[Any], config: Dict) -> float:
     """
-    Détecteur: match au moins un pattern regex
+    Détecteur: match au moins un pattern regex (str ou déjà compilé)
 
     Returns:
         float: Score 0.0-1.0 (max ratio parmi les patterns)
     """
     patterns = config.get("patterns", [])
 
-    non_null = [
-        str(v).strip() for v in values if v is not None and str(v).strip() != ""
-    ]
-
-    if not non_null or not patterns:
+    features = as_features(values)
+    if not features.stripped or not patterns:
         return 0.0
 
     max_ratio = 0.0
 
     for pattern in patterns:
         try:
-            match_count = sum(1 for v in non_null if re.fullmatch(pattern, v))
-            ratio = match_count / len(non_null)
-            max_ratio = max(max_ratio, ratio)
+            max_ratio = max(max_ratio, features.pattern_ratio(pattern))
         except re.error:
             continue
 
@@ -345,8 +206,7 @@ def detector_low_cardinality_hint(values: List[Any], config: Dict) -> float:
     """
     max_uniques_ratio = config.get("max_uniques_ratio", 0.15)
 
-    card_stats = get_cardinality_stats(values)
-    unique_ratio = card_stats["unique_ratio"]
+    unique_ratio = as_features(values).cardinality["unique_ratio"]
 
     if unique_ratio <= max_uniques_ratio:
         return 1.0 - (unique_ratio / max_uniques_ratio) * 0.5
@@ -364,14 +224,11 @@ def detector_avg_length_range(values: List[Any], config: Dict) -> float:
     min_len = config.get("min_len", 0)
     max_len = config.get("max_len", 1000)
 
-    non_null = [
-        str(v).strip() for v in values if v is not None and str(v).strip() != ""
-    ]
-
-    if not non_null:
+    features = as_features(values)
+    if not features.stripped:
         return 0.0
 
-    avg_len = sum(len(v) for v in non_null) / len(non_null)
+    avg_len = features.avg_length
 
     if min_len <= avg_len <= max_len:
         return 1.0
@@ -399,13 +256,13 @@ DETECTOR_FUNCTIONS = {
 }
 
 
-def run_detector(detector_config: Dict, values: List[Any]) -> float:
+def run_detector(detector_config: Dict, values) -> float:
     """
     Exécute un détecteur et retourne son score
 
     Args:
         detector_config: Configuration détecteur (kind + params)
-        values: Valeurs de la colonne
+        values: Valeurs de la colonne (ou ColumnFeatures)
 
     Returns:
         float: Score 0.0-1.0 (ou négatif si pénalité)
@@ -427,37 +284,114 @@ def run_detector(detector_config: Dict, values: List[Any]) -> float:
 # ========== VALIDATION ==========
 
 
-def run_validators(validator_configs: List[Dict], values: List[Any]) -> bool:
+def run_validators(validator_configs: List[Dict], values) -> bool:
     """
     Exécute les validateurs (filtres post-détection)
 
     Returns:
         bool: True si tous validateurs passent
     """
+    features = as_features(values)
+
     for validator in validator_configs:
         kind = validator.get("kind")
 
         if kind == "uniqueness_hint":
-            card_stats = get_cardinality_stats(values)
             min_ratio = validator.get("min_uniques_ratio", 0.30)
-            if card_stats["unique_ratio"] < min_ratio:
+            if features.cardinality["unique_ratio"] < min_ratio:
                 return False
 
         elif kind == "reject_constant":
-            card_stats = get_cardinality_stats(values)
             max_const = validator.get("max_const_ratio", 0.10)
-            if card_stats["most_common_ratio"] > max_const:
+            if features.cardinality["most_common_ratio"] > max_const:
                 return False
 
         elif kind == "high_entropy":
             min_ent = validator.get("min_entropy", 2.5)
-            entropy = calculate_entropy(values)
-            if entropy < min_ent:
+            if features.entropy_all < min_ent:
                 return False
 
     return True
 
 
+# ========== REGISTRE COMPILÉ ==========
+
+
+class CompiledRegistry:
+    """
+    Registre prêt pour le moteur: types visibles, priorités, et patterns
+    regex des détecteurs compilés une fois (patterns invalides écartés).
+
+    Le registre source n'est pas modifié: les détecteurs à patterns
+    reçoivent une copie de leur configuration.
+    """
+
+    def __init__(self, registry: Dict):
+        self.registry = registry
+        self.ui = registry.get("ui", {})
+        type_defs = registry.get("types", {})
+        self.types = {k: v for k, v in type_defs.items() if v.get("visible", True)}
+        self.detectors = {
+            name: [_compile_detector(d) for d in type_def.get("detectors", [])]
+            for name, type_def in self.types.items()
+        }
+        self.validators = {
+            name: type_def.get("validators", [])
+            for name, type_def in self.types.items()
+        }
+
+    def score(self, type_name: str, features: ColumnFeatures) -> float:
+        """Score d'un type pour une colonne (détecteurs + validateurs)."""
+        total_score = 0.0
+        for detector_config in self.detectors[type_name]:
+            total_score += run_detector(detector_config, features)
+
+        # Normaliser score (clamp 0-1, sauf pénalités)
+        total_score = max(-1.0, min(1.0, total_score))
+
+        # Valider
+        validators = self.validators[type_name]
+        if validators and not run_validators(validators, features):
+            total_score *= 0.3  # Pénalité forte si validation échoue
+
+        return total_score
+
+
+def _compile_detector(detector_config: Dict) -> Dict:
+    patterns = detector_config.get("patterns")
+    if not patterns:
+        return detector_config
+
+    compiled = []
+    for pattern in patterns:
+        try:
+            compiled.append(re.compile(pattern))
+        except (re.error, TypeError):
+            continue
+    return {**detector_config, "patterns": compiled}
+
+
+# Registres compilés récents, par identité du dict source
+_COMPILED_REGISTRIES: Dict[int, CompiledRegistry] = {}
+_COMPILED_REGISTRIES_MAX = 8
+
+
+def compile_registry(registry: Dict) -> CompiledRegistry:
+    """
+    CompiledRegistry du registre, réutilisé tant que le même dict est passé
+    (load_registry renvoie le même dict tant que le YAML ne change pas).
+    """
+    compiled = _COMPILED_REGISTRIES.get(id(registry))
+    if compiled is not None and compiled.registry is registry:
+        return compiled
+
+    compiled = CompiledRegistry(registry)
+    if len(_COMPILED_REGISTRIES) >= _COMPILED_REGISTRIES_MAX:
+        _COMPILED_REGISTRIES.pop(next(iter(_COMPILED_REGISTRIES)))
+    _COMPILED_REGISTRIES[id(registry)] = compiled
+    return compiled
+
+
 # ========== DÉTECTION SEGMENTS ==========
 
 
@@ -500,7 +434,8 @@ def detect_types(df, registry: Optional[Dict] = None) -> Dict:
     Détecte automatiquement les types de colonnes
 
     Args:
-        df: DataFrame pandas ou list[list]
+        df: DataFrame pandas, list[list] ou FileProfile déjà calculé
+            (build_profile) pour l'échantillon
         registry: Configuration depuis schema_registry.yaml (optionnel, chargé automatiquement si None)
 
     Returns:
@@ -544,16 +479,20 @@ def detect_types(df, registry: Optional[Dict] = None) -> Dict:
         is_pandas = False
         pd = None
 
-    if is_pandas:
-        headers = [str(h) for h in df.columns]
-        sample_size = registry["ui"].get("sample_rows", 200)
-        sample_data = df.head(sample_size).values.tolist()
+    # Profil de l'échantillon: partagé avec schema_detector et ProfileManager
+    # quand ils analysent le même échantillon (cache build_profile)
+    sample_size = registry["ui"].get("sample_rows", 200)
+    if isinstance(df, FileProfile):
+        profile = df
+    elif is_pandas:
+        profile = build_profile(df.columns, df.head(sample_size).values.tolist())
     else:
         if not df or len(df) == 0:
             return {"segments": [], "global_suggestion": {}, "notes": ["Fichier vide"]}
-        headers = [str(h) for h in df[0]]
-        sample_size = registry["ui"].get("sample_rows", 200)
-        sample_data = df[1 : min(len(df), 1 + sample_size)]
+        profile = build_profile(df[0], df[1 : min(len(df), 1 + sample_size)])
+
+    headers = profile.headers
+    sample_data = profile.rows
 
     n_cols = len(headers)
 
@@ -562,42 +501,22 @@ def detect_types(df, registry: Optional[Dict] = None) -> Dict:
 
     # ========== EXTRACTION TYPES DU REGISTRE ==========
 
+    compiled = compile_registry(registry)
     type_defs = registry.get("types", {})
-    visible_types = {k: v for k, v in type_defs.items() if v.get("visible", True)}
+    visible_types = compiled.types
 
     # ========== CALCUL SCORES PAR COLONNE ==========
 
-    scores_matrix = {}  # scores_matrix[type_name][col_idx] = score
-
-    for type_name, type_def in visible_types.items():
-        scores_matrix[type_name] = [0.0] * n_cols
-
-        for col_idx in range(n_cols):
-            # Extraire valeurs colonne
-            col_values = []
-            for row in sample_data:
-                if col_idx < len(row):
-                    col_values.append(row[col_idx])
-                else:
-                    col_values.append(None)
-
-            # Exécuter détecteurs
-            detectors = type_def.get("detectors", [])
-            total_score = 0.0
+    # Features calculées une fois par colonne (profil), partagées par tous
+    # les types
+    features = profile.columns
 
-            for detector_config in detectors:
-                score = run_detector(detector_config, col_values)
-                total_score += score
-
-            # Normaliser score (clamp 0-1, sauf pénalités)
-            total_score = max(-1.0, min(1.0, total_score))
-
-            # Valider
-            validators = type_def.get("validators", [])
-            if validators and not run_validators(validators, col_values):
-                total_score *= 0.3  # Pénalité forte si validation échoue
+    scores_matrix = {}  # scores_matrix[type_name][col_idx] = score
 
-            scores_matrix[type_name][col_idx] = total_score
+    for type_name in visible_types:
+        scores_matrix[type_name] = [
+            compiled.score(type_name, col_features) for col_features in features
+        ]
 
     # ========== ASSIGNATION GREEDY PAR PRIORITÉ ==========
 
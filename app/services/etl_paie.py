@@ -22,6 +22,7 @@ Règles:
 
 Usage:
     python services/etl_paie.py --file data/inbox/Classeur1.xlsx --date-paie 2025-10-15
+    python services/etl_paie.py --file data/inbox/Classeur1.xlsx --compare-staging
 
 Author: Équipe Analytics
 Date: 2025-10-21
@@ -32,15 +33,25 @@ import hashlib
 import logging
 import re
 import sys
+import time
 import unicodedata
 from dataclasses import dataclass
 from datetime import date, datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import yaml
 
+try:
+    import pyarrow  # noqa: F401
+
+    # Opérations .str exécutées par les noyaux Arrow (C++) plutôt qu'en Python
+    _DTYPE_TEXTE: Any = pd.StringDtype("pyarrow")
+except ImportError:
+    _DTYPE_TEXTE = object
+
 from config.connection_standard import get_dsn, open_connection
 
 # Logging
@@ -55,6 +66,44 @@ CONFIG_DIR = BASE_DIR / "config"
 MAPPING_FILE = CONFIG_DIR / "mapping_entetes.yml"
 KPI_CATALOG_FILE = CONFIG_DIR / "kpi_catalog.yml"
 
+# Formats de date texte acceptés (ordre de priorité)
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%Y/%m/%d")
+
+# Caractères pour lesquels str.isspace() est vrai (ceux de str.strip() et du
+# \s de re): explicites car le \s des regex Arrow (RE2) ne couvre que l'ASCII
+ESPACES = (
+    "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680"
+    "\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+    "\u2028\u2029\u202f\u205f\u3000"
+)
+
+# Modes de chargement staging
+STAGING_MODE_ROW = "row"  # Un INSERT par ligne (historique)
+STAGING_MODE_BULK = "bulk"  # Un COPY pour tout le DataFrame
+STAGING_MODES = (STAGING_MODE_ROW, STAGING_MODE_BULK)
+
+# Colonnes alimentées dans paie.stg_paie_transactions (ordre COPY)
+STAGING_COLUMNS = (
+    "source_batch_id",
+    "source_file",
+    "source_row_number",
+    "date_paie_raw",
+    "matricule_raw",
+    "nom_prenom_raw",
+    "code_paie_raw",
+    "montant_raw",
+    "part_employeur_raw",
+    "date_paie",
+    "matricule",
+    "nom_prenom",
+    "code_paie",
+    "montant_cents",
+    "part_employeur_cents",
+    "is_valid",
+    "validation_errors",
+    "processed_at",
+)
+
 
 # ============================================================================
 # DATACLASSES
@@ -89,6 +138,60 @@ class ImportBatch:
     created_by: str = "etl_paie.py"
 
 
+def _est_colonne_texte(serie: pd.Series) -> bool:
+    """True pour une colonne object ou chaîne (dtype "str" de pandas >= 3)"""
+    return pd.api.types.is_string_dtype(serie.dtype)
+
+
+def _via_valeurs_distinctes(serie: pd.Series, fonction) -> pd.Series:
+    """
+    Applique un parseur vectorisé aux seules valeurs distinctes d'une colonne texte
+
+    Une colonne de paie répète massivement ses valeurs (date de paie, matricule,
+    nom...): on factorise, on parse les valeurs distinctes, puis on rediffuse
+    le résultat. Réservé aux colonnes purement texte (1, 1.0 et True seraient
+    confondus par la factorisation).
+    """
+    if not _est_colonne_texte(serie) or (
+        pd.api.types.infer_dtype(serie, skipna=True) != "string"
+    ):
+        return fonction(serie)
+
+    codes, distinctes = pd.factorize(serie)
+    if len(distinctes) * 2 > len(serie):
+        return fonction(serie)
+
+    # Dernière position = valeur manquante (code -1 de factorize)
+    resultats = fonction(pd.Series(list(distinctes) + [None], dtype=object))
+    codes[codes == -1] = len(distinctes)
+    return pd.Series(
+        resultats.to_numpy().take(codes), index=serie.index, dtype=resultats.dtype
+    )
+
+
+def _masque_textes(serie: pd.Series) -> np.ndarray:
+    """Masque des cellules texte (str) d'une colonne"""
+    if isinstance(serie.dtype, pd.StringDtype):
+        return serie.notna().to_numpy(dtype=bool, copy=True)
+    if not _est_colonne_texte(serie):
+        return np.zeros(len(serie), dtype=bool)
+    return np.fromiter(
+        (isinstance(v, str) for v in serie.to_numpy(dtype=object)),
+        dtype=bool,
+        count=len(serie),
+    )
+
+
+def _is_missing(value: Any) -> bool:
+    """True si la valeur est un scalaire manquant (None, NaN, NaT)"""
+    if isinstance(value, (list, tuple)):
+        return False
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
 # ============================================================================
 # CLASSE ETL PRINCIPALE
 # ============================================================================
@@ -99,15 +202,20 @@ class ETLPaie:
     ETL pour import de fichiers paie dans le schéma en étoile
     """
 
-    def __init__(self, conn_string: str):
+    def __init__(self, conn_string: str, staging_mode: str = STAGING_MODE_BULK):
         """
         Initialise l'ETL
 
         Args:
             conn_string: Chaîne de connexion PostgreSQL
+            staging_mode: "bulk" (COPY, défaut) ou "row" (INSERT par ligne)
         """
+        if staging_mode not in STAGING_MODES:
+            raise ValueError(f"Mode staging inconnu: {staging_mode}")
+
         self.conn_string = conn_string
         self.conn = None
+        self.staging_mode = staging_mode
         self.mapping_config = self._load_mapping_config()
         self.kpi_catalog = self._load_kpi_catalog()
         self.code_paie_catalog = self._build_code_paie_catalog()
@@ -379,7 +487,7 @@ class ETLPaie:
         s = str(value).strip()
 
         # Tenter formats courants
-        for fmt in ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%Y/%m/%d"]:
+        for fmt in DATE_FORMATS:
             try:
                 return datetime.strptime(s, fmt).date()
             except ValueError:
@@ -443,6 +551,237 @@ class ETLPaie:
         logger.info("✓ Transformations appliquées")
         return df_transformed
 
+    # ------------------------------------------------------------------------
+    # Équivalents vectorisés (mêmes résultats que les parseurs scalaires)
+    # ------------------------------------------------------------------------
+    # Chaque parseur traite la colonne entière avec des opérations pandas
+    # (.str, to_numeric, to_datetime). Les rares cellules que le chemin
+    # vectorisé ne sait pas trancher sont repassées au parseur scalaire, ce
+    # qui garantit des résultats identiques.
+
+    def normaliser_matricule_serie(self, serie: pd.Series) -> pd.Series:
+        """Version vectorisée de normaliser_matricule"""
+        result = pd.Series(None, index=serie.index, dtype=object)
+        present = serie.notna().to_numpy()
+        if not present.any():
+            return result
+
+        s = serie[present].astype(str).str.strip()
+        numerique = s.str.isdigit()
+        sans_zeros = s.str.lstrip("0").replace("", "0")
+        s = s.where(~numerique, sans_zeros)
+
+        result[present] = s.str.upper().to_numpy()
+        return result
+
+    def normaliser_nom_serie(self, serie: pd.Series) -> pd.Series:
+        """Version vectorisée de normaliser_nom"""
+        result = pd.Series(None, index=serie.index, dtype=object)
+        present = serie.notna().to_numpy()
+        if not present.any():
+            return result
+
+        result[present] = (
+            serie[present]
+            .astype(str)
+            .str.strip()
+            .str.normalize("NFKD")
+            .str.encode("ascii", "ignore")
+            .str.decode("ascii")
+            .to_numpy()
+        )
+        return result
+
+    def parser_montant_serie(self, serie: pd.Series) -> pd.Series:
+        """
+        Version vectorisée de parser_montant (cents int64, 0 si NULL)
+
+        Étapes: valeurs déjà numériques → to_numeric direct; textes →
+        parenthèses, symboles, espaces (dont insécables), virgule décimale
+        via .str (noyaux Arrow si pyarrow est installé), puis to_numeric.
+        """
+        cents = np.zeros(len(serie), dtype=np.int64)
+        if len(serie) == 0:
+            return pd.Series(cents, index=serie.index)
+
+        if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(
+            serie
+        ):
+            valeurs = serie.to_numpy(dtype=float, na_value=np.nan, copy=True)
+            a_traiter = np.zeros(len(serie), dtype=bool)
+            a_parser = np.zeros(len(serie), dtype=bool)
+        else:
+            # Textes: nettoyage ci-dessous, comme dans parser_montant (aucun
+            # to_numeric préalable voué à l'échec); autres valeurs: to_numeric
+            present = serie.notna().to_numpy()
+            a_parser = _masque_textes(serie)
+            valeurs = np.full(len(serie), np.nan)
+            autres = present & ~a_parser
+            if autres.any():
+                valeurs[autres] = pd.to_numeric(
+                    serie[autres], errors="coerce"
+                ).to_numpy(dtype=float, na_value=np.nan)
+            a_traiter = present & np.isnan(valeurs)
+
+        # Textes non numériques tels quels: nettoyage vectorisé. Même séquence
+        # que parser_montant, mais chaque étape ne touche que les lignes
+        # concernées (parenthèses, "C" de CA/CAD, virgule).
+        if a_parser.any():
+            raw = pd.Series(
+                serie.to_numpy(dtype=object)[a_parser], dtype=_DTYPE_TEXTE
+            ).str.strip(ESPACES)
+
+            negatif = (raw.str.startswith("(") & raw.str.endswith(")")).to_numpy(
+                dtype=bool
+            )
+            if negatif.any():
+                raw[negatif] = raw[negatif].str[1:-1].str.strip(ESPACES)
+
+            avec_c = raw.str.contains("C", regex=False).to_numpy(dtype=bool)
+            if avec_c.any():
+                raw[avec_c] = (
+                    raw[avec_c]
+                    .str.replace("$", "", regex=False)
+                    .str.replace("CA", "", regex=False)
+                    .str.replace("CAD", "", regex=False)
+                )
+            # "$" puis espaces (dont U+00A0 et U+202F)
+            raw = raw.str.replace(f"[{ESPACES}$]+", "", regex=True)
+
+            virgule = raw.str.contains(",", regex=False).to_numpy(dtype=bool)
+            if virgule.any():
+                point = np.zeros(len(raw), dtype=bool)
+                point[virgule] = raw[virgule].str.contains(".", regex=False)
+                seule = virgule & ~point
+                raw[seule] = raw[seule].str.replace(",", ".", regex=False)
+                # Les deux présents: point = milliers, virgule = décimal
+                deux = virgule & point
+                raw[deux] = (
+                    raw[deux]
+                    .str.replace(".", "", regex=False)
+                    .str.replace(",", ".", regex=False)
+                )
+
+            vides = (raw == "").to_numpy(dtype=bool)
+            parsees = pd.to_numeric(raw, errors="coerce").to_numpy(
+                dtype=float, na_value=np.nan
+            )
+            parsees = np.where(negatif, -parsees, parsees)
+
+            idx = np.flatnonzero(a_parser)
+            valeurs[idx] = np.where(vides, 0.0, parsees)
+            a_traiter[idx[~np.isnan(valeurs[idx])]] = False
+
+        # Valeurs non finies: laissées au parseur scalaire
+        a_traiter |= np.isinf(valeurs)
+
+        ok = ~np.isnan(valeurs) & ~a_traiter
+        cents[ok] = np.rint(valeurs[ok] * 100).astype(np.int64)
+
+        if a_traiter.any():
+            brutes = serie.to_numpy(dtype=object)
+            for pos in np.flatnonzero(a_traiter):
+                montant = self.parser_montant(brutes[pos])
+                cents[pos] = 0 if montant is None else montant
+
+        return pd.Series(cents, index=serie.index)
+
+    def parser_date_serie(self, serie: pd.Series) -> pd.Series:
+        """
+        Version vectorisée de parser_date (objets date, None si invalide)
+
+        Les textes sont essayés avec to_datetime pour chaque format de la liste
+        explicite, dans le même ordre que parser_date.
+        """
+        dates = np.full(len(serie), None, dtype=object)
+        present = serie.notna().to_numpy()
+
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            if getattr(serie.dt, "tz", None) is not None:
+                serie = serie.dt.tz_localize(None)
+            dates[present] = serie[present].dt.date.to_numpy()
+            return pd.Series(dates, index=serie.index, dtype=object)
+
+        # Textes: chaque valeur distincte n'est parsée qu'une fois
+        texte = _masque_textes(serie)
+        if texte.any():
+            textes = pd.Series(
+                serie.to_numpy(dtype=object)[texte], dtype=_DTYPE_TEXTE
+            ).str.strip(ESPACES)
+            codes, distinctes = pd.factorize(textes)
+            dates[texte] = self._parser_dates_texte(distinctes).take(codes)
+
+        # Cellules non-texte (Timestamp, date, nombres...): parseur scalaire
+        restant = present & ~texte
+
+        if restant.any():
+            brutes = serie.to_numpy(dtype=object)
+            for pos in np.flatnonzero(restant):
+                dates[pos] = self.parser_date(brutes[pos])
+
+        return pd.Series(dates, index=serie.index, dtype=object)
+
+    def _parser_dates_texte(self, textes) -> np.ndarray:
+        """Dates de textes distincts: formats DATE_FORMATS, puis parseur scalaire"""
+        textes = pd.Series(textes, dtype=object)
+        dates = np.full(len(textes), None, dtype=object)
+        restant = np.ones(len(textes), dtype=bool)
+        for fmt in DATE_FORMATS:
+            positions = np.flatnonzero(restant)
+            if len(positions) == 0:
+                break
+            parsees = pd.to_datetime(
+                textes.iloc[positions], format=fmt, errors="coerce"
+            )
+            trouvees = parsees.notna().to_numpy()
+            if trouvees.any():
+                dates[positions[trouvees]] = parsees[trouvees].dt.date.to_numpy()
+                restant[positions[trouvees]] = False
+
+        # Textes invalides pour to_datetime (ex: "2024-1-5" accepté par strptime)
+        for pos in np.flatnonzero(restant):
+            dates[pos] = self.parser_date(textes.iloc[pos])
+        return dates
+
+    def transformer_dataframe_vectorise(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Version vectorisée de transformer_dataframe (mêmes colonnes produites)
+
+        Args:
+            df: DataFrame après mapping colonnes
+
+        Returns:
+            DataFrame transformé
+        """
+        logger.info("Application des transformations (vectorisées)...")
+
+        df_transformed = df.copy()
+
+        colonnes = [
+            ("matricule", "matricule", self.normaliser_matricule_serie),
+            ("nom_prenom", "nom_prenom_norm", self.normaliser_nom_serie),
+            ("montant", "montant_cents", self.parser_montant_serie),
+            ("part_employeur", "part_employeur_cents", self.parser_montant_serie),
+            ("date_paie", "date_paie_parsed", self.parser_date_serie),
+        ]
+        for source, cible, parseur in colonnes:
+            if source in df_transformed.columns:
+                df_transformed[cible] = _via_valeurs_distinctes(
+                    df_transformed[source], parseur
+                )
+
+        if "part_employeur" not in df_transformed.columns:
+            df_transformed["part_employeur_cents"] = 0
+
+        # Code paie (convertir en string si numérique)
+        if "code_paie" in df_transformed.columns:
+            df_transformed["code_paie"] = (
+                df_transformed["code_paie"].astype(str).str.strip()
+            )
+
+        logger.info("✓ Transformations appliquées")
+        return df_transformed
+
     # ========================================================================
     # ÉTAPE 4: Validation
     # ========================================================================
@@ -514,6 +853,75 @@ class ETLPaie:
 
         return df
 
+    def valider_dataframe_vectorise(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Version vectorisée de valider_dataframe (mêmes règles que valider_ligne)
+
+        Chaque règle produit un masque booléen; validation_errors est construit
+        à partir des masques, dans l'ordre des règles de valider_ligne.
+        """
+        logger.info("Validation des données (vectorisée)...")
+
+        n = len(df)
+
+        def manquant(name: str) -> np.ndarray:
+            # pd.isna(row.get(name))
+            if name not in df.columns:
+                return np.ones(n, dtype=bool)
+            return df[name].isna().to_numpy()
+
+        def faux(name: str) -> np.ndarray:
+            # not row.get(name) (NaN est "vrai" en Python, None/""/0 sont faux)
+            if name not in df.columns:
+                return np.ones(n, dtype=bool)
+            valeurs = df[name].to_numpy(dtype=object)
+            return (valeurs == None) | (valeurs == "") | (valeurs == 0)  # noqa: E711
+
+        regles = [
+            (manquant("date_paie_parsed"), "DATE_PAIE_MANQUANTE"),
+            (faux("matricule"), "MATRICULE_MANQUANT"),
+            (faux("code_paie"), "CODE_PAIE_MANQUANT"),
+            (manquant("montant_cents"), "MONTANT_MANQUANT"),
+        ]
+
+        # part_employeur_cents doit être >= 0
+        if "part_employeur_cents" in df.columns:
+            part_emp = pd.to_numeric(df["part_employeur_cents"], errors="coerce")
+            negatif = (part_emp < 0).to_numpy()
+        else:
+            negatif = np.zeros(n, dtype=bool)
+
+        erreurs: List[List[str]] = [[] for _ in range(n)]
+        for masque, code in regles:
+            for pos in np.flatnonzero(masque):
+                erreurs[pos].append(code)
+        if negatif.any():
+            valeurs_part = df["part_employeur_cents"].to_numpy(dtype=object)
+            for pos in np.flatnonzero(negatif):
+                erreurs[pos].append(
+                    f"PART_EMPLOYEUR_NEGATIVE: {valeurs_part[pos]/100.0}"
+                )
+
+        invalide = negatif.copy()
+        for masque, _ in regles:
+            invalide |= masque
+
+        df["is_valid"] = ~invalide
+        df["validation_errors"] = pd.Series(erreurs, index=df.index, dtype=object)
+
+        nb_valides = int(df["is_valid"].sum())
+        nb_rejetes = n - nb_valides
+
+        logger.info(f"✓ {nb_valides} lignes valides, {nb_rejetes} rejetées")
+
+        if nb_rejetes > 0:
+            logger.warning("Exemples d'erreurs:")
+            rejets = df[~df["is_valid"]].head(5)
+            for idx, erreurs_ligne in rejets["validation_errors"].items():
+                logger.warning(f"  Ligne {idx+2}: {erreurs_ligne}")
+
+        return df
+
     # ========================================================================
     # ÉTAPE 5: Chargement staging
     # ========================================================================
@@ -600,6 +1008,86 @@ class ETLPaie:
 
         logger.info(f"✓ {len(df)} lignes chargées dans staging")
 
+    def charger_staging_bulk(
+        self, df: pd.DataFrame, batch: ImportBatch, date_paie_defaut: date
+    ):
+        """
+        Charge les données dans paie.stg_paie_transactions en un seul COPY
+
+        Équivalent ensembliste de charger_staging: les colonnes du DataFrame
+        sont converties en listes une fois, puis zippées dans le flux COPY
+        (aucune Series par ligne, un seul aller-retour réseau).
+
+        Args:
+            df: DataFrame validé
+            batch: Métadonnées du batch
+            date_paie_defaut: Date de paie par défaut si absente
+        """
+        assert self.conn is not None, "connect() doit être appelé avant le chargement"
+        logger.info("Chargement dans staging (COPY)...")
+
+        n = len(df)
+
+        def colonne(name: str, default: Any = None) -> List[Any]:
+            if name not in df.columns:
+                return [default] * n
+            return [None if _is_missing(v) else v for v in df[name].tolist()]
+
+        def colonne_raw(name: str) -> List[str]:
+            if name not in df.columns:
+                return [""] * n
+            return [str(v) for v in df[name].tolist()]
+
+        row_numbers = [int(i) + 2 for i in df.index]  # +2 pour header Excel
+        dates_paie = [v or date_paie_defaut for v in colonne("date_paie_parsed")]
+        is_valid = [bool(v) for v in colonne("is_valid", False)]
+        errors = [v if v is not None else [] for v in colonne("validation_errors")]
+        part_emp = [v if v is not None else 0 for v in colonne("part_employeur_cents")]
+
+        with self.conn.cursor() as cur:
+            # Nettoyer staging précédent
+            cur.execute(
+                "DELETE FROM paie.stg_paie_transactions WHERE source_batch_id = %s",
+                (batch.batch_id,),
+            )
+
+            # processed_at = CURRENT_TIMESTAMP de la transaction (comme l'UPDATE
+            # du mode ligne), écrit directement dans le COPY
+            cur.execute("SELECT CURRENT_TIMESTAMP")
+            processed_at = cur.fetchone()[0]
+
+            rows = zip(
+                colonne_raw("date_paie"),
+                colonne_raw("matricule"),
+                colonne_raw("nom_prenom"),
+                colonne_raw("code_paie"),
+                colonne_raw("montant"),
+                colonne_raw("part_employeur"),
+                dates_paie,
+                colonne("matricule"),
+                colonne("nom_prenom"),
+                colonne("code_paie"),
+                colonne("montant_cents"),
+                part_emp,
+                is_valid,
+                errors,
+            )
+
+            copy_sql = (
+                "COPY paie.stg_paie_transactions ("
+                + ", ".join(STAGING_COLUMNS)
+                + ") FROM STDIN"
+            )
+            with cur.copy(copy_sql) as copy:
+                for row_number, values in zip(row_numbers, rows):
+                    copy.write_row(
+                        (batch.batch_id, batch.nom_fichier, row_number)
+                        + values
+                        + (processed_at,)
+                    )
+
+        logger.info(f"✓ {n} lignes chargées dans staging (COPY)")
+
     # ========================================================================
     # ÉTAPE 6: Upsert dimensions
     # ========================================================================
@@ -982,15 +1470,18 @@ class ETLPaie:
             df = self.renommer_colonnes(df, mapping)
 
             # Étape 3: Transformer
-            df = self.transformer_dataframe(df)
+            df = self.transformer_dataframe_vectorise(df)
 
             # Étape 4: Valider
-            df = self.valider_dataframe(df)
+            df = self.valider_dataframe_vectorise(df)
             batch.nb_lignes_valides = df["is_valid"].sum()
             batch.nb_lignes_rejetees = (~df["is_valid"]).sum()
 
             # Étape 5: Charger staging
-            self.charger_staging(df, batch, date_paie_defaut or date.today())
+            if self.staging_mode == STAGING_MODE_BULK:
+                self.charger_staging_bulk(df, batch, date_paie_defaut or date.today())
+            else:
+                self.charger_staging(df, batch, date_paie_defaut or date.today())
 
             # Étape 6: Upsert dimensions
             self.upsert_dimensions(batch.batch_id)
@@ -1067,6 +1558,92 @@ class ETLPaie:
 
         return batch
 
+    def comparer_staging(
+        self, filepath: str, date_paie_defaut: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Compare les modes de chargement staging ("row" vs "bulk") sur un fichier
+
+        Le fichier est lu, mappé, transformé et validé une seule fois, puis
+        chargé dans staging par chaque mode. Tout est annulé (ROLLBACK) à la fin:
+        aucune donnée n'est conservée.
+
+        Returns:
+            {"lignes": int, "row": {...}, "bulk": {...}, "speedup": float}
+        """
+        date_paie_defaut = date_paie_defaut or date.today()
+
+        df = self.lire_fichier_source(filepath)
+        df = self.renommer_colonnes(df, self.mapper_colonnes(df))
+        df = self.transformer_dataframe_vectorise(df)
+        df = self.valider_dataframe_vectorise(df)
+
+        chargeurs = {
+            STAGING_MODE_ROW: self.charger_staging,
+            STAGING_MODE_BULK: self.charger_staging_bulk,
+        }
+        resultats: Dict[str, Any] = {"lignes": len(df)}
+
+        try:
+            self.connect()
+            for mode, chargeur in chargeurs.items():
+                batch = ImportBatch(
+                    batch_id=f"CMP_{mode.upper()}_{datetime.now().strftime('%H%M%S%f')}",
+                    batch_uuid=str(hashlib.md5(filepath.encode()).hexdigest()),
+                    nom_fichier=Path(filepath).name,
+                    chemin_fichier=str(Path(filepath).absolute()),
+                    started_at=datetime.now(),
+                    created_by="comparer_staging",
+                )
+                with self.conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        INSERT INTO paie.import_batches (
+                            batch_id, batch_uuid, nom_fichier, chemin_fichier, created_by
+                        ) VALUES (%s, %s, %s, %s, %s)
+                    """,
+                        (
+                            batch.batch_id,
+                            batch.batch_uuid,
+                            batch.nom_fichier,
+                            batch.chemin_fichier,
+                            batch.created_by,
+                        ),
+                    )
+
+                debut = time.perf_counter()
+                chargeur(df, batch, date_paie_defaut)
+                duree = time.perf_counter() - debut
+
+                with self.conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT COUNT(*) FROM paie.stg_paie_transactions "
+                        "WHERE source_batch_id = %s",
+                        (batch.batch_id,),
+                    )
+                    nb_lignes = cur.fetchone()[0]
+
+                resultats[mode] = {
+                    "duree_s": duree,
+                    "lignes_staging": nb_lignes,
+                    "lignes_par_s": nb_lignes / duree if duree > 0 else 0.0,
+                }
+                logger.info(
+                    f"  Staging {mode}: {nb_lignes} lignes en {duree:.2f}s "
+                    f"({resultats[mode]['lignes_par_s']:.0f} lignes/s)"
+                )
+        finally:
+            if self.conn:
+                self.conn.rollback()
+            self.disconnect()
+
+        duree_bulk = resultats[STAGING_MODE_BULK]["duree_s"]
+        resultats["speedup"] = (
+            resultats[STAGING_MODE_ROW]["duree_s"] / duree_bulk if duree_bulk else 0.0
+        )
+        logger.info(f"✓ Accélération bulk vs row: x{resultats['speedup']:.1f}")
+        return resultats
+
 
 # ============================================================================
 # CLI
@@ -1084,6 +1661,17 @@ def main():
         "--dsn", default=None, help="DSN PostgreSQL (utilise get_dsn() si non fourni)"
     )
     parser.add_argument("--user", default="etl_paie", help="Utilisateur")
+    parser.add_argument(
+        "--staging-mode",
+        choices=STAGING_MODES,
+        default=STAGING_MODE_BULK,
+        help="Chargement staging: bulk (COPY, défaut) ou row (INSERT par ligne)",
+    )
+    parser.add_argument(
+        "--compare-staging",
+        action="store_true",
+        help="Compare les modes row et bulk sur le fichier (ROLLBACK, rien n'est importé)",
+    )
 
     args = parser.parse_args()
 
@@ -1102,7 +1690,16 @@ def main():
         date_paie = datetime.strptime(args.date_paie, "%Y-%m-%d").date()
 
     # Exécuter ETL
-    etl = ETLPaie(args.dsn)
+    etl = ETLPaie(args.dsn, staging_mode=args.staging_mode)
+
+    if args.compare_staging:
+        resultats = etl.comparer_staging(args.file, date_paie_defaut=date_paie)
+        ok = (
+            resultats[STAGING_MODE_ROW]["lignes_staging"]
+            == resultats[STAGING_MODE_BULK]["lignes_staging"]
+        )
+        sys.exit(0 if ok else 1)
+
     batch = etl.importer_fichier(
         filepath=args.file, date_paie_defaut=date_paie, user=args.user
     )
@@ -157,6 +157,18 @@ FIELD_CONVERTERS = {
     "mnt_cmb": convert_to_numeric,  # NUMERIC maintenant (était TEXT)
 }
 
+# Ordre des champs maître (= ordre des tuples convertis et des colonnes COPY)
+MASTER_FIELDS: Tuple[str, ...] = tuple(MASTER_COLUMNS.values())
+
+# Colonnes COPY: 15 champs maître + métadonnées d'import
+COPY_COLUMNS: Tuple[str, ...] = MASTER_FIELDS + (
+    "source_row_number",
+    "import_run_id",
+    "source_file",
+)
+
+_DATE_PAIE_POS = MASTER_FIELDS.index("date_paie")
+
 
 # ========== IMPORTEUR FAST TRACK ==========
 
@@ -169,7 +181,7 @@ class FastTrackImporter:
     1. Vérifier éligibilité (15 colonnes exactes)
     2. Convertir valeurs (tolérant, NULL si échec)
     3. Logger alertes (non bloquant)
-    4. Insérer en masse (bulk insert optimisé)
+    4. Insérer en masse (COPY FROM STDIN par batch)
     """
 
     def __init__(
@@ -261,8 +273,18 @@ class FastTrackImporter:
         self.alerts = []
         self._cancelled = False
 
-        converted_rows: List[Dict[str, Any]] = []
+        # Lignes converties en tuples (ordre MASTER_FIELDS + source_row_number),
+        # écrites telles quelles dans le buffer COPY (pas de dict intermédiaire)
+        converted_rows: List[Tuple[Any, ...]] = []
         total_rows = len(rows_data)
+        converters = [
+            (
+                mapping[db_field],
+                db_field,
+                FIELD_CONVERTERS.get(db_field, convert_to_text),
+            )
+            for db_field in MASTER_FIELDS
+        ]
 
         for row_idx, row in enumerate(rows_data, start=1):
             # Vérifier annulation
@@ -276,18 +298,15 @@ class FastTrackImporter:
                 self.progress_callback(
                     pct, f"Conversion: {row_idx}/{total_rows} lignes", {}
                 )
-            converted_row: Dict[str, Any] = {"source_row_number": row_idx}
+            values: List[Any] = []
 
             # Convertir chaque champ
-            for db_field, col_idx in mapping.items():
+            for col_idx, db_field, converter in converters:
                 raw_value = row[col_idx] if col_idx < len(row) else None
 
-                # Appliquer conversion
-                converter = FIELD_CONVERTERS.get(db_field, convert_to_text)
-
                 try:
                     converted_value = converter(raw_value)
-                    converted_row[db_field] = converted_value
+                    values.append(converted_value)
 
                     # Logger si NULL après conversion
                     if (
@@ -306,7 +325,7 @@ class FastTrackImporter:
                         )
 
                 except Exception as e:
-                    converted_row[db_field] = None
+                    values.append(None)
                     self.alerts.append(
                         {
                             "row": row_idx,
@@ -318,7 +337,7 @@ class FastTrackImporter:
                     )
 
             # RÈGLE: Seule date_paie est obligatoire
-            if converted_row.get("date_paie") is None:
+            if values[_DATE_PAIE_POS] is None:
                 rows_skipped += 1
                 self.alerts.append(
                     {
@@ -335,7 +354,8 @@ class FastTrackImporter:
                 )
                 continue
 
-            converted_rows.append(converted_row)
+            values.append(row_idx)
+            converted_rows.append(tuple(values))
             rows_imported += 1
 
         # ========== INSÉRER EN DB ==========
@@ -364,7 +384,8 @@ class FastTrackImporter:
         if insert_metrics:
             logger.info(
                 f"  📊 Batches: {insert_metrics.get('batches', 0)}, "
-                f"Temps insertion: {insert_metrics.get('insert_time', 0):.2f}s"
+                f"Temps insertion: {insert_metrics.get('insert_time', 0):.2f}s, "
+                f"Débit: {insert_metrics.get('rows_per_sec', 0):.0f} lignes/s"
             )
 
         if self.progress_callback:
@@ -417,15 +438,19 @@ class FastTrackImporter:
 
         return None
 
-    def _bulk_insert(self, rows: List[Dict], source_file: str) -> Dict[str, Any]:
+    def _bulk_insert(
+        self, rows: List[Tuple[Any, ...]], source_file: str
+    ) -> Dict[str, Any]:
         """
-        Insert en masse dans imported_payroll_master avec COPY FROM STDIN (optimisé).
+        Insert en masse dans imported_payroll_master avec COPY FROM STDIN (psycopg3).
 
-        Utilise COPY FROM STDIN pour performances maximales, avec découpage en batches
-        pour limiter la mémoire et permettre rollback par batch.
+        Chaque tuple converti est écrit directement dans le flux COPY
+        (``copy.write_row``), sans construire de paramètres intermédiaires.
+        Découpage en batches: un COPY + commit par batch, ce qui permet la
+        progression, l'annulation entre batches et le rollback par batch.
 
         Args:
-            rows: Liste de dictionnaires avec les données à insérer
+            rows: Tuples dans l'ordre MASTER_FIELDS + source_row_number
             source_file: Nom du fichier source
 
         Returns:
@@ -433,7 +458,8 @@ class FastTrackImporter:
                 "batches": int,
                 "rows_inserted": int,
                 "insert_time": float,
-                "avg_batch_time": float
+                "avg_batch_time": float,
+                "rows_per_sec": float
             }
         """
         if not rows:
@@ -442,122 +468,93 @@ class FastTrackImporter:
                 "rows_inserted": 0,
                 "insert_time": 0.0,
                 "avg_batch_time": 0.0,
+                "rows_per_sec": 0.0,
             }
 
         start_time = time.time()
         total_rows = len(rows)
-        batches = []
+        total_batches = (total_rows + self.batch_size - 1) // self.batch_size
+        batches_done = 0
         rows_inserted = 0
-
-        # Découper en batches
-        for i in range(0, total_rows, self.batch_size):
-            if self._cancelled:
-                logger.warning("Insertion annulée")
-                break
-
-            batch = rows[i : i + self.batch_size]
-            batches.append(batch)
+        run_id = self.current_run_id
 
         logger.info(
-            f"Insertion de {total_rows} lignes en {len(batches)} batch(es) de {self.batch_size}"
+            f"Insertion COPY de {total_rows} lignes en {total_batches} batch(es) de {self.batch_size}"
         )
 
-        # SQL pour insertion
-        sql = """
-        INSERT INTO payroll.imported_payroll_master (
-            n_de_ligne, categorie_emploi, code_emploie, titre_emploi,
-            date_paie, matricule, employe, categorie_paie,
-            code_paie, desc_code_paie, poste_budgetaire, desc_poste_budgetaire,
-            montant, part_employeur, mnt_cmb,
-            import_run_id, source_file, source_row_number
-        ) VALUES (
-            %(n_de_ligne)s, %(categorie_emploi)s, %(code_emploie)s, %(titre_emploi)s,
-            %(date_paie)s, %(matricule)s, %(employe)s, %(categorie_paie)s,
-            %(code_paie)s, %(desc_code_paie)s, %(poste_budgetaire)s, %(desc_poste_budgetaire)s,
-            %(montant)s, %(part_employeur)s, %(mnt_cmb)s,
-            %(import_run_id)s, %(source_file)s, %(source_row_number)s
+        copy_sql = (
+            "COPY payroll.imported_payroll_master ("
+            + ", ".join(COPY_COLUMNS)
+            + ") FROM STDIN"
         )
-        """
 
-        # Insérer chaque batch dans une transaction
-        for batch_idx, batch in enumerate(batches):
-            if self._cancelled:
-                logger.warning("Insertion annulée")
-                break
-
-            batch_start = time.time()
-
-            # Préparer les paramètres pour le batch
-            batch_params = []
-            for row in batch:
-                params = {
-                    "n_de_ligne": row.get("n_de_ligne"),
-                    "categorie_emploi": row.get("categorie_emploi"),
-                    "code_emploie": row.get("code_emploie"),
-                    "titre_emploi": row.get("titre_emploi"),
-                    "date_paie": row.get("date_paie"),
-                    "matricule": row.get("matricule"),
-                    "employe": row.get("employe"),
-                    "categorie_paie": row.get("categorie_paie"),
-                    "code_paie": row.get("code_paie"),
-                    "desc_code_paie": row.get("desc_code_paie"),
-                    "poste_budgetaire": row.get("poste_budgetaire"),
-                    "desc_poste_budgetaire": row.get("desc_poste_budgetaire"),
-                    "montant": row.get("montant"),
-                    "part_employeur": row.get("part_employeur"),
-                    "mnt_cmb": row.get("mnt_cmb"),
-                    "import_run_id": self.current_run_id,
-                    "source_file": source_file,
-                    "source_row_number": row.get("source_row_number"),
-                }
-                batch_params.append(params)
-
-            # Insérer le batch dans une transaction
+        with self.db_repo.get_connection() as conn:
+            old_autocommit = conn.autocommit
+            conn.autocommit = False
             try:
-                with self.db_repo.get_connection() as conn:
-                    conn.autocommit = False
-
-                    with conn.cursor() as cur:
-                        # Utiliser executemany pour insertion en masse
-                        cur.executemany(sql, batch_params)
-
-                    conn.commit()
-                    rows_inserted += len(batch)
+                for batch_idx, offset in enumerate(
+                    range(0, total_rows, self.batch_size)
+                ):
+                    if self._cancelled:
+                        logger.warning("Insertion annulée")
+                        break
+
+                    batch_start = time.time()
+                    batch_end = min(offset + self.batch_size, total_rows)
+
+                    # Un COPY par batch dans sa propre transaction
+                    try:
+                        with conn.transaction():
+                            with conn.cursor() as cur:
+                                with cur.copy(copy_sql) as copy:
+                                    for i in range(offset, batch_end):
+                                        copy.write_row(rows[i] + (run_id, source_file))
+                    except Exception as e:
+                        logger.error(f"Erreur insertion batch {batch_idx + 1}: {e}")
+                        raise
+
+                    batch_rows = batch_end - offset
+                    rows_inserted += batch_rows
+                    batches_done += 1
                     batch_time = time.time() - batch_start
+                    elapsed = time.time() - start_time
+                    rows_per_sec = rows_inserted / elapsed if elapsed > 0 else 0.0
 
                     logger.debug(
-                        f"Batch {batch_idx + 1}/{len(batches)}: {len(batch)} lignes en {batch_time:.2f}s"
+                        f"Batch {batch_idx + 1}/{total_batches}: {batch_rows} lignes en {batch_time:.2f}s"
                     )
 
                     # Progression
                     if self.progress_callback:
-                        pct = min(90, int(30 + ((batch_idx + 1) / len(batches)) * 60))
+                        pct = min(90, int(30 + ((batch_idx + 1) / total_batches) * 60))
                         self.progress_callback(
                             pct,
-                            f"Insertion: batch {batch_idx + 1}/{len(batches)} ({rows_inserted}/{total_rows} lignes)",
+                            f"Insertion: batch {batch_idx + 1}/{total_batches} ({rows_inserted}/{total_rows} lignes)",
                             {
                                 "current_batch": batch_idx + 1,
-                                "total_batches": len(batches),
+                                "total_batches": total_batches,
+                                "rows_per_sec": rows_per_sec,
                             },
                         )
-
-            except Exception as e:
-                logger.error(f"Erreur insertion batch {batch_idx + 1}: {e}")
-                raise
+            finally:
+                conn.autocommit = old_autocommit
 
         insert_time = time.time() - start_time
-        avg_batch_time = insert_time / len(batches) if batches else 0
+        avg_batch_time = insert_time / batches_done if batches_done else 0
+        rows_per_sec = rows_inserted / insert_time if insert_time > 0 else 0.0
 
         logger.info(
             f"  ✓ {rows_inserted} lignes insérées en {insert_time:.2f}s "
-            f"({len(batches)} batches, {avg_batch_time:.2f}s/batch)"
+            f"({batches_done} batches, {avg_batch_time:.2f}s/batch, "
+            f"{rows_per_sec:.0f} lignes/s)"
         )
 
         return {
-            "batches": len(batches),
+            "batches": batches_done,
             "rows_inserted": rows_inserted,
             "insert_time": insert_time,
             "avg_batch_time": avg_batch_time,
+            "rows_per_sec": rows_per_sec,
         }
 
     def _log_alerts(self):
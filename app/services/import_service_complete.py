@@ -11,7 +11,7 @@ Responsabilités:
 - Application sign_policy
 - Insertion transactions + traçabilité
 - Invalidation et recalcul KPI
-- Refresh vues matérialisées
+- Mise à jour incrémentale des tables de synthèse
 - Émission signal pour WebChannel
 
 Usage:
@@ -21,22 +21,132 @@ Usage:
 
 import logging
 import hashlib
-import csv
 import re
+import sys
+import time
 from datetime import datetime
-from typing import Any, Optional, Callable
+from typing import Any, Optional, Callable, Iterator
 from pathlib import Path
+import numpy as np
+import openpyxl
 import pandas as pd
+import psycopg
 from unidecode import unidecode
 
 from services.data_repo import DataRepository
+from services.parsed_file_cache import ParsedFileCache
 from services.kpi_snapshot_service import KPISnapshotService
+from services.post_import_queue import PostImportQueue
+from services.summary_tables import SummaryTablesService
 from services.detect_types import detect_types
 from services.parsers import parse_amount_neutral, parse_date_robust
 from services.cleaners import clean_payroll_excel_df
+from services.csv_reader import read_csv_fast
 
 logger = logging.getLogger(__name__)
 
+# Modes d'insertion des transactions dans imported_payroll_master
+INSERT_MODE_COPY = "copy"  # COPY FROM STDIN par lot (défaut)
+INSERT_MODE_PIPELINE = "pipeline"  # executemany en mode pipeline psycopg3
+INSERT_MODES = (INSERT_MODE_COPY, INSERT_MODE_PIPELINE)
+# Échecs propres à COPY (serveur ou proxy/pooler sans protocole COPY):
+# l'insertion bascule alors en mode pipeline
+COPY_UNSUPPORTED_ERRORS = (psycopg.NotSupportedError, psycopg.errors.ProtocolViolation)
+
+TRANSACTION_BATCH_SIZE = 5000
+
+# Lecture Excel en flux: lignes échantillonnées pour scorer une feuille,
+# taille des blocs produits pour la feuille retenue
+SHEET_SCORE_SAMPLE_ROWS = 200
+EXCEL_CHUNK_ROWS = 10000
+
+TRANSACTION_COLUMNS = (
+    "numero_ligne",
+    "categorie_emploi",
+    "code_emploi",
+    "titre_emploi",
+    "date_paie",
+    "matricule",
+    "nom_employe",
+    "categorie_paie",
+    "code_paie",
+    "description_code_paie",
+    "poste_budgetaire",
+    "description_poste_budgetaire",
+    "montant_employe",
+    "part_employeur",
+    "montant_combine",
+    "source_file",
+    "source_row_number",
+)
+
+
+def _map_distinct(serie: pd.Series, fonction: Callable) -> list:
+    """
+    Applique fonction une seule fois par valeur distincte de la colonne.
+
+    La clé de cache inclut le type: 1, 1.0 et True sont égaux en Python
+    mais str() les rend différemment.
+    """
+    cache: dict = {}
+    resultat = []
+    for valeur in serie.tolist():
+        cle = (type(valeur), valeur)
+        try:
+            resultat.append(cache[cle])
+        except KeyError:
+            cache[cle] = fonction(valeur)
+            resultat.append(cache[cle])
+        except TypeError:  # valeur non hashable
+            resultat.append(fonction(valeur))
+    return resultat
+
+
+def _texte_requis(valeur) -> str:
+    """Champ texte obligatoire (matricule, code de paie): None/NaN → ""."""
+    try:
+        vide = bool(pd.isna(valeur))
+    except (TypeError, ValueError):  # valeur non scalaire
+        vide = False
+    return "" if vide else str(valeur).strip()
+
+
+def _parse_amount_column(serie: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    parse_amount_neutral appliqué à une colonne.
+
+    Returns:
+        (montants float64, masque des cellules non parsables ou vides)
+    """
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        montants = serie.to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        return montants, np.isnan(montants)
+
+    parses = _map_distinct(serie, parse_amount_neutral)
+    echec = np.fromiter((v is None for v in parses), dtype=bool, count=len(parses))
+    montants = np.array([np.nan if v is None else v for v in parses], dtype=np.float64)
+    return montants, echec
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Pic de mémoire résidente du processus (Mo), None si indisponible."""
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss: Ko sous Linux, octets sous macOS
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return round(peak / divisor, 1)
+    except ImportError:
+        pass
+
+    try:
+        import psutil  # Windows: module resource absent
+
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+    except Exception:
+        return None
+
 
 class ImportServiceComplete:
     """Service complet pour l'import de fichiers de paie Excel avec pipeline KPI."""
@@ -47,6 +157,9 @@ class ImportServiceComplete:
         kpi_service: KPISnapshotService,
         import_finished_callback: Optional[Callable] = None,
         progress_callback: Optional[Callable] = None,
+        insert_mode: str = INSERT_MODE_COPY,
+        job_queue: Optional[PostImportQueue] = None,
+        parsed_cache: Optional[ParsedFileCache] = None,
     ):
         """
         Initialise le service d'import complet.
@@ -56,11 +169,24 @@ class ImportServiceComplete:
             kpi_service: Instance de KPISnapshotService
             import_finished_callback: Fonction callback(period, batch_id, rows) appelée après import
             progress_callback: Fonction callback(percent, message, metrics) pour progression
+            insert_mode: "copy" (COPY, défaut; bascule en "pipeline" si COPY
+                n'est pas pris en charge) ou "pipeline" (executemany en pipeline)
+            job_queue: File post-import; si fournie, KPI et synthèses sont
+                recalculés en arrière-plan après le commit
+            parsed_cache: Cache des feuilles parsées (clé = checksum); si
+                fourni, un fichier déjà parsé (aperçu) n'est pas reparsé
         """
+        if insert_mode not in INSERT_MODES:
+            raise ValueError(f"Mode d'insertion inconnu: {insert_mode}")
+
         self.repo = repo
         self.kpi_service = kpi_service
         self.import_finished_callback = import_finished_callback
         self.progress_callback = progress_callback
+        self.insert_mode = insert_mode
+        self.summary_service = SummaryTablesService(repo)
+        self.job_queue = job_queue
+        self.parsed_cache = parsed_cache
         self._cancelled = False
 
     def cancel(self):
@@ -78,6 +204,9 @@ class ImportServiceComplete:
         pay_date: datetime,
         user_id: str,
         apply_sign_policy: bool = True,
+        streaming: bool = False,
+        chunk_size: int = EXCEL_CHUNK_ROWS,
+        checksum: Optional[str] = None,
     ) -> dict[str, Any]:
         """
         Importe un fichier Excel de paie complet avec pipeline KPI.
@@ -98,13 +227,18 @@ class ImportServiceComplete:
         13. Émettre signal import_finished
 
         Args:
-            file_path: Chemin vers fichier Excel (.xlsx, .xls, .xlsm)
+            file_path: Chemin vers fichier Excel (.xlsx, .xls, .xlsm) ou CSV
             pay_date: Date de paie (ex: datetime(2025, 1, 15))
             user_id: UUID de l'utilisateur importateur
             apply_sign_policy: Si True (défaut), applique la correction automatique des signes (+/-)
+            streaming: Si True, traite le fichier par blocs de chunk_size lignes
+                (étapes 4 à 9 par bloc, dans une seule transaction) à mémoire bornée
+            chunk_size: Taille des blocs en mode streaming
+            checksum: SHA256 du fichier s'il est déjà connu (calculé par
+                l'appelant au décodage); évite une relecture du fichier
 
         Returns:
-            dict avec 'status', 'batch_id', 'rows_count', 'period', 'message'
+            dict avec 'status', 'batch_id', 'rows_count', 'period', 'message', 'peak_rss_mb'
 
         Raises:
             ImportError: Si erreur quelconque
@@ -114,7 +248,6 @@ class ImportServiceComplete:
         )
 
         batch_id = None
-        checksum = None
         pay_date_str = pay_date.strftime(
             "%Y-%m-%d"
         )  # Date exacte (YYYY-MM-DD) pour les KPI
@@ -132,168 +265,185 @@ class ImportServiceComplete:
             if self.progress_callback:
                 self.progress_callback(10, "Calcul du checksum...", {})
 
-            # 2. Calculer checksum
-            checksum = self._calculate_file_checksum(file_path)
+            # 2. Calculer checksum (sauf s'il est fourni par l'appelant)
+            if not checksum:
+                checksum = self._calculate_file_checksum(file_path)
             logger.info(f"📋 Checksum calculé: {checksum[:16]}...")
 
             # 3. Vérifier doublon (désactivé temporairement pour permettre les tests)
             # self._check_duplicate_import(period_id, checksum)
 
-            if self.progress_callback:
-                self.progress_callback(15, "Parsing du fichier Excel...", {})
-
-            # 4. Parser Excel avec détection automatique des en-têtes
-            df = self._parse_excel_robust(file_path)
-            logger.info(f"📊 Fichier parsé: {len(df)} lignes")
-
-            if self.progress_callback:
-                self.progress_callback(
-                    20, f"Fichier parsé: {len(df)} lignes", {"total_rows": len(df)}
+            if streaming:
+                # 4-10. Pipeline par blocs dans une seule transaction
+                batch_id, rows_count = self._import_streaming(
+                    file_path,
+                    period_id,
+                    pay_date,
+                    checksum,
+                    user_id,
+                    apply_sign_policy,
+                    chunk_size,
                 )
+            else:
+                if self.progress_callback:
+                    self.progress_callback(15, "Parsing du fichier Excel...", {})
 
-            # 4.5. Nettoyage du DataFrame
-            df = clean_payroll_excel_df(df)
-            if df is None or df.empty:
-                raise ValueError("Fichier Excel invalide ou vide après nettoyage.")
-            logger.info(f"🧹 Fichier nettoyé: {len(df)} lignes restantes")
+                # 4. Parser Excel avec détection automatique des en-têtes
+                # (feuille déjà parsée à l'aperçu: relue depuis le cache)
+                df = self.parse_excel_cached(file_path, checksum)
+                logger.info(f"📊 Fichier parsé: {len(df)} lignes")
 
-            if self.progress_callback:
-                self.progress_callback(
-                    25, f"Fichier nettoyé: {len(df)} lignes restantes", {}
-                )
+                if self.progress_callback:
+                    self.progress_callback(
+                        20, f"Fichier parsé: {len(df)} lignes", {"total_rows": len(df)}
+                    )
 
-            # 5. Normaliser + mapper
-            if self.progress_callback:
-                self.progress_callback(30, "Normalisation des colonnes...", {})
+                # 4.5. Nettoyage du DataFrame
+                df = clean_payroll_excel_df(df)
+                if df is None or df.empty:
+                    raise ValueError("Fichier Excel invalide ou vide après nettoyage.")
+                logger.info(f"🧹 Fichier nettoyé: {len(df)} lignes restantes")
 
-            df_normalized = self._normalize_columns_fallback(df)
+                if self.progress_callback:
+                    self.progress_callback(
+                        25, f"Fichier nettoyé: {len(df)} lignes restantes", {}
+                    )
 
-            if self.progress_callback:
-                self.progress_callback(40, "Mapping des lignes...", {})
+                # 5. Normaliser + mapper
+                if self.progress_callback:
+                    self.progress_callback(30, "Normalisation des colonnes...", {})
 
-            mapped_rows = self._map_rows(df_normalized, pay_date, Path(file_path).name)
+                df_normalized = self._normalize_columns_fallback(df)
 
-            if self.progress_callback:
-                self.progress_callback(
-                    50,
-                    f"{len(mapped_rows)} lignes mappées",
-                    {"mapped_rows": len(mapped_rows)},
-                )
+                if self.progress_callback:
+                    self.progress_callback(40, "Mapping des lignes...", {})
 
-            # 6. Appliquer sign_policy (optionnel selon choix utilisateur)
-            if self.progress_callback:
-                self.progress_callback(
-                    55, "Application de la politique de signes...", {}
+                mapped = self._map_rows_vectorise(
+                    df_normalized, pay_date, Path(file_path).name
                 )
 
-            if apply_sign_policy:
-                logger.info("✅ Application de la politique de signes automatique")
-                signed_rows = self._apply_sign_policy(mapped_rows)
-            else:
-                logger.info(
-                    "⏩ Politique de signes IGNORÉE (fichier considéré comme correct)"
-                )
-                # Créer quand même les champs normalisés (en cents) sans changer les signes
-                for row in mapped_rows:
-                    amount_employee = row.get(
-                        "amount_employee", row.get("montant_employe", 0)
-                    )
-                    amount_employer = row.get(
-                        "amount_employer", row.get("part_employeur", 0)
+                if self.progress_callback:
+                    self.progress_callback(
+                        50,
+                        f"{len(mapped)} lignes mappées",
+                        {"mapped_rows": len(mapped)},
                     )
 
-                    # Gérer les NaN et None
-                    if amount_employee is None or (
-                        isinstance(amount_employee, float) and pd.isna(amount_employee)
-                    ):
-                        amount_employee = 0
-                    if amount_employer is None or (
-                        isinstance(amount_employer, float) and pd.isna(amount_employer)
-                    ):
-                        amount_employer = 0
-
-                    row["amount_employee_norm_cents"] = int(
-                        amount_employee * 100
-                    )  # Pas de changement de signe
-                    row["amount_employer_norm_cents"] = int(
-                        amount_employer * 100
-                    )  # Pas de changement de signe
-                signed_rows = mapped_rows
-
-            # 7. Valider
-            if self.progress_callback:
-                self.progress_callback(60, "Validation des données...", {})
+                # 6. Appliquer sign_policy (optionnel selon choix utilisateur)
+                if self.progress_callback:
+                    self.progress_callback(
+                        55, "Application de la politique de signes...", {}
+                    )
 
-            self._validate_rows(signed_rows)
+                if apply_sign_policy:
+                    logger.info("✅ Application de la politique de signes automatique")
+                else:
+                    logger.info(
+                        "⏩ Politique de signes IGNORÉE (fichier considéré comme correct)"
+                    )
+                signed_rows = self._frame_to_rows(
+                    self._apply_sign_policy_vectorise(mapped, apply_sign_policy)
+                )
 
-            # 8-10. Transaction atomique: upsert dimensions + insert transactions + create batch
-            if self.progress_callback:
-                self.progress_callback(65, "Insertion en base de données...", {})
+                # 7. Valider
+                if self.progress_callback:
+                    self.progress_callback(60, "Validation des données...", {})
 
-            batch_id = self._import_transaction(
-                signed_rows,
-                period_id,
-                pay_date,
-                Path(file_path).name,
-                checksum,
-                user_id,
-            )
+                self._validate_rows(signed_rows)
 
-            if self.progress_callback:
-                self.progress_callback(
-                    85,
-                    f"Insertion terminée: {len(signed_rows)} lignes",
-                    {"rows_inserted": len(signed_rows)},
+                # 8-10. Transaction atomique: upsert dimensions + insert transactions + create batch
+                if self.progress_callback:
+                    self.progress_callback(65, "Insertion en base de données...", {})
+
+                batch_id = self._import_transaction(
+                    signed_rows,
+                    period_id,
+                    pay_date,
+                    Path(file_path).name,
+                    checksum,
+                    user_id,
                 )
 
-            logger.info(
-                f"✅ Import réussi: batch_id={batch_id}, rows={len(signed_rows)}"
-            )
+                if self.progress_callback:
+                    self.progress_callback(
+                        85,
+                        f"Insertion terminée: {len(signed_rows)} lignes",
+                        {"rows_inserted": len(signed_rows)},
+                    )
+                rows_count = len(signed_rows)
 
-            # 11. Invalider et recalculer KPI (hors transaction)
-            if self.progress_callback:
-                self.progress_callback(90, "Recalcul des KPI...", {})
+            logger.info(f"✅ Import réussi: batch_id={batch_id}, rows={rows_count}")
 
-            logger.info(f"🔄 Recalcul KPI pour date de paie {pay_date_str}...")
+            # 11-13. Travaux post-commit: en file (asynchrone) ou en ligne
+            job_id = None
             kpi_data = None  # Initialiser pour éviter UnboundLocalError
-            try:
-                kpi_data = self.kpi_service.invalidate_and_recalc_kpi(pay_date_str)
-                logger.info(
-                    f"✅ KPI recalculés: {kpi_data['cards']['nb_employes']} employés, "
-                    f"{kpi_data['cards']['masse_salariale']:.2f}$ masse salariale"
-                )
-            except Exception as e_kpi:
-                logger.warning(f"⚠️ KPI non calculés (problème de droits): {e_kpi}")
-                # Continue quand même, les données sont importées
+            refresh_timings: dict[str, float] = {}
+            if self.job_queue:
+                # KPI + synthèses exécutés par le worker; import_finished
+                # est émis par la file à la fin du job
+                try:
+                    job_id = self.job_queue.enqueue(
+                        pay_date,
+                        batch_id,
+                        rows_count,
+                        callback=self.import_finished_callback,
+                    )
+                except Exception as e_queue:
+                    logger.warning(
+                        f"⚠️ File post-import indisponible, traitement en ligne: {e_queue}"
+                    )
 
-            # 12. Refresh vues matérialisées (async)
-            if self.progress_callback:
-                self.progress_callback(95, "Rafraîchissement des vues...", {})
+            if job_id is None:
+                # 11. Invalider et recalculer KPI (hors transaction)
+                if self.progress_callback:
+                    self.progress_callback(90, "Recalcul des KPI...", {})
+
+                logger.info(f"🔄 Recalcul KPI pour date de paie {pay_date_str}...")
+                try:
+                    kpi_data = self.kpi_service.invalidate_and_recalc_kpi(pay_date_str)
+                    logger.info(
+                        f"✅ KPI recalculés: {kpi_data['cards']['nb_employes']} employés, "
+                        f"{kpi_data['cards']['masse_salariale']:.2f}$ masse salariale"
+                    )
+                except Exception as e_kpi:
+                    logger.warning(f"⚠️ KPI non calculés (problème de droits): {e_kpi}")
+                    # Continue quand même, les données sont importées
 
-            self._refresh_materialized_views()
+                # 12. Mise à jour des synthèses pour la date de paie importée
+                if self.progress_callback:
+                    self.progress_callback(95, "Mise à jour des synthèses...", {})
 
-            # 13. Émettre signal import_finished
-            if self.import_finished_callback:
-                self.import_finished_callback(pay_date_str, batch_id, len(signed_rows))
-                logger.info(
-                    f"📡 Signal import_finished émis pour date de paie {pay_date_str}"
-                )
+                refresh_timings = self.summary_service.refresh_for_pay_dates([pay_date])
+
+                # 13. Émettre signal import_finished
+                if self.import_finished_callback:
+                    self.import_finished_callback(pay_date_str, batch_id, rows_count)
+                    logger.info(
+                        f"📡 Signal import_finished émis pour date de paie {pay_date_str}"
+                    )
 
             if self.progress_callback:
                 self.progress_callback(
                     100,
                     "Import terminé avec succès",
-                    {"rows_inserted": len(signed_rows), "batch_id": batch_id},
+                    {"rows_inserted": rows_count, "batch_id": batch_id},
                 )
 
             return {
                 "status": "success",
                 "batch_id": batch_id,
-                "rows_count": len(signed_rows),
+                "rows_count": rows_count,
                 "pay_date": pay_date_str,
                 "kpi": kpi_data.get("cards", {}) if kpi_data else {},
-                "message": f"Import réussi: {len(signed_rows)} lignes"
-                + (" — KPI actualisés" if kpi_data else " (KPI non disponibles)"),
+                "peak_rss_mb": _peak_rss_mb(),
+                "refresh_timings": refresh_timings,
+                "job_id": job_id,
+                "message": f"Import réussi: {rows_count} lignes"
+                + (
+                    " — KPI en cours de calcul"
+                    if job_id
+                    else (" — KPI actualisés" if kpi_data else " (KPI non disponibles)")
+                ),
             }
 
         except Exception as e:
@@ -494,7 +644,11 @@ class ImportServiceComplete:
         logger.info("✓ Aucun doublon détecté")
 
     def _parse_excel_file(self, file_path: str) -> pd.DataFrame:
-        """Parse le fichier Excel ou CSV avec détection robuste et gestion des fichiers temporaires."""
+        """
+        Parse le fichier selon son extension: CSV via read_csv_fast, Excel
+        via openpyxl (meilleure feuille). Point d'entrée unique du parsing
+        (appelé par parse_excel_cached).
+        """
         try:
             file_ext = Path(file_path).suffix.lower()
 
@@ -511,82 +665,209 @@ class ImportServiceComplete:
             logger.info(f"✓ Fichier parsé ({file_ext}): {len(df)} lignes")
             return df
 
+        except ImportError:
+            raise
         except Exception as e:
             raise ImportError(f"❌ Erreur parsing fichier: {e}") from e
 
     def _parse_csv_robust(self, file_path: str) -> pd.DataFrame:
-        """Parse CSV avec détection d'encodage et séparateur."""
-        encodings = ["utf-8-sig", "utf-8", "latin-1"]
-
-        for encoding in encodings:
-            try:
-                with open(file_path, "r", encoding=encoding) as f:
-                    # Détecter séparateur
-                    sample = f.read(1024)
-                    f.seek(0)
-                    sniffer = csv.Sniffer()
-                    delimiter = sniffer.sniff(sample).delimiter
-
-                    df = pd.read_csv(f, encoding=encoding, delimiter=delimiter)
-                    logger.info(
-                        f"✓ CSV lu: encoding={encoding}, delimiter='{delimiter}'"
-                    )
-                    return self._clean_dataframe(df)
-
-            except Exception as e:
-                logger.debug(f"Tentative encoding {encoding} échouée: {e}")
-                continue
-
-        raise ImportError("❌ Impossible de lire le CSV avec les encodages testés")
+        """Parse CSV: encodage et séparateur détectés une fois, lecture en une passe."""
+        try:
+            df, _ = read_csv_fast(file_path)
+        except Exception as e:
+            raise ImportError(f"❌ Impossible de lire le CSV: {e}") from e
+        return self._clean_dataframe(df)
 
     def _parse_excel_robust(self, file_path: str) -> pd.DataFrame:
         """Parse Excel avec détection de feuille et ligne d'en-tête, gestion des fichiers temporaires."""
         try:
-            # Lire Excel en contexte pour éviter les verrous Windows
-            # FORCER header=0 pour utiliser la première ligne comme en-têtes
-            with pd.ExcelFile(file_path, engine="openpyxl") as excel_file:
-                sheet_scores = {}
+            # Toutes les colonnes: _clean_dataframe écarte ensuite celles qui
+            # sont vides sur la feuille entière
+            chunks = list(self._iter_excel_chunks(file_path, prune_columns=False))
+            df = pd.concat(chunks) if chunks else pd.DataFrame()
 
-                for sheet_name in excel_file.sheet_names:
-                    try:
-                        df_temp = pd.read_excel(
-                            file_path,
-                            sheet_name=sheet_name,
-                            engine="openpyxl",
-                            header=0,
-                        )
-                        df_temp = self._clean_dataframe(df_temp)
+            if df.empty:
+                raise ImportError("❌ Aucune feuille valide trouvée")
+
+            # Utiliser la ligne 0 comme en-tête
+            logger.info("✓ En-tête utilisée: ligne 0")
+            logger.info(f"📋 En-têtes détectés: {list(df.columns)}")
+            logger.info(f"📊 Lignes de données: {len(df)}")
 
-                        if df_temp.empty:
-                            continue
+            return self._clean_dataframe(df)
 
-                        # Scorer la "tabularité"
-                        score = self._score_sheet_tabularity(df_temp)
-                        sheet_scores[sheet_name] = (score, df_temp)
+        except Exception as e:
+            raise ImportError(f"❌ Erreur parsing Excel: {e}") from e
 
-                    except Exception as e:
-                        logger.debug(f"Feuille {sheet_name} ignorée: {e}")
+    def parse_excel_cached(self, source, checksum: str) -> pd.DataFrame:
+        """
+        _parse_excel_file (CSV ou Excel) avec le cache de fichiers parsés
+        (si configuré).
+
+        Args:
+            source: Chemin du fichier (.csv, .xlsx, .xls, .xlsm)
+            checksum: SHA256 du contenu, clé du cache
+
+        Returns:
+            Copie du DataFrame parsé (modifiable par l'appelant)
+        """
+        if self.parsed_cache is not None:
+            df = self.parsed_cache.get(checksum)
+            if df is not None:
+                logger.info(f"♻️ Feuille parsée relue du cache ({checksum[:16]}...)")
+                return df
+
+        df = self._parse_excel_file(source)
+        if self.parsed_cache is not None:
+            self.parsed_cache.put(checksum, df)
+        return df
+
+    def _iter_excel_chunks(
+        self,
+        file_path: str,
+        chunk_size: int = EXCEL_CHUNK_ROWS,
+        prune_columns: bool = True,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lit la meilleure feuille Excel en flux, par blocs de chunk_size lignes.
+
+        Chaque feuille est scorée sur ses SHEET_SCORE_SAMPLE_ROWS premières
+        lignes seulement (openpyxl read_only), puis seule la feuille retenue
+        est parcourue en entier. La ligne 0 sert d'en-tête. L'index de chaque
+        bloc est la position de la ligne de données dans la feuille (comme
+        pd.read_excel), les lignes entièrement vides sont retirées.
+
+        Args:
+            prune_columns: True = colonnes vides sur TOUTE la feuille écartées
+                de chaque bloc (passe préalable de comptage, mêmes colonnes
+                que dropna(axis=1, how="all") sur la feuille entière);
+                False = toutes les colonnes, à nettoyer par l'appelant
+        """
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            best_sheet = None
+            best_score = -1.0
+
+            for worksheet in workbook.worksheets:
+                try:
+                    rows = worksheet.iter_rows(
+                        max_row=SHEET_SCORE_SAMPLE_ROWS + 1, values_only=True
+                    )
+                    header = next(rows, None)
+                    if header is None:
                         continue
 
-            if not sheet_scores:
-                raise ImportError("❌ Aucune feuille valide trouvée")
+                    columns = self._excel_header(header)
+                    sample = pd.DataFrame(
+                        [self._fit_row(row, len(columns)) for row in rows],
+                        columns=columns,
+                    )
+                    sample = self._clean_dataframe(sample)
+
+                    if sample.empty:
+                        continue
 
-            # Choisir la meilleure feuille
-            best_sheet = max(sheet_scores.keys(), key=lambda x: sheet_scores[x][0])
-            df = sheet_scores[best_sheet][1]
+                    # Scorer la "tabularité"
+                    score = self._score_sheet_tabularity(sample)
+                    if score > best_score:
+                        best_sheet = worksheet
+                        best_score = score
+
+                except Exception as e:
+                    logger.debug(f"Feuille {worksheet.title} ignorée: {e}")
+                    continue
+
+            if best_sheet is None:
+                raise ImportError("❌ Aucune feuille valide trouvée")
 
             logger.info(
-                f"✓ Feuille sélectionnée: '{best_sheet}' (score: {sheet_scores[best_sheet][0]:.2f})"
+                f"✓ Feuille sélectionnée: '{best_sheet.title}' (score: {best_score:.2f})"
             )
-            # Utiliser la ligne 0 comme en-tête (déjà fait par header=0)
-            logger.info("✓ En-tête utilisée: ligne 0")
-            logger.info(f"📋 En-têtes détectés: {list(df.columns)}")
-            logger.info(f"📊 Lignes de données: {len(df)}")
 
-            return self._clean_dataframe(df)
+            rows = best_sheet.iter_rows(values_only=True)
+            columns = self._excel_header(next(rows))
+            width = len(columns)
+            if prune_columns:
+                kept_columns = [
+                    columns[i] for i in self._excel_non_empty_columns(best_sheet, width)
+                ]
+            else:
+                kept_columns = columns
+            rows_total = max((best_sheet.max_row or 1) - 1, 0)
+
+            offset = 0
+            buffer = []
+            for row in rows:
+                buffer.append(self._fit_row(row, width))
+                if len(buffer) >= chunk_size:
+                    yield self._excel_chunk(
+                        buffer, columns, kept_columns, offset, rows_total
+                    )
+                    offset += len(buffer)
+                    buffer = []
 
-        except Exception as e:
-            raise ImportError(f"❌ Erreur parsing Excel: {e}") from e
+            if buffer:
+                yield self._excel_chunk(
+                    buffer, columns, kept_columns, offset, rows_total
+                )
+
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _excel_header(header: tuple) -> list:
+        """Noms de colonnes à la manière de pd.read_excel (Unnamed: i, doublons .1)."""
+        columns = []
+        seen: dict = {}
+        for i, name in enumerate(header):
+            if name is None or (isinstance(name, str) and not name.strip()):
+                name = f"Unnamed: {i}"
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            columns.append(name)
+        return columns
+
+    def _excel_non_empty_columns(self, worksheet, width: int) -> list:
+        """Positions des colonnes ayant au moins une cellule de données non vide."""
+        non_empty = [False] * width
+        remaining = width
+        for row in worksheet.iter_rows(min_row=2, values_only=True):
+            for i, value in enumerate(self._fit_row(row, width)):
+                if value is not None and not non_empty[i]:
+                    non_empty[i] = True
+                    remaining -= 1
+            if remaining == 0:  # toutes les colonnes ont des données
+                break
+        return [i for i in range(width) if non_empty[i]]
+
+    @staticmethod
+    def _fit_row(row: tuple, width: int) -> tuple:
+        """Ajuste une ligne openpyxl à la largeur de l'en-tête."""
+        if len(row) == width:
+            return row
+        if len(row) > width:
+            return row[:width]
+        return row + (None,) * (width - len(row))
+
+    @staticmethod
+    def _excel_chunk(
+        buffer: list, columns: list, kept_columns: list, offset: int, rows_total: int
+    ) -> pd.DataFrame:
+        """
+        Construit un bloc DataFrame indexé par position de ligne.
+
+        attrs["rows_total"] porte le nombre de lignes de données annoncé par
+        la feuille (estimation utilisée pour la progression).
+        """
+        chunk = pd.DataFrame(
+            buffer, columns=columns, index=range(offset, offset + len(buffer))
+        )
+        chunk = chunk[kept_columns].dropna(how="all")
+        chunk.attrs["rows_total"] = rows_total
+        return chunk
 
     def _score_sheet_tabularity(self, df: pd.DataFrame) -> float:
         """Score la tabularité d'une feuille (0-1)."""
@@ -1075,16 +1356,16 @@ class ImportServiceComplete:
 
                 rows.append(
                     {
-                        "matricule": str(row.get("matricule", "")).strip(),
+                        "matricule": _texte_requis(row.get("matricule", "")),
                         "nom_employe": (
                             str(row.get("nom_employe", "")).strip()
                             if pd.notna(row.get("nom_employe"))
                             else None
                         ),
-                        "code_paie": str(row.get("code_paie", "")).strip(),
-                        "pay_code": str(
+                        "code_paie": _texte_requis(row.get("code_paie", "")),
+                        "pay_code": _texte_requis(
                             row.get("code_paie", "")
-                        ).strip(),  # Alias pour compatibilité
+                        ),  # Alias pour compatibilité
                         "poste_budgetaire": (
                             str(row.get("poste_budgetaire", "")).strip()
                             if pd.notna(row.get("poste_budgetaire"))
@@ -1127,23 +1408,7 @@ class ImportServiceComplete:
         pay_codes = list(
             set(row.get("code_paie", row.get("pay_code", "")) for row in rows)
         )
-
-        sql = """
-        SELECT pay_code, employee_sign, employer_sign
-        FROM reference.sign_policies
-        WHERE pay_code = ANY(%(pay_codes)s)
-        """
-
-        policies_result = self.repo.run_query(sql, {"pay_codes": pay_codes})
-
-        # Construire dict de policies
-        policies = {}
-        if policies_result:
-            for row in policies_result:
-                policies[row[0]] = {
-                    "employee_sign": int(row[1]),
-                    "employer_sign": int(row[2]),
-                }
+        policies = self._fetch_sign_policies(pay_codes)
 
         # Appliquer signes + conversion centimes
         for row in rows:
@@ -1166,6 +1431,178 @@ class ImportServiceComplete:
         logger.info(f"✓ Sign policy appliquée: {len(policies)} codes mappés")
         return rows
 
+    def _apply_unsigned_cents(self, rows: list[dict]) -> list[dict]:
+        """Crée les champs normalisés (en cents) sans changer les signes."""
+        for row in rows:
+            amount_employee = row.get("amount_employee", row.get("montant_employe", 0))
+            amount_employer = row.get("amount_employer", row.get("part_employeur", 0))
+
+            # Gérer les NaN et None
+            if amount_employee is None or (
+                isinstance(amount_employee, float) and pd.isna(amount_employee)
+            ):
+                amount_employee = 0
+            if amount_employer is None or (
+                isinstance(amount_employer, float) and pd.isna(amount_employer)
+            ):
+                amount_employer = 0
+
+            row["amount_employee_norm_cents"] = int(
+                amount_employee * 100
+            )  # Pas de changement de signe
+            row["amount_employer_norm_cents"] = int(
+                amount_employer * 100
+            )  # Pas de changement de signe
+        return rows
+
+    def _map_rows_vectorise(
+        self, df: pd.DataFrame, pay_date: datetime, source_file: str
+    ) -> pd.DataFrame:
+        """
+        Version colonne de _map_rows: mêmes valeurs, un DataFrame en sortie.
+
+        Les montants sont parsés colonne par colonne (parseur neutre appliqué
+        une fois par valeur distincte non numérique), les issues de staging
+        sont repérées par masques booléens.
+        """
+        nb_lignes = len(df)
+        staging_issues = []
+
+        def colonne(nom: str) -> pd.Series:
+            if nom in df.columns:
+                return df[nom]
+            return pd.Series([None] * nb_lignes, index=df.index, dtype=object)
+
+        # Montant employé (obligatoire): invalide non vide → staging, 0.0
+        brut_employe = colonne("montant_employe")
+        amount_employee, echec = _parse_amount_column(brut_employe)
+        if "montant_employe" in df.columns:
+            issues = echec & brut_employe.notna().to_numpy()
+            staging_issues.append(("montant_employe", brut_employe, issues))
+            amount_employee[echec] = 0.0
+
+        # Part employeur: NaN/vide est NORMAL, seul un texte invalide est signalé
+        brut_employeur = colonne("part_employeur")
+        amount_employer, echec = _parse_amount_column(brut_employeur)
+        presente = brut_employeur.notna().to_numpy()
+        issues = echec & presente & (brut_employeur != "").to_numpy()
+        staging_issues.append(("part_employeur", brut_employeur, issues))
+        amount_employer[echec] = 0.0
+
+        # dtype=object: garder None et les str/datetime Python tels quels
+        def objets(valeurs: list) -> pd.Series:
+            return pd.Series(valeurs, dtype=object)
+
+        # Colonne absente ou cellule vide → "" (rejeté par _validate_rows)
+        code_paie = objets(_map_distinct(colonne("code_paie"), _texte_requis))
+        frame = pd.DataFrame(
+            {
+                "matricule": objets(_map_distinct(colonne("matricule"), _texte_requis)),
+                "nom_employe": objets(
+                    _map_distinct(
+                        colonne("nom_employe"),
+                        lambda v: str(v).strip() if pd.notna(v) else None,
+                    )
+                ),
+                "code_paie": code_paie,
+                "pay_code": code_paie,  # Alias pour compatibilité
+                "poste_budgetaire": objets(
+                    _map_distinct(
+                        colonne("poste_budgetaire"),
+                        lambda v: str(v).strip() if pd.notna(v) else "N/A",
+                    )
+                ),
+                "montant_employe": amount_employee,
+                "amount_employee": amount_employee,  # Alias pour compatibilité
+                "part_employeur": amount_employer,
+                "date_paie": objets([pay_date] * nb_lignes),
+                "source_file": objets([source_file] * nb_lignes),
+                # +2 pour ligne d'en-tête Excel
+                "source_row_no": df.index.to_numpy(dtype=np.int64) + 2,
+            }
+        )
+
+        # Logger les issues de staging (ordre des lignes)
+        positions = [
+            (pos, nom, brut)
+            for nom, brut, masque in staging_issues
+            for pos in np.flatnonzero(masque)
+        ]
+        if positions:
+            positions.sort(key=lambda p: int(p[0]))
+            logger.warning(f"⚠️ {len(positions)} issues détectées pour staging")
+            for pos, nom, brut in positions[:5]:  # Logger les 5 premières
+                logger.warning(
+                    f"  Ligne {df.index[pos] + 1}: {nom} = '{brut.iloc[pos]}' (MONTANT_INVALIDE)"
+                )
+
+        return frame
+
+    def _apply_sign_policy_vectorise(
+        self, frame: pd.DataFrame, apply_policies: bool = True
+    ) -> pd.DataFrame:
+        """
+        Version colonne de _apply_sign_policy / _apply_unsigned_cents.
+
+        Les signes de reference.sign_policies sont joints par code de paie
+        (Series mappée, défaut +1/+1) et les montants convertis en cents
+        int64 (troncature vers zéro, comme int()).
+        """
+        if apply_policies:
+            policies = self._fetch_sign_policies(frame["code_paie"].unique().tolist())
+            codes = frame["pay_code"]
+            employee_sign = (
+                codes.map({c: p["employee_sign"] for c, p in policies.items()})
+                .fillna(1)
+                .to_numpy(dtype=np.int64)
+            )
+            employer_sign = (
+                codes.map({c: p["employer_sign"] for c, p in policies.items()})
+                .fillna(1)
+                .to_numpy(dtype=np.int64)
+            )
+            logger.info(f"✓ Sign policy appliquée: {len(policies)} codes mappés")
+        else:
+            employee_sign = employer_sign = np.ones(len(frame), dtype=np.int64)
+
+        amount_employee = frame["amount_employee"].to_numpy(dtype=np.float64)
+        amount_employer = frame["part_employeur"].to_numpy(dtype=np.float64)
+
+        frame["amount_employee_norm_cents"] = (
+            np.trunc(amount_employee * 100).astype(np.int64) * employee_sign
+        )
+        frame["amount_employer_norm_cents"] = (
+            np.trunc(amount_employer * 100).astype(np.int64) * employer_sign
+        )
+        return frame
+
+    @staticmethod
+    def _frame_to_rows(frame: pd.DataFrame) -> list[dict]:
+        """Convertit le DataFrame mappé en list[dict] de types Python natifs."""
+        colonnes = list(frame.columns)
+        valeurs = [frame[c].tolist() for c in colonnes]
+        return [dict(zip(colonnes, ligne)) for ligne in zip(*valeurs)]
+
+    def _fetch_sign_policies(self, pay_codes: list) -> dict[str, dict[str, int]]:
+        """Lit les sign_policies des codes donnés (une seule requête)."""
+        sql = """
+        SELECT pay_code, employee_sign, employer_sign
+        FROM reference.sign_policies
+        WHERE pay_code = ANY(%(pay_codes)s)
+        """
+
+        policies_result = self.repo.run_query(sql, {"pay_codes": pay_codes})
+
+        # Construire dict de policies
+        policies = {}
+        if policies_result:
+            for row in policies_result:
+                policies[row[0]] = {
+                    "employee_sign": int(row[1]),
+                    "employer_sign": int(row[2]),
+                }
+        return policies
+
     def _validate_rows(self, rows: list[dict]) -> None:
         """Valide les lignes avant insertion."""
         errors = []
@@ -1224,23 +1661,130 @@ class ImportServiceComplete:
         logger.info(f"✅ Transaction committée: batch_id={batch_id}")
         return batch_id
 
-    def _upsert_employees(self, conn, rows: list[dict]) -> dict[str, str]:
-        """Upsert employees et retourne mapping matricule → employee_id."""
-        matricules = list(set(row["matricule"] for row in rows))
-
-        employee_ids = {}
-
-        for matricule in matricules:
-            # Récupérer nom_employe depuis rows (nom français)
-            nom_employe = next(
-                (
-                    row["nom_employe"]
-                    for row in rows
-                    if row["matricule"] == matricule and row["nom_employe"]
-                ),
-                None,
+    def _import_streaming(
+        self,
+        file_path: str,
+        period_id: str,
+        pay_date: datetime,
+        checksum: str,
+        user_id: str,
+        apply_sign_policy: bool,
+        chunk_size: int,
+    ) -> tuple[str, int]:
+        """
+        Pipeline par blocs: nettoyage → normalisation → mapping → signes →
+        validation → upsert dimensions → insertion, bloc après bloc.
+
+        Tout se fait dans une seule transaction (run_tx): un bloc invalide
+        annule l'import complet. Seul le bloc courant est en mémoire.
+
+        Returns:
+            (batch_id, nombre de lignes insérées)
+        """
+        file_name = Path(file_path).name
+
+        if self.progress_callback:
+            self.progress_callback(15, "Lecture du fichier Excel en flux...", {})
+
+        def transaction_fn(conn):
+            rows_count = 0
+            cleaned_count = 0
+
+            for chunk_idx, chunk in enumerate(
+                self._iter_excel_chunks(file_path, chunk_size)
+            ):
+                if self._cancelled:
+                    raise InterruptedError("Import annulé par l'utilisateur")
+
+                rows_total = chunk.attrs.get("rows_total")
+
+                df = clean_payroll_excel_df(chunk)
+                if df is None or df.empty:
+                    continue
+
+                # Le nettoyage réindexe à partir de 0: décaler pour que
+                # source_row_no corresponde au mode non streaming
+                df.index = df.index + cleaned_count
+                cleaned_count += len(df)
+
+                df_normalized = self._normalize_columns_fallback(df)
+                mapped = self._map_rows_vectorise(df_normalized, pay_date, file_name)
+                signed_rows = self._frame_to_rows(
+                    self._apply_sign_policy_vectorise(mapped, apply_sign_policy)
+                )
+
+                self._validate_rows(signed_rows)
+
+                employee_ids = self._upsert_employees(conn, signed_rows)
+                budget_post_ids = self._upsert_budget_posts(conn, signed_rows)
+                self._upsert_pay_codes(conn, signed_rows)
+
+                self._insert_transactions_batch(
+                    conn,
+                    signed_rows,
+                    period_id,
+                    pay_date,
+                    employee_ids,
+                    budget_post_ids,
+                    rows_offset=rows_count,
+                    rows_total=rows_total,
+                )
+                rows_count += len(signed_rows)
+
+                logger.info(
+                    f"📦 Bloc {chunk_idx + 1}: {len(signed_rows)} lignes "
+                    f"(total {rows_count}, pic RSS {_peak_rss_mb()} Mo)"
+                )
+
+            if rows_count == 0:
+                raise ValueError("Fichier Excel invalide ou vide après nettoyage.")
+
+            batch_id = self._create_import_batch_tx(
+                conn,
+                file_name,
+                checksum,
+                period_id,
+                pay_date,
+                rows_count,
+                user_id,
+                "success",
             )
 
+            return batch_id, rows_count
+
+        batch_id, rows_count = self.repo.run_tx(transaction_fn)
+        logger.info(f"✅ Transaction committée: batch_id={batch_id}")
+
+        if self.progress_callback:
+            self.progress_callback(
+                85,
+                f"Insertion terminée: {rows_count} lignes",
+                {"rows_inserted": rows_count},
+            )
+
+        return batch_id, rows_count
+
+    def _upsert_employees(self, conn, rows: list[dict]) -> dict[str, str]:
+        """
+        Upsert employees et retourne mapping matricule → employee_id.
+
+        Un seul passage sur rows construit le nom de chaque matricule, puis
+        une seule requête (tableaux unnest) upserte tous les employés.
+        """
+        noms_par_matricule: dict[str, Optional[str]] = {}
+        for row in rows:
+            matricule = row["matricule"]
+            if not noms_par_matricule.get(matricule):
+                # Premier nom non vide rencontré (nom français)
+                noms_par_matricule[matricule] = row["nom_employe"] or None
+
+        matricules = []
+        matricules_norm = []
+        noms_norm = []
+        prenoms_norm = []
+        noms_complets = []
+
+        for matricule, nom_employe in noms_par_matricule.items():
             if nom_employe:
                 # Parser nom/prénom (heuristique simple)
                 parts = nom_employe.split()
@@ -1250,8 +1794,6 @@ class ImportServiceComplete:
                 prenom_norm = unidecode(prenom.lower().strip())
                 nom_complet = nom_employe
             else:
-                nom = matricule
-                prenom = ""
                 nom_norm = matricule.lower()
                 prenom_norm = ""
                 nom_complet = matricule
@@ -1262,9 +1804,33 @@ class ImportServiceComplete:
                 # Retirer zéros en tête
                 matricule_clean = matricule_clean.lstrip("0") or matricule_clean
 
-            # Upsert avec employee_key (colonne UNIQUE dans core.employees)
-            # Utilise le schéma standard : employee_key, matricule_norm, nom_norm, prenom_norm
-            sql = """
+            matricules.append(matricule)
+            matricules_norm.append(matricule_clean if matricule_clean else None)
+            noms_norm.append(nom_norm)
+            prenoms_norm.append(prenom_norm)
+            noms_complets.append(nom_complet)
+
+        if not matricules:
+            return {}
+
+        # Upsert avec employee_key (colonne UNIQUE dans core.employees)
+        # Utilise le schéma standard : employee_key, matricule_norm, nom_norm, prenom_norm
+        # DISTINCT ON: deux matricules bruts peuvent donner la même clé
+        # ("0123" et "123"); ON CONFLICT ne peut toucher une ligne qu'une fois.
+        sql = """
+        WITH src AS (
+            SELECT
+                core.compute_employee_key(s.matricule, s.nom_complet) AS employee_key,
+                s.*
+            FROM unnest(
+                %(matricules)s::text[],
+                %(matricules_norm)s::text[],
+                %(noms_norm)s::text[],
+                %(prenoms_norm)s::text[],
+                %(noms_complets)s::text[]
+            ) AS s(matricule, matricule_norm, nom_norm, prenom_norm, nom_complet)
+        ),
+        upserted AS (
             INSERT INTO core.employees (
                 employee_key,
                 matricule_norm,
@@ -1273,15 +1839,17 @@ class ImportServiceComplete:
                 prenom_norm,
                 nom_complet,
                 statut
-            ) VALUES (
-                core.compute_employee_key(%(matricule)s, %(nom_complet)s),
-                %(matricule_norm)s,
-                %(matricule_raw)s,
-                %(nom_norm)s,
-                %(prenom_norm)s,
-                %(nom_complet)s,
-                'actif'
             )
+            SELECT DISTINCT ON (employee_key)
+                employee_key,
+                matricule_norm,
+                matricule,
+                nom_norm,
+                prenom_norm,
+                nom_complet,
+                'actif'
+            FROM src
+            ORDER BY employee_key, matricule DESC
             ON CONFLICT (employee_key) DO UPDATE SET
                 nom_norm = EXCLUDED.nom_norm,
                 prenom_norm = EXCLUDED.prenom_norm,
@@ -1289,31 +1857,31 @@ class ImportServiceComplete:
                 matricule_norm = EXCLUDED.matricule_norm,
                 matricule_raw = EXCLUDED.matricule_raw,
                 updated_at = CURRENT_TIMESTAMP
-            RETURNING employee_id::text
-            """
+            RETURNING employee_id, employee_key
+        )
+        SELECT src.matricule, upserted.employee_id::text
+        FROM src
+        JOIN upserted USING (employee_key)
+        """
 
-            with conn.cursor() as cur:
-                cur.execute(
-                    sql,
-                    {
-                        "matricule": matricule,
-                        "nom": nom,
-                        "prenom": prenom,
-                        "matricule_norm": matricule_clean if matricule_clean else None,
-                        "matricule_raw": matricule,
-                        "nom_norm": nom_norm,
-                        "prenom_norm": prenom_norm,
-                        "nom_complet": nom_complet,
-                    },
-                )
-                employee_id = cur.fetchone()[0]
-                employee_ids[matricule] = employee_id
+        with conn.cursor() as cur:
+            cur.execute(
+                sql,
+                {
+                    "matricules": matricules,
+                    "matricules_norm": matricules_norm,
+                    "noms_norm": noms_norm,
+                    "prenoms_norm": prenoms_norm,
+                    "noms_complets": noms_complets,
+                },
+            )
+            employee_ids = {matricule: employee_id for matricule, employee_id in cur}
 
         logger.info(f"✓ Employees upsertés: {len(employee_ids)}")
         return employee_ids
 
     def _upsert_budget_posts(self, conn, rows: list[dict]) -> dict[str, int]:
-        """Upsert budget posts et retourne mapping code → budget_post_id."""
+        """Upsert budget posts (une requête) et retourne mapping code → budget_post_id."""
         codes = list(
             set(
                 row.get("budget_post_code", row.get("poste_budgetaire", "N/A"))
@@ -1321,41 +1889,44 @@ class ImportServiceComplete:
             )
         )
 
-        budget_post_ids = {}
+        if not codes:
+            return {}
 
-        for code in codes:
-            sql = """
-            INSERT INTO core.budget_posts (code, description, active)
-            VALUES (%(code)s, %(code)s, TRUE)
-            ON CONFLICT (code) DO UPDATE SET
-                active = TRUE
-            RETURNING budget_post_id
-            """
+        sql = """
+        INSERT INTO core.budget_posts (code, description, active)
+        SELECT code, code, TRUE
+        FROM unnest(%(codes)s::text[]) AS s(code)
+        ON CONFLICT (code) DO UPDATE SET
+            active = TRUE
+        RETURNING code, budget_post_id
+        """
 
-            with conn.cursor() as cur:
-                cur.execute(sql, {"code": code})
-                budget_post_id = cur.fetchone()[0]
-                budget_post_ids[code] = budget_post_id
+        with conn.cursor() as cur:
+            cur.execute(sql, {"codes": codes})
+            budget_post_ids = {code: budget_post_id for code, budget_post_id in cur}
 
         logger.info(f"✓ Budget posts upsertés: {len(budget_post_ids)}")
         return budget_post_ids
 
     def _upsert_pay_codes(self, conn, rows: list[dict]) -> None:
-        """Upsert pay codes."""
+        """Upsert pay codes (une requête)."""
         pay_codes = list(
             set(row.get("code_paie", row.get("pay_code", "")) for row in rows)
         )
 
-        for pay_code in pay_codes:
-            sql = """
-            INSERT INTO core.pay_codes (pay_code, label, category, active)
-            VALUES (%(pay_code)s, %(label)s, 'Non catégorisé', TRUE)
-            ON CONFLICT (pay_code) DO UPDATE SET
-                active = TRUE
-            """
+        if not pay_codes:
+            return
 
-            with conn.cursor() as cur:
-                cur.execute(sql, {"pay_code": pay_code, "label": f"Code {pay_code}"})
+        sql = """
+        INSERT INTO core.pay_codes (pay_code, label, category, active)
+        SELECT pay_code, 'Code ' || pay_code, 'Non catégorisé', TRUE
+        FROM unnest(%(pay_codes)s::text[]) AS s(pay_code)
+        ON CONFLICT (pay_code) DO UPDATE SET
+            active = TRUE
+        """
+
+        with conn.cursor() as cur:
+            cur.execute(sql, {"pay_codes": pay_codes})
 
         logger.info(f"✓ Pay codes upsertés: {len(pay_codes)}")
 
@@ -1367,85 +1938,120 @@ class ImportServiceComplete:
         pay_date: datetime,
         employee_ids: dict,
         budget_post_ids: dict,
+        rows_offset: int = 0,
+        rows_total: Optional[int] = None,
     ) -> None:
-        """Insère les transactions en batch dans imported_payroll_master (noms normalisés)."""
-        sql = """
-        INSERT INTO payroll.imported_payroll_master (
-            numero_ligne, categorie_emploi, code_emploi, titre_emploi, date_paie,
-            matricule, nom_employe, categorie_paie, code_paie, description_code_paie,
-            poste_budgetaire, description_poste_budgetaire, montant_employe, part_employeur, montant_combine,
-            source_file, source_row_number
-        ) VALUES (
-            %(n_de_ligne)s, %(categorie_emploi)s, %(code_emploi)s, %(titre_emploi)s, %(date_paie)s,
-            %(matricule)s, %(employe)s, %(categorie_paie)s, %(code_paie)s, %(desc_code_paie)s,
-            %(poste_budgetaire)s, %(desc_poste_budgetaire)s, %(montant)s, %(part_employeur)s, %(mnt_cmb)s,
-            %(source_file)s, %(source_row_number)s
-        )
         """
+        Insère les transactions dans imported_payroll_master (noms normalisés).
 
-        params_list = []
-        for row in rows:
-            if self._cancelled:
-                raise InterruptedError("Import annulé par l'utilisateur")
+        Les lignes sont écrites directement depuis rows, par lots de
+        TRANSACTION_BATCH_SIZE: un COPY par lot (mode "copy") ou un
+        executemany en pipeline (mode "pipeline").
 
-            params_list.append(
-                {
-                    # Paramètres correspondant aux colonnes de imported_payroll_master
-                    "n_de_ligne": row.get("numero_ligne", 0),
-                    "categorie_emploi": row.get("categorie_emploi", ""),
-                    "code_emploi": row.get("code_emploi", ""),
-                    "titre_emploi": row.get("titre_emploi", ""),
-                    "date_paie": pay_date.date(),
-                    "matricule": row.get("matricule", ""),
-                    "employe": row.get("nom_employe", ""),
-                    "categorie_paie": row.get("categorie_paie", ""),
-                    "code_paie": row.get("code_paie", ""),
-                    "desc_code_paie": row.get("description_code_paie", ""),
-                    "poste_budgetaire": row.get("poste_budgetaire", ""),
-                    "desc_poste_budgetaire": row.get(
-                        "description_poste_budgetaire", ""
-                    ),
-                    "montant": row.get("montant_employe", 0) or 0,
-                    "part_employeur": row.get("part_employeur", 0)
-                    or 0,  # NUMERIC maintenant
-                    "mnt_cmb": row.get("montant_combine", 0) or 0,  # NUMERIC maintenant
-                    "source_file": row.get("source_file", ""),
-                    "source_row_number": row.get("source_row_no", 0),
-                }
-            )
+        En mode "copy", chaque lot passe sous un savepoint: si COPY n'est pas
+        pris en charge (COPY_UNSUPPORTED_ERRORS), le lot est rejoué en
+        pipeline et le service reste en mode "pipeline" pour la suite.
 
-        # Découper en batches de 5000 pour progression
-        batch_size = 5000
-        total_rows = len(params_list)
-        batches = [
-            params_list[i : i + batch_size] for i in range(0, total_rows, batch_size)
-        ]
+        En mode streaming, rows_offset (lignes déjà insérées) et rows_total
+        (estimation pour le fichier) rendent la progression cumulative.
+        """
+        total_rows = len(rows)
+        total_batches = (
+            total_rows + TRANSACTION_BATCH_SIZE - 1
+        ) // TRANSACTION_BATCH_SIZE
+        date_paie = pay_date.date()
+        columns = ", ".join(TRANSACTION_COLUMNS)
+
+        copy_sql = f"COPY payroll.imported_payroll_master ({columns}) FROM STDIN"
+        placeholders = ", ".join(["%s"] * len(TRANSACTION_COLUMNS))
+        insert_sql = f"INSERT INTO payroll.imported_payroll_master ({columns}) VALUES ({placeholders})"
+
+        inserted = 0
+        progress_total = max(rows_total or 0, rows_offset + total_rows)
+        start_time = time.perf_counter()
 
         with conn.cursor() as cur:
-            for batch_idx, batch in enumerate(batches):
+            for batch_idx, start in enumerate(
+                range(0, total_rows, TRANSACTION_BATCH_SIZE)
+            ):
                 if self._cancelled:
                     raise InterruptedError("Import annulé par l'utilisateur")
 
-                cur.executemany(sql, batch)
+                batch = rows[start : start + TRANSACTION_BATCH_SIZE]
+
+                if self.insert_mode == INSERT_MODE_COPY:
+                    try:
+                        # Savepoint: un COPY refusé n'annule pas la transaction
+                        with conn.transaction():
+                            with cur.copy(copy_sql) as copy:
+                                for row in batch:
+                                    copy.write_row(
+                                        self._transaction_values(row, date_paie)
+                                    )
+                    except COPY_UNSUPPORTED_ERRORS as e:
+                        logger.warning(
+                            f"⚠️ COPY indisponible ({e}), bascule en mode pipeline"
+                        )
+                        self.insert_mode = INSERT_MODE_PIPELINE
+
+                if self.insert_mode == INSERT_MODE_PIPELINE:
+                    with conn.pipeline():
+                        cur.executemany(
+                            insert_sql,
+                            [self._transaction_values(row, date_paie) for row in batch],
+                        )
+
+                inserted += len(batch)
 
                 # Progression pour l'insertion (65% à 85%)
                 if self.progress_callback:
-                    inserted = (batch_idx + 1) * len(batch)
-                    pct = (
-                        65 + int((inserted / total_rows) * 20) if total_rows > 0 else 85
-                    )
+                    elapsed = time.perf_counter() - start_time
+                    done = rows_offset + inserted
+                    pct = 65 + int((done / progress_total) * 20)
                     self.progress_callback(
                         pct,
-                        f"Insertion: {inserted}/{total_rows} lignes (batch {batch_idx + 1}/{len(batches)})",
+                        f"Insertion: {done}/{progress_total} lignes (batch {batch_idx + 1}/{total_batches})",
                         {
-                            "rows_inserted": inserted,
-                            "total_rows": total_rows,
+                            "rows_inserted": done,
+                            "total_rows": progress_total,
                             "current_batch": batch_idx + 1,
-                            "total_batches": len(batches),
+                            "total_batches": total_batches,
+                            "insert_mode": self.insert_mode,
+                            "elapsed_s": round(elapsed, 3),
+                            "rows_per_sec": (
+                                round(inserted / elapsed, 1) if elapsed > 0 else 0.0
+                            ),
                         },
                     )
 
-        logger.info(f"✓ Transactions insérées: {len(params_list)}")
+        elapsed = time.perf_counter() - start_time
+        logger.info(
+            f"✓ Transactions insérées: {inserted} ({self.insert_mode}, "
+            f"{elapsed:.2f}s, {inserted / elapsed if elapsed > 0 else 0:.0f} lignes/s)"
+        )
+
+    @staticmethod
+    def _transaction_values(row: dict, date_paie) -> tuple:
+        """Valeurs d'une ligne dans l'ordre de TRANSACTION_COLUMNS."""
+        return (
+            row.get("numero_ligne", 0),
+            row.get("categorie_emploi", ""),
+            row.get("code_emploi", ""),
+            row.get("titre_emploi", ""),
+            date_paie,
+            row.get("matricule", ""),
+            row.get("nom_employe", ""),
+            row.get("categorie_paie", ""),
+            row.get("code_paie", ""),
+            row.get("description_code_paie", ""),
+            row.get("poste_budgetaire", ""),
+            row.get("description_poste_budgetaire", ""),
+            row.get("montant_employe", 0) or 0,
+            row.get("part_employeur", 0) or 0,  # NUMERIC maintenant
+            row.get("montant_combine", 0) or 0,  # NUMERIC maintenant
+            row.get("source_file", ""),
+            row.get("source_row_no", 0),
+        )
 
     def _create_import_batch_tx(
         self,
@@ -1518,36 +2124,3 @@ class ImportServiceComplete:
         )
 
         return result[0]["batch_id"]
-
-    def _refresh_materialized_views(self) -> None:
-        """Rafraîchit les vues matérialisées (CONCURRENTLY)."""
-        views = [
-            "payroll.v_monthly_payroll_summary",
-            "payroll.v_employee_current_salary",
-            "payroll.v_employee_annual_history",
-        ]
-
-        for view in views:
-            try:
-                # Vérifier si la vue existe avant de la rafraîchir
-                check_sql = """
-                SELECT EXISTS (
-                    SELECT 1 FROM pg_matviews 
-                    WHERE schemaname = %(schema)s AND matviewname = %(view)s
-                )
-                """
-                schema, view_name = view.split(".")
-                exists = self.repo.run_query(
-                    check_sql, {"schema": schema, "view": view_name}, fetch_one=True
-                )
-
-                if exists and exists[0]:
-                    logger.info(f"🔄 Refresh {view}...")
-                    self.repo.run_query(
-                        f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"
-                    )
-                    logger.info(f"✅ {view} refreshed")
-                else:
-                    logger.debug(f"⏩ Vue {view} n'existe pas, ignorée")
-            except Exception as e:
-                logger.warning(f"⚠️ Erreur refresh {view}: {e}")
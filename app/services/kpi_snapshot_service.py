@@ -151,148 +151,167 @@ class KPISnapshotService:
         """
         logger.info(f"Calcul KPI date de paie {pay_date}")
 
-        # 1. KPI CARTES (agrégats globaux)
-        cards = self._calculate_cards(pay_date)
+        # 1. Cartes + anomalies + codes (une seule lecture de payroll_transactions)
+        cards, tables = self._calculate_single_pass(pay_date)
 
-        # 2. KPI TABLES (listes détaillées)
-        tables = self._calculate_tables(pay_date)
+        # 2. Top postes budgétaires (source: imported_payroll_master)
+        tables["postes_top"] = self._get_top_budget_posts(pay_date)
 
         return {"cards": cards, "tables": tables, "source": "kpi_snapshot"}
 
-    def _calculate_cards(self, pay_date: str) -> dict[str, Any]:
-        """Calcule les KPI cartes (agrégats globaux) - LOGIQUE CORRECTE."""
-        # Le paramètre pay_date est une date exacte au format 'YYYY-MM-DD' (ex: '2025-08-28')
-        sql = """
-        SELECT 
-            COALESCE(SUM(pt.amount_cents) / 100.0, 0) AS salaire_net_total,
-            COALESCE(SUM(CASE WHEN pt.amount_cents > 0 THEN pt.amount_cents ELSE 0 END) / 100.0, 0) AS masse_salariale,
-            COALESCE(SUM(CASE WHEN pt.amount_cents < 0 THEN pt.amount_cents ELSE 0 END) / 100.0, 0) AS deductions,
-            0.0 AS masse_employeur,
-            CASE 
-                WHEN COUNT(DISTINCT pt.employee_id) > 0
-                THEN (SUM(pt.amount_cents) / 100.0) / COUNT(DISTINCT pt.employee_id)
-                ELSE 0
-            END AS net_moyen,
-            COUNT(DISTINCT pt.employee_id) AS nb_employes,
-            COUNT(*) AS nb_transactions
-        FROM payroll.payroll_transactions pt
-        WHERE pt.pay_date = %(pay_date)s::date
+    def _calculate_single_pass(
+        self,
+        pay_date: str,
+        limit_codes: int = 10,
+        limit_anomalies: int = 20,
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
         """
+        Calcule cartes, anomalies, top codes et nouveaux codes en une requête.
 
-        result = self.repo.run_query(sql, {"pay_date": pay_date}, fetch_one=True)
+        La tranche pay_date est lue une seule fois (CTE matérialisée), puis
+        agrégée par GROUPING SETS: () pour les cartes, (pay_code) pour les
+        codes. Les nouveaux codes sont ceux absents de la date de paie
+        précédente (liste vide s'il n'y en a pas).
 
-        if result:
-            return {
-                "salaire_net_total": float(
-                    result[0] or 0
-                ),  # Somme simple de tous les montants
-                "masse_salariale": float(result[1] or 0),  # Montants positifs (info)
-                "deductions": float(result[2] or 0),  # Montants négatifs (info)
-                "masse_employeur": float(result[3] or 0),
-                "net_moyen": float(result[4] or 0),
-                "nb_employes": int(result[5] or 0),
-                "nb_transactions": int(result[6] or 0),
-            }
-        else:
-            return {
-                "salaire_net_total": 0.0,
-                "masse_salariale": 0.0,
-                "deductions": 0.0,
-                "masse_employeur": 0.0,
-                "net_moyen": 0.0,
-                "nb_employes": 0,
-                "nb_transactions": 0,
-            }
-
-    def _calculate_tables(self, pay_date: str) -> dict[str, Any]:
-        """Calcule les KPI tables (listes détaillées)."""
-        tables = {}
-
-        # 1. ANOMALIES (nets négatifs)
-        tables["anomalies"] = self._get_anomalies(pay_date)
-
-        # 2. TOP CODES PAY
-        tables["codes_top"] = self._get_top_pay_codes(pay_date)
-
-        # 3. TOP POSTES BUDGÉTAIRES
-        tables["postes_top"] = self._get_top_budget_posts(pay_date)
-
-        # 4. NOUVEAUX CODES (codes apparus cette date de paie mais pas date précédente)
-        # Pour l'instant on retourne liste vide (implémentation future)
-        tables["nouveaux_codes"] = []
-
-        return tables
-
-    def _get_anomalies(self, pay_date: str, limit: int = 20) -> list[dict]:
-        """Récupère les anomalies (nets négatifs, montants suspects)."""
-        sql = """
-        SELECT 
-            COALESCE(e.matricule, pt.employee_id::text) AS matricule,
-            COALESCE(e.nom || ' ' || e.prenom, 'N/A') AS nom_prenom,
-            COALESCE(pc.label, pt.pay_code) AS code_label,
-            pt.amount_cents / 100.0 AS montant,
-            pt.pay_date::text AS date_paie,
-            'Net négatif' AS type_anomalie
-        FROM payroll.payroll_transactions pt
-        LEFT JOIN core.employees e ON pt.employee_id = e.employee_id
-        LEFT JOIN core.pay_codes pc ON pt.pay_code = pc.pay_code
-        WHERE pt.pay_date = %(pay_date)s::date
-          AND pt.amount_cents < -100000
-        ORDER BY pt.amount_cents ASC
-        LIMIT %(limit)s
+        Returns:
+            (cards, tables) avec tables = anomalies, codes_top, nouveaux_codes
         """
-
-        result = self.repo.run_query(sql, {"pay_date": pay_date, "limit": limit})
-
-        anomalies = []
-        if result:
-            for row in result:
-                anomalies.append(
-                    {
-                        "matricule": row[0],
-                        "nom": row[1],
-                        "code": row[2],
-                        "montant": float(row[3] or 0),
-                        "date": row[4],
-                        "type": row[5],
-                    }
-                )
-
-        return anomalies
-
-    def _get_top_pay_codes(self, pay_date: str, limit: int = 10) -> list[dict]:
-        """Récupère le top N codes de paie par montant."""
         sql = """
-        SELECT 
-            COALESCE(pc.pay_code, pt.pay_code) AS pay_code,
-            COALESCE(pc.label, pt.pay_code) AS label,
-            COALESCE(pc.category, 'Inconnu') AS category,
-            COUNT(*) AS nb_transactions,
-            SUM(pt.amount_cents) / 100.0 AS total_montant
-        FROM payroll.payroll_transactions pt
-        LEFT JOIN core.pay_codes pc ON pt.pay_code = pc.pay_code
-        WHERE pt.pay_date = %(pay_date)s::date
-        GROUP BY COALESCE(pc.pay_code, pt.pay_code), COALESCE(pc.label, pt.pay_code), COALESCE(pc.category, 'Inconnu')
-        ORDER BY ABS(SUM(pt.amount_cents)) DESC
-        LIMIT %(limit)s
+        WITH tx AS MATERIALIZED (
+            SELECT pt.employee_id, pt.pay_code, pt.amount_cents
+            FROM payroll.payroll_transactions pt
+            WHERE pt.pay_date = %(pay_date)s::date
+        ),
+        agg AS (
+            SELECT
+                GROUPING(tx.pay_code) AS niveau,
+                tx.pay_code,
+                COUNT(*) AS nb_transactions,
+                COUNT(DISTINCT tx.employee_id) AS nb_employes,
+                COALESCE(SUM(tx.amount_cents), 0) AS total_cents,
+                COALESCE(SUM(tx.amount_cents) FILTER (WHERE tx.amount_cents > 0), 0) AS positif_cents,
+                COALESCE(SUM(tx.amount_cents) FILTER (WHERE tx.amount_cents < 0), 0) AS negatif_cents
+            FROM tx
+            GROUP BY GROUPING SETS ((), (tx.pay_code))
+        ),
+        codes AS (
+            SELECT
+                a.pay_code AS code,
+                COALESCE(pc.label, a.pay_code) AS label,
+                COALESCE(pc.category, 'Inconnu') AS category,
+                a.nb_transactions,
+                a.total_cents
+            FROM agg a
+            LEFT JOIN core.pay_codes pc ON a.pay_code = pc.pay_code
+            WHERE a.niveau = 0
+        ),
+        precedente AS (
+            SELECT MAX(pay_date) AS pay_date
+            FROM payroll.payroll_transactions
+            WHERE pay_date < %(pay_date)s::date
+        )
+        SELECT
+            t.nb_transactions,
+            t.nb_employes,
+            t.total_cents,
+            t.positif_cents,
+            t.negatif_cents,
+            (
+                SELECT COALESCE(json_agg(json_build_object(
+                    'matricule', x.matricule, 'nom', x.nom, 'code', x.code,
+                    'montant', x.montant, 'date', x.date, 'type', x.type
+                ) ORDER BY x.amount_cents), '[]'::json)
+                FROM (
+                    SELECT
+                        COALESCE(e.matricule, tx.employee_id::text) AS matricule,
+                        COALESCE(e.nom || ' ' || e.prenom, 'N/A') AS nom,
+                        COALESCE(pc.label, tx.pay_code) AS code,
+                        tx.amount_cents / 100.0 AS montant,
+                        %(pay_date)s::date::text AS date,
+                        'Net négatif' AS type,
+                        tx.amount_cents
+                    FROM tx
+                    LEFT JOIN core.employees e ON tx.employee_id = e.employee_id
+                    LEFT JOIN core.pay_codes pc ON tx.pay_code = pc.pay_code
+                    WHERE tx.amount_cents < -100000
+                    ORDER BY tx.amount_cents ASC
+                    LIMIT %(limit_anomalies)s
+                ) x
+            ) AS anomalies,
+            (
+                SELECT COALESCE(json_agg(json_build_object(
+                    'code', c.code, 'label', c.label, 'category', c.category,
+                    'nb_transactions', c.nb_transactions,
+                    'total_montant', c.total_cents / 100.0
+                ) ORDER BY ABS(c.total_cents) DESC), '[]'::json)
+                FROM (
+                    SELECT * FROM codes
+                    ORDER BY ABS(total_cents) DESC
+                    LIMIT %(limit_codes)s
+                ) c
+            ) AS codes_top,
+            (
+                SELECT COALESCE(json_agg(json_build_object(
+                    'code', c.code, 'label', c.label, 'category', c.category,
+                    'nb_transactions', c.nb_transactions,
+                    'total_montant', c.total_cents / 100.0
+                ) ORDER BY c.code), '[]'::json)
+                FROM codes c, precedente p
+                WHERE p.pay_date IS NOT NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM payroll.payroll_transactions prev
+                      WHERE prev.pay_date = p.pay_date
+                        AND prev.pay_code = c.code
+                  )
+            ) AS nouveaux_codes
+        FROM agg t
+        WHERE t.niveau = 1
         """
 
-        result = self.repo.run_query(sql, {"pay_date": pay_date, "limit": limit})
+        result = self.repo.run_query(
+            sql,
+            {
+                "pay_date": pay_date,
+                "limit_codes": limit_codes,
+                "limit_anomalies": limit_anomalies,
+            },
+            fetch_one=True,
+        )
+
+        # GROUPING SETS () garantit une ligne, même sans transaction
+        (
+            nb_transactions,
+            nb_employes,
+            total_cents,
+            positif_cents,
+            negatif_cents,
+            anomalies,
+            codes_top,
+            nouveaux_codes,
+        ) = result or (0, 0, 0, 0, 0, [], [], [])
+
+        nb_employes = int(nb_employes or 0)
+        salaire_net_total = float(total_cents or 0) / 100.0
+
+        cards = {
+            "salaire_net_total": salaire_net_total,  # Somme de tous les montants
+            "masse_salariale": float(positif_cents or 0) / 100.0,  # Positifs (info)
+            "deductions": float(negatif_cents or 0) / 100.0,  # Négatifs (info)
+            "masse_employeur": 0.0,
+            "net_moyen": salaire_net_total / nb_employes if nb_employes else 0.0,
+            "nb_employes": nb_employes,
+            "nb_transactions": int(nb_transactions or 0),
+        }
 
-        codes = []
-        if result:
-            for row in result:
-                codes.append(
-                    {
-                        "code": row[0],
-                        "label": row[1],
-                        "category": row[2],
-                        "nb_transactions": int(row[3] or 0),
-                        "total_montant": float(row[4] or 0),
-                    }
-                )
+        tables = {
+            "anomalies": [
+                {**row, "montant": float(row["montant"] or 0)} for row in anomalies
+            ],
+            "codes_top": [_code_row(row) for row in codes_top],
+            "nouveaux_codes": [_code_row(row) for row in nouveaux_codes],
+        }
 
-        return codes
+        return cards, tables
 
     def _get_top_budget_posts(self, pay_date: str, limit: int = 10) -> list[dict]:
         """Récupère le top N postes budgétaires par montant."""
@@ -403,6 +422,17 @@ class KPISnapshotService:
 # ========================================
 
 
+def _code_row(row: dict) -> dict:
+    """Normalise une ligne code de paie issue du JSON (types Python)."""
+    return {
+        "code": row["code"],
+        "label": row["label"],
+        "category": row["category"],
+        "nb_transactions": int(row["nb_transactions"] or 0),
+        "total_montant": float(row["total_montant"] or 0),
+    }
+
+
 def format_currency(amount: float) -> str:
     """Formate un montant en devise (ex: 1234.56 → '1 234,56 $')."""
     return f"{amount:,.2f} $".replace(",", " ").replace(".", ",")
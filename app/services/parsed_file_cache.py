@@ -0,0 +1,271 @@
+"""
+Parsed File Cache: DataFrames de fichiers de paie déjà parsés, par checksum
+
+preview_import et confirm_import reçoivent le même fichier: la feuille
+retenue ou le CSV lu (sortie de ImportServiceComplete._parse_excel_file) est
+conservé sur disque sous la clé SHA256 du contenu. La confirmation relit ce
+fichier au lieu de le reparser; l'entrée est supprimée après l'import.
+
+Les feuilles contiennent des données personnelles (noms, salaires):
+- répertoire de session privé (mkdtemp, droits 0700), supprimé par close()
+  et à la sortie du processus
+- aucun fichier d'une session précédente n'est relu (purgé à l'ouverture
+  d'un répertoire explicite)
+- stockage Parquet uniquement (aucun pickle); sans pyarrow le cache est
+  désactivé et chaque fichier est reparsé
+
+Les colonnes object aux types mélangés (non représentables en Arrow) sont
+stockées en texte: valeurs non vides converties par str(), vides → None.
+
+Éviction LRU bornée en octets (total des fichiers du répertoire).
+
+Usage:
+    cache = ParsedFileCache(max_bytes=512 * 1024 * 1024)
+    df = cache.get(checksum)
+    if df is None:
+        df = parse(...)
+        cache.put(checksum, df)
+    ...
+    cache.discard(checksum)   # après confirmation ou annulation
+"""
+
+import atexit
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    _HAS_ARROW = True
+except ImportError:
+    _HAS_ARROW = False
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+SESSION_PREFIX = "payroll_parsed_"
+# Répertoire partagé des versions précédentes (pickles): supprimé s'il existe
+LEGACY_DIRECTORY = Path(tempfile.gettempdir()) / "payroll_parsed_cache"
+
+_CHECKSUM_RE = re.compile(r"^[0-9a-f]{64}$")
+# Métadonnées Parquet: noms et dtypes d'origine des colonnes
+_METADATA_KEY = b"payroll_parsed_cache"
+_INDEX_FIELD = "__index__"
+
+
+class ParsedFileCache:
+    """Cache disque LRU (borné en octets) de DataFrames parsés, clé = SHA256."""
+
+    def __init__(
+        self,
+        directory: Optional[str | Path] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """
+        Args:
+            directory: Répertoire du cache (défaut: répertoire de session
+                <tmp>/payroll_parsed_XXXX créé par mkdtemp, supprimé par close)
+            max_bytes: Taille totale maximale des fichiers du cache
+        """
+        if directory:
+            self.directory = Path(directory)
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            os.chmod(self.directory, 0o700)
+            self._owns_directory = False
+            self._purge_leftovers()
+        else:
+            self.directory = Path(tempfile.mkdtemp(prefix=SESSION_PREFIX))
+            self._owns_directory = True
+            shutil.rmtree(LEGACY_DIRECTORY, ignore_errors=True)
+
+        self.max_bytes = max_bytes
+        self.enabled = _HAS_ARROW
+        if not self.enabled:
+            logger.info("Cache de parsing désactivé (pyarrow non installé)")
+        self._lock = threading.Lock()
+        # checksum -> (chemin, taille), du moins au plus récemment utilisé
+        self._entries: OrderedDict[str, tuple[Path, int]] = OrderedDict()
+        atexit.register(self.close)
+
+    def get(self, checksum: str) -> Optional[pd.DataFrame]:
+        """DataFrame du fichier de ce checksum, ou None (absent/illisible)."""
+        with self._lock:
+            entry = self._entries.get(checksum)
+            if entry is None:
+                return None
+            self._entries.move_to_end(checksum)
+
+        path = entry[0]
+        try:
+            return _from_arrow_table(pq.read_table(path))
+        except Exception as e:
+            logger.warning(f"⚠️ Cache de parsing illisible ({path.name}): {e}")
+            self.discard(checksum)
+            return None
+
+    def put(self, checksum: str, df: pd.DataFrame) -> Optional[Path]:
+        """Stocke le DataFrame (Parquet) puis applique l'éviction."""
+        if not _CHECKSUM_RE.match(checksum):
+            raise ValueError(f"Checksum SHA256 invalide: {checksum[:16]}")
+        if not self.enabled:
+            return None
+
+        path = self._write(checksum, df)
+        if path is None:
+            return None
+
+        with self._lock:
+            self._entries.pop(checksum, None)
+            self._entries[checksum] = (path, path.stat().st_size)
+            self._evict()
+        return path
+
+    def discard(self, checksum: str) -> None:
+        """Retire une entrée (après import confirmé ou annulé)."""
+        with self._lock:
+            entry = self._entries.pop(checksum, None)
+        if entry:
+            _unlink(entry[0])
+
+    def close(self) -> None:
+        """Supprime toutes les entrées (et le répertoire de session)."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for path, _ in entries:
+            _unlink(path)
+        if self._owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": sum(size for _, size in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "directory": str(self.directory),
+            }
+
+    def _write(self, checksum: str, df: pd.DataFrame) -> Optional[Path]:
+        tmp = self.directory / f".{checksum}.{threading.get_ident()}.tmp"
+        try:
+            table = _to_arrow_table(df)
+            if table is None:
+                return None
+            pq.write_table(table, tmp)
+            os.chmod(tmp, 0o600)
+            path = self.directory / f"{checksum}.parquet"
+            os.replace(tmp, path)
+            return path
+        except Exception as e:
+            logger.warning(f"⚠️ Mise en cache du fichier parsé impossible: {e}")
+            _unlink(tmp)
+            return None
+
+    def _evict(self) -> None:
+        total = sum(size for _, size in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, (path, size) = self._entries.popitem(last=False)
+            _unlink(path)
+            total -= size
+
+    def _purge_leftovers(self) -> None:
+        """Fichiers d'une session précédente: supprimés, jamais relus."""
+        for path in self.directory.iterdir():
+            if path.is_file() and path.suffix in (".parquet", ".pkl", ".tmp"):
+                _unlink(path)
+
+
+def _to_arrow_table(df: pd.DataFrame) -> Optional["pa.Table"]:
+    """
+    Table Arrow du DataFrame (colonnes positionnelles c0..cN + index), noms
+    et dtypes d'origine en métadonnées; None si non représentable.
+    """
+    try:
+        columns_json = json.dumps(list(df.columns))
+    except TypeError:
+        logger.debug("Noms de colonnes non sérialisables: feuille non mise en cache")
+        return None
+
+    arrays = []
+    dtypes = []
+    for position in range(df.shape[1]):
+        serie = df.iloc[:, position]
+        try:
+            arrays.append(pa.array(serie, from_pandas=True))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+            # Types mélangés (ex: nombres et texte): stockés en texte
+            arrays.append(
+                pa.array(
+                    [None if _is_missing(v) else str(v) for v in serie.tolist()],
+                    type=pa.string(),
+                )
+            )
+        dtypes.append(str(serie.dtype))
+
+    try:
+        arrays.append(pa.array(df.index, from_pandas=True))
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+        logger.debug("Index non représentable: feuille non mise en cache")
+        return None
+
+    metadata = json.dumps({"columns": json.loads(columns_json), "dtypes": dtypes})
+    names = [f"c{i}" for i in range(df.shape[1])] + [_INDEX_FIELD]
+    return pa.Table.from_arrays(arrays, names=names).replace_schema_metadata(
+        {_METADATA_KEY: metadata.encode("utf-8")}
+    )
+
+
+def _from_arrow_table(table: "pa.Table") -> pd.DataFrame:
+    """DataFrame d'origine: noms, dtypes et index restaurés."""
+    metadata = json.loads(table.schema.metadata[_METADATA_KEY])
+    index = pd.Index(table.column(_INDEX_FIELD).to_pandas())
+
+    columns = {}
+    for position, dtype in enumerate(metadata["dtypes"]):
+        column = table.column(position)
+        if dtype == "object":
+            # Valeurs Python natives (int, datetime, ...), vides → None
+            serie = column.to_pandas(
+                integer_object_nulls=True, timestamp_as_object=True
+            ).astype(object)
+            serie = serie.where(serie.notna(), None)
+        else:
+            serie = column.to_pandas()
+            try:
+                serie = serie.astype(dtype)
+            except (TypeError, ValueError):
+                pass
+        columns[position] = serie.set_axis(index)
+
+    df = pd.DataFrame(columns, index=index)
+    df.columns = metadata["columns"]
+    return df
+
+
+def _is_missing(value) -> bool:
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):  # valeur non scalaire
+        return False
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.debug(f"Suppression impossible ({path}): {e}")
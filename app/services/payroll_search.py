@@ -0,0 +1,173 @@
+"""
+Payroll Search: recherche indexée dans les lignes de paie importées
+
+Les filtres texte de AppBridge.search_payroll (matricule, employé, code de
+paie) ne sont plus des ILIKE '%x%' sur payroll.v_imported_payroll (parcours
+séquentiel): ils portent sur les colonnes normalisées de
+payroll.imported_payroll_master (migration 014), indexées deux fois:
+- "substring": LIKE '%x%' via l'index GIN trigramme
+- "prefix": bornes col >= x AND col < x || U+10FFFF via l'index btree
+  (collation "C")
+
+Stratégie choisie automatiquement par terme:
+- terme terminé par '*' → préfixe ('12*' = matricules commençant par 12)
+- terme de moins de 3 caractères → préfixe (aucun trigramme exploitable)
+- sinon → sous-chaîne
+
+Changement de comportement pour les termes courts: 'Lé' trouve « Léa
+Martin » mais plus « Clément » (LIKE '%lé%' ne peut utiliser aucun index et
+reviendrait au parcours complet). Saisir au moins 3 caractères pour une
+recherche par sous-chaîne.
+
+Usage:
+    search = PayrollSearch(repo)
+    conditions, params = search.build_conditions(filters)
+    plan = search.explain(filters)  # {'index_names': [...], 'seq_scans': [...]}
+"""
+
+from typing import Any
+
+STRATEGY_PREFIX = "prefix"
+STRATEGY_SUBSTRING = "substring"
+
+# pg_trgm n'extrait aucun trigramme complet sous 3 caractères
+TRIGRAM_MIN_LENGTH = 3
+
+# filtre -> (colonne normalisée, normalisation SQL du terme; même
+# expression que la colonne générée de la migration 014)
+SEARCH_FIELDS = {
+    "matricule": ("matricule_norm", "lower(btrim(%({param})s))"),
+    "employe": (
+        "employe_norm",
+        "lower(core.immutable_unaccent(btrim(%({param})s)))",
+    ),
+    "code": ("code_paie_norm", "lower(btrim(%({param})s))"),
+}
+
+
+def choose_strategy(term: str) -> str:
+    """
+    Préfixe (terme court ou terminé par '*') ou sous-chaîne.
+
+    Un terme de 1-2 caractères ne correspond qu'aux débuts de valeur.
+    """
+    if term.endswith("*") or len(term.strip()) < TRIGRAM_MIN_LENGTH:
+        return STRATEGY_PREFIX
+    return STRATEGY_SUBSTRING
+
+
+class PayrollSearch:
+    """Construit et vérifie (EXPLAIN) les conditions de recherche indexées."""
+
+    def __init__(self, repo):
+        """
+        Args:
+            repo: Instance de DataRepository configurée
+        """
+        self.repo = repo
+
+    def build_conditions(
+        self, filters: dict[str, Any], id_column: str = "id"
+    ) -> tuple[list[str], dict[str, Any]]:
+        """
+        Conditions WHERE pour les filtres texte renseignés.
+
+        Les conditions sont regroupées dans une sous-requête sur
+        imported_payroll_master (id IN (...)), applicable à toute vue qui
+        expose l'id de cette table.
+
+        Args:
+            filters: {'matricule': ..., 'employe': ..., 'code': ...}
+            id_column: Colonne id de la relation interrogée
+
+        Returns:
+            (conditions SQL, paramètres nommés search_*)
+        """
+        predicates, params = self._predicates(filters)
+        if not predicates:
+            return [], {}
+        subquery = (
+            "SELECT m.id FROM payroll.imported_payroll_master m WHERE "
+            + " AND ".join(predicates)
+        )
+        return [f"{id_column} IN ({subquery})"], params
+
+    def strategies(self, filters: dict[str, Any]) -> dict[str, str]:
+        """Stratégie retenue par filtre renseigné (diagnostic)."""
+        return {
+            name: choose_strategy(str(filters[name]).strip())
+            for name in SEARCH_FIELDS
+            if filters.get(name) and str(filters[name]).strip(" *")
+        }
+
+    def explain(
+        self, filters: dict[str, Any], force_index: bool = True
+    ) -> dict[str, Any]:
+        """
+        Plan de la recherche sur imported_payroll_master (EXPLAIN FORMAT JSON).
+
+        Args:
+            filters: Filtres texte comme pour build_conditions
+            force_index: SET LOCAL enable_seqscan = off, pour vérifier que
+                les index sont utilisables même sur une petite table
+
+        Returns:
+            {'strategies', 'index_names', 'seq_scans', 'node_types', 'plan'}
+        """
+        predicates, params = self._predicates(filters)
+        sql = "EXPLAIN (FORMAT JSON) SELECT m.id FROM payroll.imported_payroll_master m"
+        if predicates:
+            sql += " WHERE " + " AND ".join(predicates)
+
+        # Connexions du pool en autocommit: SET LOCAL n'a d'effet que dans
+        # une transaction explicite, annulée à la sortie
+        with self.repo.get_connection() as conn:
+            with conn.transaction(force_rollback=True):
+                if force_index:
+                    conn.execute("SET LOCAL enable_seqscan = off")
+                plan = self.repo.run_select(conn, sql, params)[0][0][0]["Plan"]
+
+        nodes = list(_walk_plan(plan))
+        return {
+            "strategies": self.strategies(filters),
+            "index_names": sorted(
+                {n["Index Name"] for n in nodes if n.get("Index Name")}
+            ),
+            "seq_scans": sorted(
+                {
+                    n.get("Relation Name", "")
+                    for n in nodes
+                    if n["Node Type"] == "Seq Scan"
+                }
+            ),
+            "node_types": [n["Node Type"] for n in nodes],
+            "plan": plan,
+        }
+
+    def _predicates(self, filters: dict[str, Any]) -> tuple[list[str], dict[str, Any]]:
+        predicates: list[str] = []
+        params: dict[str, Any] = {}
+        for name, (column, normalize) in SEARCH_FIELDS.items():
+            raw = filters.get(name)
+            term = str(raw).strip() if raw else ""
+            if not term.strip(" *"):
+                continue
+
+            param = f"search_{name}"
+            strategy = choose_strategy(term)
+            params[param] = term.rstrip("*")
+            value = normalize.format(param=param)
+            if strategy == STRATEGY_PREFIX:
+                predicates.append(
+                    f"m.{column} >= {value} AND m.{column} < {value} || chr(1114111)"
+                )
+            else:
+                predicates.append(f"m.{column} LIKE '%%' || {value} || '%%'")
+        return predicates, params
+
+
+def _walk_plan(node: dict[str, Any]):
+    """Parcours en profondeur des nœuds d'un plan EXPLAIN JSON."""
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk_plan(child)
@@ -0,0 +1,347 @@
+"""
+Post-Import Queue: travaux post-import asynchrones (KPI + synthèses)
+
+Après le commit d'un import, le recalcul des KPI et la mise à jour des tables
+de synthèse sont placés dans payroll.post_import_jobs (migration 013) puis
+exécutés par un thread worker, hors du chemin critique de l'UI.
+
+Responsabilités:
+- Mettre en file un job par date de paie (dédupliqué tant qu'il est en attente)
+- Réclamer et exécuter les jobs (FOR UPDATE SKIP LOCKED)
+- Appeler le callback import_finished(pay_date, batch_id, rows) à la fin du job
+- Exposer l'état d'un job pour le polling de l'UI
+
+Usage:
+    queue = PostImportQueue(repo, KPISnapshotService(repo))
+    queue.start()
+    job_id = queue.enqueue('2025-08-28', batch_id, 1234, callback=on_finished)
+    queue.get_status(job_id)  # {'status': 'running', ...}
+    queue.stop()
+"""
+
+import json
+import logging
+import threading
+from collections.abc import Callable
+from datetime import date, datetime
+from typing import Any, Optional
+
+from services.summary_tables import SummaryTablesService, as_pay_date
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_ERROR = "error"
+
+# Intervalle de scrutation du worker (s) quand aucun enqueue ne le réveille
+POLL_INTERVAL_S = 5.0
+# Un job 'running' plus ancien est considéré abandonné (processus interrompu)
+STALE_JOB_S = 600
+
+_JOB_COLUMNS = (
+    "job_id",
+    "pay_date",
+    "batch_id",
+    "rows_count",
+    "status",
+    "attempts",
+    "result",
+    "error_message",
+    "created_at",
+    "started_at",
+    "finished_at",
+)
+
+
+class PostImportQueue:
+    """File de travaux post-import adossée à PostgreSQL, avec thread worker."""
+
+    def __init__(
+        self,
+        repo,
+        kpi_service=None,
+        summary_service: Optional[SummaryTablesService] = None,
+        poll_interval: float = POLL_INTERVAL_S,
+    ):
+        """
+        Initialise la file.
+
+        Args:
+            repo: Instance de DataRepository configurée
+            kpi_service: Instance de KPISnapshotService (None = pas de recalcul KPI)
+            summary_service: Service des synthèses (défaut: SummaryTablesService(repo))
+            poll_interval: Intervalle de scrutation du worker en secondes
+        """
+        self.repo = repo
+        self.kpi_service = kpi_service
+        self.summary_service = summary_service or SummaryTablesService(repo)
+        self.poll_interval = poll_interval
+
+        self._callbacks: dict[int, list[Callable]] = {}
+        self._callbacks_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ========================
+    # PRODUCTEUR
+    # ========================
+
+    def enqueue(
+        self,
+        pay_date: str | date | datetime,
+        batch_id: Optional[str],
+        rows_count: int,
+        callback: Optional[Callable] = None,
+    ) -> int:
+        """
+        Met en file les travaux post-import d'une date de paie.
+
+        Si un job est déjà en attente pour cette date, il est réutilisé (son
+        batch_id et rows_count sont mis à jour) et son job_id est retourné.
+
+        Args:
+            pay_date: Date de paie importée
+            batch_id: Lot d'import committé
+            rows_count: Nombre de lignes insérées
+            callback: callback(pay_date, batch_id, rows_count) appelé en fin de job
+
+        Returns:
+            job_id
+        """
+        sql = """
+        INSERT INTO payroll.post_import_jobs (pay_date, batch_id, rows_count)
+        VALUES (%(pay_date)s, %(batch_id)s::uuid, %(rows_count)s)
+        ON CONFLICT (pay_date) WHERE status = 'pending'
+        DO UPDATE SET
+            batch_id = EXCLUDED.batch_id,
+            rows_count = EXCLUDED.rows_count,
+            created_at = CURRENT_TIMESTAMP
+        RETURNING job_id
+        """
+        # Verrou tenu pendant l'INSERT: le worker ne peut pas clore le job
+        # avant que le callback soit enregistré
+        with self._callbacks_lock:
+            result = self.repo.execute_dml(
+                sql,
+                {
+                    "pay_date": as_pay_date(pay_date),
+                    "batch_id": batch_id,
+                    "rows_count": rows_count,
+                },
+                returning=True,
+            )
+            job_id = result[0]["job_id"]
+            if callback:
+                self._callbacks.setdefault(job_id, []).append(callback)
+
+        logger.info(f"📥 Job post-import {job_id} en file ({as_pay_date(pay_date)})")
+        self._wakeup.set()
+        return job_id
+
+    def get_status(
+        self,
+        job_id: Optional[int] = None,
+        pay_date: Optional[str | date | datetime] = None,
+    ) -> Optional[dict[str, Any]]:
+        """
+        Retourne l'état d'un job (par job_id, ou le plus récent d'une date).
+
+        Returns:
+            dict sérialisable JSON, ou None si aucun job
+        """
+        if job_id is not None:
+            where = "job_id = %(job_id)s"
+            params = {"job_id": job_id}
+        elif pay_date is not None:
+            where = "pay_date = %(pay_date)s"
+            params = {"pay_date": as_pay_date(pay_date)}
+        else:
+            raise ValueError("job_id ou pay_date requis")
+
+        sql = f"""
+        SELECT {", ".join(_JOB_COLUMNS)}
+        FROM payroll.post_import_jobs
+        WHERE {where}
+        ORDER BY job_id DESC
+        LIMIT 1
+        """
+        row = self.repo.run_query(sql, params, fetch_one=True)
+        return _job_to_dict(row) if row else None
+
+    # ========================
+    # CONSOMMATEUR
+    # ========================
+
+    def start(self) -> None:
+        """Démarre le thread worker (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._requeue_stale_jobs()
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._worker_loop, name="post-import-worker", daemon=True
+        )
+        self._thread.start()
+        logger.info("✅ Worker post-import démarré")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Arrête le thread worker après le job en cours."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_pending(self) -> int:
+        """
+        Exécute les jobs en attente jusqu'à épuisement (mode synchrone).
+
+        Returns:
+            Nombre de jobs exécutés
+        """
+        count = 0
+        while not self._stopping.is_set():
+            job = self._claim_next()
+            if not job:
+                break
+            self._run_job(job)
+            count += 1
+        return count
+
+    def _worker_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self.run_pending()
+            except Exception as e:
+                logger.warning(f"⚠️ Worker post-import: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _requeue_stale_jobs(self) -> None:
+        """
+        Remet en file les jobs 'running' abandonnés (processus interrompu).
+
+        Un seul job 'pending' par date (idx_post_import_jobs_pending): seul le
+        plus récent des jobs abandonnés d'une date est remis en file, s'il n'y
+        a pas déjà un job en attente; les autres passent en 'error'.
+        """
+        sql = """
+        WITH abandonnes AS (
+            SELECT j.job_id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY j.pay_date
+                       ORDER BY j.created_at DESC, j.job_id DESC
+                   ) AS rang,
+                   EXISTS (
+                       SELECT 1 FROM payroll.post_import_jobs p
+                       WHERE p.pay_date = j.pay_date AND p.status = 'pending'
+                   ) AS deja_en_attente
+            FROM payroll.post_import_jobs j
+            WHERE j.status = 'running'
+              AND j.started_at < CURRENT_TIMESTAMP - make_interval(secs => %(stale_s)s)
+        )
+        UPDATE payroll.post_import_jobs j
+        SET status = CASE
+                WHEN a.rang = 1 AND NOT a.deja_en_attente THEN 'pending'
+                ELSE 'error'
+            END,
+            error_message = 'Job interrompu'
+        FROM abandonnes a
+        WHERE j.job_id = a.job_id
+        """
+        try:
+            self.repo.execute_dml(sql, {"stale_s": STALE_JOB_S})
+        except Exception as e:
+            logger.warning(f"⚠️ Reprise des jobs post-import impossible: {e}")
+
+    def _claim_next(self) -> Optional[dict[str, Any]]:
+        """Réclame le plus ancien job en attente (passe en 'running')."""
+        sql = f"""
+        UPDATE payroll.post_import_jobs
+        SET status = 'running',
+            attempts = attempts + 1,
+            started_at = CURRENT_TIMESTAMP
+        WHERE job_id = (
+            SELECT job_id FROM payroll.post_import_jobs
+            WHERE status = 'pending'
+            ORDER BY created_at
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING {", ".join(_JOB_COLUMNS)}
+        """
+        result = self.repo.execute_dml(sql, returning=True)
+        return _job_to_dict(result[0]) if result else None
+
+    def _run_job(self, job: dict[str, Any]) -> None:
+        """Recalcule KPI + synthèses d'une date de paie et clôt le job."""
+        job_id = job["job_id"]
+        pay_date = job["pay_date"]
+        logger.info(f"🔄 Job post-import {job_id} ({pay_date})...")
+
+        try:
+            kpi_data = None
+            if self.kpi_service:
+                try:
+                    kpi_data = self.kpi_service.invalidate_and_recalc_kpi(pay_date)
+                except Exception as e_kpi:
+                    logger.warning(f"⚠️ KPI non calculés pour {pay_date}: {e_kpi}")
+
+            refresh_timings = self.summary_service.refresh_for_pay_dates([pay_date])
+            result = {
+                "kpi": kpi_data.get("cards", {}) if kpi_data else {},
+                "refresh_timings": refresh_timings,
+            }
+            self._finish_job(job_id, JOB_DONE, result=result)
+            logger.info(f"✅ Job post-import {job_id} terminé")
+        except Exception as e:
+            logger.error(f"❌ Job post-import {job_id} en erreur: {e}")
+            self._finish_job(job_id, JOB_ERROR, error_message=str(e))
+
+        with self._callbacks_lock:
+            callbacks = self._callbacks.pop(job_id, [])
+        for callback in callbacks:
+            try:
+                callback(pay_date, job["batch_id"], job["rows_count"])
+            except Exception as e:
+                logger.warning(f"⚠️ Callback import_finished en erreur: {e}")
+
+    def _finish_job(
+        self,
+        job_id: int,
+        status: str,
+        result: Optional[dict] = None,
+        error_message: Optional[str] = None,
+    ) -> None:
+        sql = """
+        UPDATE payroll.post_import_jobs
+        SET status = %(status)s,
+            result = %(result)s::jsonb,
+            error_message = %(error_message)s,
+            finished_at = CURRENT_TIMESTAMP
+        WHERE job_id = %(job_id)s
+        """
+        self.repo.execute_dml(
+            sql,
+            {
+                "job_id": job_id,
+                "status": status,
+                "result": json.dumps(result) if result is not None else None,
+                "error_message": error_message,
+            },
+        )
+
+
+def _job_to_dict(row) -> dict[str, Any]:
+    """Ligne post_import_jobs (tuple ou dict) -> dict sérialisable JSON."""
+    job = dict(row) if isinstance(row, dict) else dict(zip(_JOB_COLUMNS, row))
+    for key in ("pay_date", "created_at", "started_at", "finished_at"):
+        if job.get(key) is not None:
+            job[key] = job[key].isoformat()
+    if job.get("batch_id") is not None:
+        job["batch_id"] = str(job["batch_id"])
+    return job
@@ -10,6 +10,8 @@ from pathlib import Path
 from typing import Dict, Optional, List
 from datetime import datetime
 
+from services.column_profile import FileProfile, build_profile
+
 
 class ProfileManager:
     """
@@ -34,35 +36,32 @@ class ProfileManager:
 
         self.profiles_dir.mkdir(parents=True, exist_ok=True)
 
-    def generate_fingerprint(self, headers: List[str], sample_rows: List[List]) -> str:
+    def generate_fingerprint(
+        self,
+        headers: List[str],
+        sample_rows: List[List],
+        profile: Optional[FileProfile] = None,
+    ) -> str:
         """
         Génère un fingerprint du fichier (hash colonnes + patterns valeurs)
 
         Args:
             headers: Liste en-têtes colonnes
             sample_rows: Échantillon lignes (10-20)
+            profile: Profil déjà calculé pour cet échantillon (detect_types,
+                detect_schema); sinon build_profile (cache partagé)
 
         Returns:
             str: Hash MD5 du fingerprint
         """
-        # Normaliser headers (lowercase, sans espaces)
-        norm_headers = [h.lower().strip().replace(" ", "_") for h in headers]
-
-        # Extraire patterns valeurs (premiers caractères, longueurs)
-        patterns = []
-        for col_idx in range(len(headers)):
-            col_values = [
-                row[col_idx] if col_idx < len(row) else None for row in sample_rows[:10]
-            ]
+        if profile is None:
+            profile = build_profile(headers, sample_rows)
 
-            # Pattern: type + longueur moyenne
-            types = [type(v).__name__ for v in col_values if v is not None]
-            lengths = [len(str(v)) for v in col_values if v is not None]
-
-            avg_len = sum(lengths) / len(lengths) if lengths else 0
-            dominant_type = max(set(types), key=types.count) if types else "None"
+        # Normaliser headers (lowercase, sans espaces)
+        norm_headers = [h.lower().strip().replace(" ", "_") for h in profile.headers]
 
-            patterns.append(f"{dominant_type}:{int(avg_len)}")
+        # Patterns valeurs (type dominant + longueur moyenne, 10 premières lignes)
+        patterns = profile.fingerprint_patterns(10)
 
         # Créer fingerprint texte
         fingerprint_text = "|".join(norm_headers) + "||" + "|".join(patterns)
@@ -116,7 +115,10 @@ class ProfileManager:
         return str(profile_path)
 
     def find_profile(
-        self, headers: List[str], sample_rows: List[List]
+        self,
+        headers: List[str],
+        sample_rows: List[List],
+        profile: Optional[FileProfile] = None,
     ) -> Optional[Dict]:
         """
         Cherche un profil existant correspondant au fichier
@@ -124,11 +126,12 @@ class ProfileManager:
         Args:
             headers: En-têtes fichier actuel
             sample_rows: Échantillon lignes
+            profile: Profil colonnes déjà calculé (voir generate_fingerprint)
 
         Returns:
             dict ou None: Profil trouvé
         """
-        fingerprint = self.generate_fingerprint(headers, sample_rows)
+        fingerprint = self.generate_fingerprint(headers, sample_rows, profile)
         profile_path = self.profiles_dir / f"{fingerprint}.profile.json"
 
         if profile_path.exists():
@@ -6,11 +6,10 @@
 # Support inversion colonnes (ex: montant ↔ poste_budgetaire)
 
 import re
-from collections import Counter
-from typing import Dict, List, Any, Tuple
+from typing import Dict, Any
 
-# Import du parseur neutre depuis le module parsers
-from services.parsers import parse_amount_neutral, parse_date_robust
+# Profil colonnes partagé avec detect_types (parsings dates/montants, regex)
+from services.column_profile import FileProfile, build_profile
 
 try:
     import pandas as pd
@@ -47,6 +46,7 @@ def detect_schema(df, config: Dict) -> Dict:
 
     Args:
         df: DataFrame pandas OU liste de listes [[headers], [row1], [row2], ...]
+            OU FileProfile déjà calculé (build_profile) pour l'échantillon
         config: Configuration dict (chargée depuis schema_fr_ca.yaml)
 
     Returns:
@@ -60,10 +60,14 @@ def detect_schema(df, config: Dict) -> Dict:
 
     # ========== PARSING INPUT ==========
 
-    # Support DataFrame pandas OU list[list]
-    if pd is not None and isinstance(df, pd.DataFrame):
-        headers = [str(h) for h in df.columns]
-        sample_data = df.head(config.get("sample_size", 200)).values.tolist()
+    # Support FileProfile, DataFrame pandas OU list[list]; le profil est
+    # partagé avec detect_types et ProfileManager (cache build_profile)
+    if isinstance(df, FileProfile):
+        profile = df
+    elif pd is not None and isinstance(df, pd.DataFrame):
+        profile = build_profile(
+            df.columns, df.head(config.get("sample_size", 200)).values.tolist()
+        )
     else:
         # Format list[list]: première ligne = headers
         if not df or len(df) == 0:
@@ -73,10 +77,10 @@ def detect_schema(df, config: Dict) -> Dict:
                 "alternatives": {},
                 "notes": ["Aucune donnée fournie"],
             }
-        headers = [str(h) for h in df[0]]
         sample_size = config.get("sample_size", 200)
-        sample_data = df[1 : min(len(df), 1 + sample_size)]
+        profile = build_profile(df[0], df[1 : min(len(df), 1 + sample_size)])
 
+    headers = profile.headers
     n_cols = len(headers)
 
     if n_cols == 0:
@@ -97,66 +101,49 @@ def detect_schema(df, config: Dict) -> Dict:
 
     # ========== ANALYSE COLONNES ==========
 
+    # Lexique normalisé une fois (et non par colonne)
+    lex_norm = {field: [_norm_header(k) for k in keys] for field, keys in LEX.items()}
+
     col_stats = []
 
     for j in range(n_cols):
-        # Extraire valeurs colonne j
-        col_values = []
-        for row in sample_data:
-            if j < len(row):
-                col_values.append(row[j])
-            else:
-                col_values.append(None)
-
-        n_values = len(col_values)
+        # Features de la colonne j (calculées une fois par échantillon)
+        features = profile.columns[j]
+        n_values = len(features.values)
 
         # --- SIGNAUX VALEURS (value patterns) ---
 
         # Date: % de valeurs parsables comme date
-        v_date = sum(1 for v in col_values if parse_date_robust(v) is not None) / max(
-            1, n_values
-        )
+        v_date = features.date_count / max(1, n_values)
 
         # Montant: % de valeurs parsables comme nombre avec parseur neutre
-        v_montant = sum(
-            1 for v in col_values if parse_amount_neutral(v) is not None
-        ) / max(1, n_values)
+        v_montant = features.number_count / max(1, n_values)
 
         # Matricule: % de valeurs matching pattern digits
-        v_matricule = sum(
-            1
-            for v in col_values
-            if re.fullmatch(PAT["matricule_digits"], str(v or "").strip())
-        ) / max(1, n_values)
+        v_matricule = features.text_pattern_ratio(PAT["matricule_digits"])
 
         # Code paie: % de valeurs matching pattern alphanumérique
-        v_code = sum(
-            1
-            for v in col_values
-            if re.fullmatch(PAT["code_paie"], str(v or "").strip())
-        ) / max(1, n_values)
+        v_code = features.text_pattern_ratio(PAT["code_paie"])
 
         # Poste budgétaire: % de valeurs matching ANY pattern
         v_pb = 0.0
         for rgx in PAT["poste_budgetaire"]:
-            score_pb = sum(
-                1 for v in col_values if re.fullmatch(rgx, str(v or "").strip())
-            ) / max(1, n_values)
-            v_pb = max(v_pb, score_pb)
+            v_pb = max(v_pb, features.text_pattern_ratio(rgx))
 
         # Nom/prénom: % de valeurs avec virgule OU 2+ mots
-        col_str = [str(v or "").strip() for v in col_values]
+        col_str = features.text_counts  # texte nettoyé -> occurrences
         v_np = sum(
-            1
-            for s in col_str
+            n
+            for s, n in col_str.items()
             if (PAT["name_has_comma"] in s)
             or (len(s.split()) >= config["patterns"]["name_words_min"])
-        ) / max(1, len(col_str))
+        ) / max(1, n_values)
 
         # Description poste: texte long (10+ caractères) + pas nombre + pas code
-        lens = [len(s) for s in col_str if s]
+        n_texts = sum(n for s, n in col_str.items() if s)
+        n_long = sum(n for s, n in col_str.items() if len(s) >= 10)
         v_desc = (
-            (sum(1 for L in lens if L >= 10) / max(1, len(lens)))
+            (n_long / max(1, n_texts))
             * (1 - v_montant)  # Pénalise si ressemble à nombre
             * (1 - v_code)  # Pénalise si ressemble à code
         )
@@ -165,26 +152,24 @@ def detect_schema(df, config: Dict) -> Dict:
 
         h_norm = _norm_header(headers[j])
 
-        def head_score(lex_keys: List[str]) -> float:
+        def head_score(field: str) -> float:
             """Score matching en-tête (1.0 si match, 0.0 sinon)"""
             if not h_norm:
                 return 0.0
-            # Normaliser chaque clé du lexique
-            lex_norm = [_norm_header(k) for k in lex_keys]
-            # Match si une clé est contenue dans l'en-tête
-            for k in lex_norm:
+            # Match si une clé (normalisée) est contenue dans l'en-tête
+            for k in lex_norm[field]:
                 if k and k in h_norm:
                     return 1.0
             return 0.0
 
-        h_date = head_score(LEX["date"])
-        h_montant = head_score(LEX["montant"])
-        h_matricule = head_score(LEX["matricule"])
-        h_nom_prenom = head_score(LEX["nom_prenom"])
-        h_code_paie = head_score(LEX["code_paie"])
-        h_poste_budgetaire = head_score(LEX["poste_budgetaire"])
-        h_description_poste = head_score(LEX["description_poste"])
-        h_type_paie = head_score(LEX["type_paie"])
+        h_date = head_score("date")
+        h_montant = head_score("montant")
+        h_matricule = head_score("matricule")
+        h_nom_prenom = head_score("nom_prenom")
+        h_code_paie = head_score("code_paie")
+        h_poste_budgetaire = head_score("poste_budgetaire")
+        h_description_poste = head_score("description_poste")
+        h_type_paie = head_score("type_paie")
 
         # Stocker stats colonne
         col_stats.append(
@@ -0,0 +1,271 @@
+"""
+Summary Tables Service: maintenance incrémentale des tables de synthèse paie
+
+Remplace les vues matérialisées (REFRESH complet à chaque import) par trois
+tables de synthèse mises à jour uniquement pour les dates de paie touchées:
+- payroll.summary_monthly_payroll    (pay_year, pay_month, employee_id)
+- payroll.summary_employee_last_pay  (employee_id)
+- payroll.summary_employee_annual    (year, employee_id)
+
+Les vues payroll.v_monthly_payroll_summary, v_employee_current_salary et
+v_employee_annual_history (migration 012) lisent ces tables et joignent
+core.employees: les lecteurs existants sont inchangés.
+
+Usage:
+    service = SummaryTablesService(repo)
+    timings = service.refresh_for_pay_dates(['2025-08-28'])  # après import
+    timings = service.rebuild_all()  # réparation (reconstruction complète)
+"""
+
+import logging
+import time
+from collections.abc import Iterable
+from datetime import date, datetime
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+MONTHLY_VIEW = "payroll.v_monthly_payroll_summary"
+CURRENT_SALARY_VIEW = "payroll.v_employee_current_salary"
+ANNUAL_VIEW = "payroll.v_employee_annual_history"
+
+# ========================
+# v_monthly_payroll_summary
+# ========================
+
+_MONTHLY_DELETE = """
+DELETE FROM payroll.summary_monthly_payroll s
+USING unnest(%(mois)s::date[]) AS m(debut)
+WHERE s.pay_year = EXTRACT(YEAR FROM m.debut)::int
+  AND s.pay_month = EXTRACT(MONTH FROM m.debut)::int
+"""
+
+_MONTHLY_INSERT = """
+INSERT INTO payroll.summary_monthly_payroll (
+    pay_year, pay_month, employee_id,
+    total_employee_cents, total_employer_cents, transaction_count
+)
+SELECT
+    pp.pay_year,
+    pp.pay_month,
+    pt.employee_id,
+    SUM(pt.amount_employee_norm_cents),
+    SUM(pt.amount_employer_norm_cents),
+    COUNT(*)
+FROM payroll.payroll_transactions pt
+JOIN payroll.pay_periods pp ON pt.period_id = pp.period_id
+{scope}
+GROUP BY pp.pay_year, pp.pay_month, pt.employee_id
+"""
+
+_MONTHLY_SCOPE = """
+JOIN unnest(%(mois)s::date[]) AS m(debut)
+  ON pt.pay_date >= m.debut AND pt.pay_date < (m.debut + INTERVAL '1 month')::date
+"""
+
+# ========================
+# v_employee_current_salary
+# ========================
+
+# Employés touchés: transactions aux dates importées, ou dernière paie connue
+# à l'une de ces dates (cas d'une date de paie supprimée puis réimportée)
+_LAST_PAY_TOUCHED = """
+CREATE TEMP TABLE tmp_summary_employees ON COMMIT DROP AS
+SELECT DISTINCT employee_id
+FROM payroll.payroll_transactions
+WHERE pay_date = ANY(%(dates)s::date[])
+UNION
+SELECT employee_id
+FROM payroll.summary_employee_last_pay
+WHERE last_pay_date = ANY(%(dates)s::date[])
+"""
+
+_LAST_PAY_DELETE = """
+DELETE FROM payroll.summary_employee_last_pay s
+USING tmp_summary_employees t
+WHERE s.employee_id = t.employee_id
+"""
+
+_LAST_PAY_INSERT = """
+INSERT INTO payroll.summary_employee_last_pay (
+    employee_id, last_pay_date, last_net_cents
+)
+SELECT DISTINCT ON (pt.employee_id)
+    pt.employee_id,
+    pt.pay_date,
+    SUM(pt.amount_employee_norm_cents)
+FROM payroll.payroll_transactions pt
+{scope}
+GROUP BY pt.employee_id, pt.pay_date
+ORDER BY pt.employee_id, pt.pay_date DESC
+"""
+
+_LAST_PAY_SCOPE = "JOIN tmp_summary_employees t ON t.employee_id = pt.employee_id"
+
+# ========================
+# v_employee_annual_history
+# ========================
+
+_ANNUAL_DELETE = """
+DELETE FROM payroll.summary_employee_annual
+WHERE year = ANY(%(annees)s::int[])
+"""
+
+_ANNUAL_INSERT = """
+INSERT INTO payroll.summary_employee_annual (
+    year, employee_id,
+    total_employee_cents, total_employer_cents, pay_periods_count
+)
+SELECT
+    EXTRACT(YEAR FROM pt.pay_date)::int,
+    pt.employee_id,
+    SUM(pt.amount_employee_norm_cents),
+    SUM(pt.amount_employer_norm_cents),
+    COUNT(DISTINCT pt.pay_date)
+FROM payroll.payroll_transactions pt
+{scope}
+GROUP BY EXTRACT(YEAR FROM pt.pay_date)::int, pt.employee_id
+"""
+
+_ANNUAL_SCOPE = """
+JOIN unnest(%(annees)s::int[]) AS a(annee)
+  ON pt.pay_date >= make_date(a.annee, 1, 1)
+ AND pt.pay_date < make_date(a.annee + 1, 1, 1)
+"""
+
+
+class SummaryTablesService:
+    """Maintenance des tables de synthèse (incrémentale ou complète)."""
+
+    def __init__(self, repo):
+        """
+        Initialise le service.
+
+        Args:
+            repo: Instance de DataRepository configurée
+        """
+        self.repo = repo
+
+    # ========================
+    # POINTS D'ENTRÉE
+    # ========================
+
+    def refresh_for_pay_dates(
+        self, pay_dates: Iterable[str | date | datetime]
+    ) -> dict[str, float]:
+        """
+        Met à jour les synthèses pour les dates de paie d'un lot importé.
+
+        Seuls les mois, années et employés concernés par ces dates sont
+        recalculés (DELETE + INSERT ciblés, chaque vue dans sa transaction).
+
+        Args:
+            pay_dates: Dates de paie du lot (YYYY-MM-DD, date ou datetime)
+
+        Returns:
+            dict {vue: durée en secondes} (vues en erreur absentes)
+        """
+        dates = sorted({as_pay_date(d) for d in pay_dates})
+        if not dates:
+            return {}
+
+        params = {
+            "dates": dates,
+            "mois": sorted({d.replace(day=1) for d in dates}),
+            "annees": sorted({d.year for d in dates}),
+        }
+
+        return self._run_steps(
+            [
+                (
+                    MONTHLY_VIEW,
+                    [_MONTHLY_DELETE, _MONTHLY_INSERT.format(scope=_MONTHLY_SCOPE)],
+                ),
+                (
+                    CURRENT_SALARY_VIEW,
+                    [
+                        _LAST_PAY_TOUCHED,
+                        _LAST_PAY_DELETE,
+                        _LAST_PAY_INSERT.format(scope=_LAST_PAY_SCOPE),
+                    ],
+                ),
+                (
+                    ANNUAL_VIEW,
+                    [_ANNUAL_DELETE, _ANNUAL_INSERT.format(scope=_ANNUAL_SCOPE)],
+                ),
+            ],
+            params,
+        )
+
+    def rebuild_all(self) -> dict[str, float]:
+        """
+        Reconstruit entièrement les trois synthèses (réparation).
+
+        Returns:
+            dict {vue: durée en secondes} (vues en erreur absentes)
+        """
+        return self._run_steps(
+            [
+                (
+                    MONTHLY_VIEW,
+                    [
+                        "TRUNCATE payroll.summary_monthly_payroll",
+                        _MONTHLY_INSERT.format(scope=""),
+                    ],
+                ),
+                (
+                    CURRENT_SALARY_VIEW,
+                    [
+                        "TRUNCATE payroll.summary_employee_last_pay",
+                        _LAST_PAY_INSERT.format(scope=""),
+                    ],
+                ),
+                (
+                    ANNUAL_VIEW,
+                    [
+                        "TRUNCATE payroll.summary_employee_annual",
+                        _ANNUAL_INSERT.format(scope=""),
+                    ],
+                ),
+            ],
+            {},
+        )
+
+    # ========================
+    # EXÉCUTION
+    # ========================
+
+    def _run_steps(
+        self, steps: list[tuple[str, list[str]]], params: dict[str, Any]
+    ) -> dict[str, float]:
+        """Exécute chaque vue dans sa propre transaction et la chronomètre."""
+        timings: dict[str, float] = {}
+
+        for view, statements in steps:
+
+            def _tx(conn, statements=statements):
+                with conn.cursor() as cur:
+                    for sql in statements:
+                        cur.execute(sql, params)
+
+            debut = time.perf_counter()
+            try:
+                logger.info(f"🔄 Synthèse {view}...")
+                self.repo.run_tx(_tx)
+            except Exception as e:
+                logger.warning(f"⚠️ Erreur synthèse {view}: {e}")
+                continue
+
+            timings[view] = round(time.perf_counter() - debut, 3)
+            logger.info(f"✅ {view} à jour ({timings[view]:.3f}s)")
+
+        return timings
+
+
+def as_pay_date(value: str | date | datetime) -> date:
+    """Normalise une date de paie (YYYY-MM-DD, date ou datetime)."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
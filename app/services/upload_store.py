@@ -0,0 +1,237 @@
+"""
+Upload Store: fichiers d'import transférés par blocs depuis l'UI web
+
+Le fichier choisi dans l'UI n'est plus envoyé en une seule chaîne base64
+par QWebChannel: le JS l'envoie par blocs (upload_chunk), écrits au fil de
+l'eau sur disque. Le SHA256 est calculé pendant l'écriture; les services
+d'import reçoivent ensuite un chemin local.
+
+L'UI ne manipule que l'upload_id: path() ne résout que les envois terminés
+de ce store, jamais un chemin fourni par le contenu web.
+
+Chaque envoi est écrit dans <répertoire>/<upload_id>/<nom du fichier>: le
+nom d'origine est conservé (source_file de l'import).
+
+Les fichiers de paie contiennent des données personnelles (noms, salaires):
+- répertoire de session privé (mkdtemp, droits 0700), supprimé par close()
+  et à la sortie du processus
+- dossiers d'envoi 0700, fichiers créés en 0600 (O_CREAT | O_EXCL)
+- seul le répertoire de ce store est purgé (répertoire explicite: envois
+  abandonnés d'une session précédente, plus vieux que 24 h)
+
+Usage:
+    store = UploadStore()
+    upload_id = store.begin("paie.xlsx")
+    store.append(upload_id, bloc)          # autant de fois que nécessaire
+    info = store.finish(upload_id)         # {'path', 'checksum', 'size', ...}
+    path = store.path(upload_id)           # KeyError si envoi inconnu
+    checksum = store.checksum(path)
+    store.release(upload_id)               # après import
+    store.close()                          # fin de session
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SESSION_PREFIX = "payroll_uploads_"
+# Envois abandonnés (aperçu sans confirmation, fermeture de l'app)
+STALE_UPLOAD_SECONDS = 24 * 3600
+# Checksums mémorisés (envois terminés, fichiers locaux déjà hachés)
+MAX_MEMO_ENTRIES = 64
+HASH_READ_BYTES = 1024 * 1024
+
+_UPLOAD_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UploadStore:
+    """Envois par blocs vers des fichiers temporaires, avec SHA256 incrémental."""
+
+    def __init__(self, directory: Optional[str | Path] = None):
+        """
+        Args:
+            directory: Répertoire des envois (défaut: répertoire de session
+                <tmp>/payroll_uploads_XXXX créé par mkdtemp, supprimé par close)
+        """
+        if directory:
+            self.directory = Path(directory)
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            os.chmod(self.directory, 0o700)
+            self._owns_directory = False
+        else:
+            self.directory = Path(tempfile.mkdtemp(prefix=SESSION_PREFIX))
+            self._owns_directory = True
+        self._lock = threading.Lock()
+        # upload_id -> {'path', 'file', 'sha256', 'size'} (envois en cours)
+        self._open: dict[str, dict] = {}
+        # upload_id -> chemin (envois terminés, non encore libérés)
+        self._finished: dict[str, Path] = {}
+        # (chemin, taille, mtime_ns) -> checksum
+        self._checksums: dict[tuple, str] = {}
+        if not self._owns_directory:
+            self._purge_stale()
+        atexit.register(self.close)
+
+    def begin(self, file_name: str) -> str:
+        """Ouvre un envoi et retourne son identifiant."""
+        name = Path(file_name.replace("\\", "/")).name
+        if not name or name in (".", ".."):
+            raise ValueError(f"Nom de fichier invalide: {file_name!r}")
+
+        upload_id = uuid.uuid4().hex
+        folder = self.directory / upload_id
+        folder.mkdir(mode=0o700)
+        path = folder / name
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+        with self._lock:
+            self._open[upload_id] = {
+                "path": path,
+                "file": os.fdopen(fd, "wb"),
+                "sha256": hashlib.sha256(),
+                "size": 0,
+            }
+        return upload_id
+
+    def append(self, upload_id: str, data: bytes) -> int:
+        """Écrit un bloc; retourne le nombre d'octets reçus au total."""
+        upload = self._get_open(upload_id)
+        upload["file"].write(data)
+        upload["sha256"].update(data)
+        upload["size"] += len(data)
+        return upload["size"]
+
+    def finish(self, upload_id: str) -> dict:
+        """Ferme l'envoi: {'upload_id', 'path', 'file_name', 'checksum', 'size'}."""
+        with self._lock:
+            upload = self._open.pop(upload_id, None)
+        if upload is None:
+            raise KeyError(f"Envoi inconnu ou déjà terminé: {upload_id}")
+
+        upload["file"].close()
+        path = upload["path"]
+        checksum = upload["sha256"].hexdigest()
+        self._remember(path, checksum)
+        with self._lock:
+            self._finished[upload_id] = path
+        logger.info(
+            f"📥 Envoi terminé: {path.name} ({upload['size']} octets, {checksum[:16]}...)"
+        )
+        return {
+            "upload_id": upload_id,
+            "path": str(path),
+            "file_name": path.name,
+            "checksum": checksum,
+            "size": upload["size"],
+        }
+
+    def abort(self, upload_id: str) -> None:
+        """Abandonne un envoi en cours (fichier supprimé)."""
+        with self._lock:
+            upload = self._open.pop(upload_id, None)
+        if upload:
+            upload["file"].close()
+            shutil.rmtree(upload["path"].parent, ignore_errors=True)
+
+    def checksum(self, file_path: str | Path) -> str:
+        """
+        SHA256 du fichier: mémorisé à la fin de l'envoi, sinon calculé une
+        fois par version du fichier (chemin, taille, mtime).
+        """
+        path = Path(file_path)
+        key = self._memo_key(path)
+        with self._lock:
+            checksum = self._checksums.get(key)
+        if checksum:
+            return checksum
+
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_READ_BYTES), b""):
+                sha256.update(chunk)
+        checksum = sha256.hexdigest()
+        self._remember(path, checksum)
+        return checksum
+
+    def path(self, upload_id: str) -> Path:
+        """Chemin d'un envoi terminé; KeyError si inconnu ou déjà libéré."""
+        with self._lock:
+            path = self._finished.get(upload_id)
+        if path is None:
+            raise KeyError(f"Envoi inconnu ou déjà libéré: {upload_id}")
+        return path
+
+    def owns(self, file_path: str | Path) -> bool:
+        """True si le fichier est un envoi de ce store."""
+        try:
+            return Path(file_path).resolve().parent.parent == self.directory.resolve()
+        except OSError:
+            return False
+
+    def release(self, upload_id: str) -> None:
+        """Supprime un envoi terminé; sans effet si l'envoi est inconnu."""
+        with self._lock:
+            path = self._finished.pop(upload_id, None)
+            if path is None:
+                return
+            self._checksums = {
+                k: v for k, v in self._checksums.items() if k[0] != str(path)
+            }
+        shutil.rmtree(path.parent, ignore_errors=True)
+
+    def close(self) -> None:
+        """Supprime tous les envois (et le répertoire de session)."""
+        with self._lock:
+            uploads = list(self._open.values())
+            folders = [u["path"].parent for u in uploads]
+            folders += [path.parent for path in self._finished.values()]
+            self._open.clear()
+            self._finished.clear()
+            self._checksums.clear()
+        for upload in uploads:
+            upload["file"].close()
+        for folder in folders:
+            shutil.rmtree(folder, ignore_errors=True)
+        if self._owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _get_open(self, upload_id: str) -> dict:
+        with self._lock:
+            upload = self._open.get(upload_id)
+        if upload is None:
+            raise KeyError(f"Envoi inconnu ou déjà terminé: {upload_id}")
+        return upload
+
+    def _remember(self, path: Path, checksum: str) -> None:
+        key = self._memo_key(path)
+        with self._lock:
+            if len(self._checksums) >= MAX_MEMO_ENTRIES:
+                self._checksums.pop(next(iter(self._checksums)))
+            self._checksums[key] = checksum
+
+    @staticmethod
+    def _memo_key(path: Path) -> tuple:
+        stat = path.stat()
+        return (str(path), stat.st_size, stat.st_mtime_ns)
+
+    def _purge_stale(self) -> None:
+        """Envois abandonnés de ce répertoire (dossiers <upload_id> seulement)."""
+        limit = time.time() - STALE_UPLOAD_SECONDS
+        for folder in self.directory.iterdir():
+            if not _UPLOAD_ID_RE.match(folder.name):
+                continue
+            try:
+                if folder.is_dir() and folder.stat().st_mtime < limit:
+                    shutil.rmtree(folder, ignore_errors=True)
+            except OSError as e:
+                logger.debug(f"Purge impossible ({folder}): {e}")
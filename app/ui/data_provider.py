@@ -89,12 +89,29 @@ class PayrollDataProvider:
         "categorie de paie ",
     ]
 
-    def __init__(self, dsn: Optional[str] = None):
-        """Initialise le provider avec DSN PostgreSQL."""
+    _PG_NUMERIC_TYPES = (
+        "numeric",
+        "integer",
+        "bigint",
+        "smallint",
+        "real",
+        "double precision",
+    )
+
+    def __init__(self, dsn: Optional[str] = None, server_side: bool = True):
+        """
+        Initialise le provider avec DSN PostgreSQL.
+
+        server_side=True (défaut): périodes, KPI et répartitions sont calculés
+        en SQL pour la période sélectionnée seulement; False: tout l'historique
+        est chargé puis agrégé en pandas (comportement historique).
+        """
         # Utiliser config_manager pour DSN centralisé
         from config.config_manager import get_dsn
 
         self.dsn = get_dsn()
+        self.server_side = server_side
+        self._pg_schema: Optional[Dict[str, str]] = None
         self._last: Optional[Dict[str, Any]] = None
         self._last_df: Optional[pd.DataFrame] = None
         self._last_df_selected: Optional[pd.DataFrame] = None
@@ -103,8 +120,10 @@ class PayrollDataProvider:
 
     # --- DB helpers (PostgreSQL) ---
     def _get_repo(self) -> DataRepository:
-        """Retourne une instance DataRepository."""
-        return DataRepository(self.dsn, min_size=1, max_size=3)
+        """Retourne le pool partagé du processus (ne pas le fermer)."""
+        from config.connection_standard import get_connection_pool
+
+        return get_connection_pool()
 
     def _read_all(self) -> pd.DataFrame:
         """Charge toutes les données depuis PostgreSQL."""
@@ -126,8 +145,6 @@ class PayrollDataProvider:
         except Exception as e:
             print(f"Erreur lecture PostgreSQL: {e}")
             return pd.DataFrame()
-        finally:
-            repo.close()
 
     def _detect_column(self, df: pd.DataFrame, candidates: List[str]) -> Optional[str]:
         cols = set(df.columns.astype(str))
@@ -203,8 +220,229 @@ class PayrollDataProvider:
         values = [float(v) for v in g.values.tolist()]
         return labels, values
 
+    # --- Mode serveur (agrégats calculés par PostgreSQL) ---
+    @staticmethod
+    def _quote_ident(name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    def _read_schema(self, repo: DataRepository) -> Dict[str, str]:
+        """Colonnes de la table (nom → data_type), mises en cache."""
+        if self._pg_schema is None:
+            schema, table = self._PG_TABLE.split(".")
+            rows = repo.run_query(
+                """
+                SELECT column_name, data_type
+                FROM information_schema.columns
+                WHERE table_schema = %(schema)s AND table_name = %(table)s
+                ORDER BY ordinal_position
+                """,
+                {"schema": schema, "table": table},
+            )
+            self._pg_schema = {str(r[0]): str(r[1]) for r in rows or []}
+        return self._pg_schema
+
+    def _server_columns(
+        self, schema: Dict[str, str]
+    ) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Détecte les colonnes sur le schéma SQL.
+
+        Retourne None si le mode serveur n'est pas applicable (colonne date
+        non temporelle ou montant non numérique): load() repasse alors en
+        calcul pandas.
+        """
+        columns = pd.DataFrame(columns=list(schema))
+        detected = {
+            "date": self._detect_column(columns, self._DATE_CANDIDATES),
+            "amount": self._detect_column(columns, self._AMOUNT_CANDIDATES),
+            "employee": self._detect_column(columns, self._EMP_CANDIDATES),
+            "category": self._detect_column(columns, self._CAT_CANDIDATES),
+        }
+        date_col, amount_col = detected["date"], detected["amount"]
+        if not schema or not date_col:
+            return None
+        if not schema[date_col].startswith(("date", "timestamp")):
+            return None
+        if amount_col and schema[amount_col] not in self._PG_NUMERIC_TYPES:
+            return None
+        return detected
+
+    def _period_filter(self, date_col: str, period: str) -> Tuple[str, Dict[str, Any]]:
+        """Clause WHERE (bornes sur la date, indexable) pour une période YYYY-MM."""
+        if period in ("(tout)", "(n/a)"):
+            return "TRUE", {}
+        start = pd.Period(period, freq="M")
+        return (
+            f"{self._quote_ident(date_col)} >= %(debut)s "
+            f"AND {self._quote_ident(date_col)} < %(fin)s",
+            {
+                "debut": start.start_time.date(),
+                "fin": (start + 1).start_time.date(),
+            },
+        )
+
+    def _load_server(self, period: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        load() calculé côté PostgreSQL pour la seule période sélectionnée.
+
+        Périodes: SELECT DISTINCT; KPI et répartitions: GROUP BY; seules les
+        lignes de la période sont rapatriées pour la table.
+        """
+        repo = self._get_repo()
+        try:
+            cols = self._server_columns(self._read_schema(repo))
+            if cols is None:
+                return None
+
+            q = self._quote_ident
+            table = self._PG_TABLE
+            date_col, amount_col = cols["date"], cols["amount"]
+            emp_col, cat_col = cols["employee"], cols["category"]
+            assert date_col is not None  # garanti par _server_columns
+
+            rows = repo.run_query(
+                f"""
+                SELECT DISTINCT to_char({q(date_col)}, 'YYYY-MM') AS period
+                FROM {table}
+                WHERE {q(date_col)} IS NOT NULL
+                ORDER BY period
+                """
+            )
+            periods = [r[0] for r in rows or []] or ["(tout)"]
+            selected = period or periods[-1]
+            where, params = self._period_filter(date_col, selected)
+
+            # KPI: une seule agrégation
+            amount = f"COALESCE({q(amount_col)}, 0)" if amount_col else "0"
+            emp_count = f"COUNT(DISTINCT {q(emp_col)})" if emp_col else "COUNT(*)"
+            total, neg, pos, emp_count, row_count = repo.run_query(
+                f"""
+                SELECT
+                    COALESCE(SUM({amount}), 0),
+                    COALESCE(SUM({amount}) FILTER (WHERE {amount} < 0), 0),
+                    COALESCE(SUM({amount}) FILTER (WHERE {amount} >= 0), 0),
+                    {emp_count},
+                    COUNT(*)
+                FROM {table}
+                WHERE {where}
+                """,
+                params,
+                one=True,
+            )
+            total, neg, pos = float(total), float(neg), float(pos)
+            if amount_col and row_count:
+                kpi = KPI(
+                    masse=_money(total if total >= 0 else -total),
+                    employes=str(int(emp_count)),
+                    deductions=_money(neg if neg != 0 else 0.0),
+                    net=_money(total),
+                )
+            else:
+                # Période vide ou sans montant: "--" comme _compute_kpis
+                kpi = KPI(employes=str(int(emp_count) if emp_col else 0))
+
+            # Répartition top-N par catégorie
+            bar_labels: List[str] = []
+            bar_values: List[float] = []
+            if cat_col and amount_col:
+                rows = repo.run_query(
+                    f"""
+                    SELECT {q(cat_col)}, SUM({amount}) AS total
+                    FROM {table}
+                    WHERE {where}
+                    GROUP BY {q(cat_col)}
+                    ORDER BY total DESC
+                    LIMIT 8
+                    """,
+                    params,
+                )
+                bar_labels = [str(r[0]) if r[0] is not None else "nan" for r in rows]
+                bar_values = [float(r[1]) for r in rows]
+
+            if cat_col:
+                pie_labels, pie_values = bar_labels[:6], bar_values[:6]
+            elif amount_col:
+                pie_labels, pie_values = ["Positif", "Négatif"], [pos, abs(neg)]
+            else:
+                pie_labels, pie_values = [], []
+
+            # Lignes de la période sélectionnée seulement
+            with repo.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(f"SELECT * FROM {table} WHERE {where}", params)
+                    columns = [desc[0] for desc in cur.description]
+                    df_sel = pd.DataFrame(cur.fetchall(), columns=columns)
+            df_sel["__period"] = selected
+        except Exception as e:
+            print(f"Erreur lecture PostgreSQL: {e}")
+            return None
+
+        result = {
+            "kpis": {
+                "masse": kpi.masse,
+                "employes": kpi.employes,
+                "deductions": kpi.deductions,
+                "net": kpi.net,
+            },
+            "bar": {"labels": bar_labels, "values": bar_values},
+            "pie": {"labels": pie_labels, "values": pie_values},
+            "table": df_sel,
+            "periods": periods,
+            "selected_period": selected,
+        }
+
+        self._last = result
+        self._last_df = None  # historique complet non chargé en mode serveur
+        self._last_df_selected = df_sel
+        self._last_period = selected
+        self._last_columns = cols
+        return result
+
+    def _trend_server(self, months: int) -> Optional[List[Tuple[str, float, float]]]:
+        """
+        (période, positifs, |négatifs|) des `months` dernières périodes, en SQL.
+
+        None si le mode serveur ne s'applique pas (calcul pandas); liste vide
+        si la requête échoue (jamais la série de démonstration).
+        """
+        repo = self._get_repo()
+        try:
+            cols = self._server_columns(self._read_schema(repo))
+            if cols is None or not cols["amount"]:
+                return None
+            date_col = cols["date"]
+            assert date_col is not None  # garanti par _server_columns
+            q = self._quote_ident
+            amount = f"COALESCE({q(cols['amount'])}, 0)"
+            rows = repo.run_query(
+                f"""
+                SELECT period, pos, neg FROM (
+                    SELECT
+                        to_char({q(date_col)}, 'YYYY-MM') AS period,
+                        COALESCE(SUM({amount}) FILTER (WHERE {amount} >= 0), 0) AS pos,
+                        ABS(COALESCE(SUM({amount}) FILTER (WHERE {amount} < 0), 0)) AS neg
+                    FROM {self._PG_TABLE}
+                    WHERE {q(date_col)} IS NOT NULL
+                    GROUP BY 1
+                    ORDER BY 1 DESC
+                    LIMIT %(months)s
+                ) t
+                ORDER BY period
+                """,
+                {"months": months},
+            )
+            return [(r[0], float(r[1]), float(r[2])) for r in rows or []]
+        except Exception as e:
+            print(f"Erreur lecture PostgreSQL: {e}")
+            return []
+
     # --- API V2 ---
     def load(self, period: Optional[str] = None) -> Dict[str, Any]:
+        if self.server_side:
+            result = self._load_server(period)
+            if result is not None:
+                return result
+
         df_all = self._read_all()
         if df_all is None:
             df_all = pd.DataFrame()
@@ -544,6 +782,11 @@ class PayrollDataProvider:
         Génère des données de tendance sur plusieurs mois.
         Retourne: {"labels": List[str], "datasets": [{"label": str, "data": List[float]}]}
         """
+        if self.server_side:
+            server_trend = self._trend_server(months)
+            if server_trend is not None:
+                return self._format_trend(server_trend)
+
         if self._last_df is None:
             self.load()
 
@@ -573,17 +816,25 @@ class PayrollDataProvider:
             [p for p in df["__period"].unique() if p != "(tout)" and p != "(n/a)"]
         )[-months:]
 
-        labels = []
-        salaries = []
-        deductions = []
-
+        trend: List[Tuple[str, float, float]] = []
         for period in periods:
             df_period = df[df["__period"] == period]
             amounts = pd.to_numeric(df_period[amount_col], errors="coerce").fillna(0.0)
 
             pos = float(amounts[amounts >= 0].sum())
             neg = float(abs(amounts[amounts < 0].sum()))
+            trend.append((period, pos, neg))
+
+        return self._format_trend(trend)
+
+    @staticmethod
+    def _format_trend(trend: List[Tuple[str, float, float]]) -> Dict[str, Any]:
+        """Formate [(période, positifs, négatifs)] pour le graphique de tendance."""
+        labels = []
+        salaries = []
+        deductions = []
 
+        for period, pos, neg in trend:
             # Convertir période "2024-01" en "Jan 2024"
             try:
                 year, month = period.split("-")
@@ -163,6 +163,71 @@ window.AppBridge.showToast = function(message, type = 'info') {
   // Créer dynamiquement un toast DOM si nécessaire
 };
 
+// Résout/rejette la promesse d'une requête callAsync selon son statut
+function settleAsync(pending, name, status, payload) {
+  if (status === 'cancelled') {
+    pending.reject({ cancelled: true, method: name });
+    return;
+  }
+  try {
+    pending.resolve(JSON.parse(payload));
+  } catch (e) {
+    pending.reject(e);
+  }
+}
+
+/**
+ * Appel asynchrone d'un slot Python (exécuté hors du thread GUI)
+ * Le slot tourne dans le QThreadPool; le résultat arrive par le signal
+ * asyncResult. Lectures: une nouvelle requête sur le même canal annule la
+ * précédente (la promesse précédente est rejetée avec {cancelled: true}).
+ * Écritures (confirm_import, confirm_import_file): jamais annulées, exécutées
+ * une à la fois côté Python; le canal est ignoré.
+ *
+ * @param {Object} bridge - channel.objects.AppBridge
+ * @param {string} method - Nom du slot (ex: 'get_kpis')
+ * @param {Array} args - Arguments positionnels
+ * @param {string} channel - Clé de remplacement (défaut: nom du slot)
+ * @returns {Promise<Object>} - Résultat JSON parsé
+ *
+ * Exemple:
+ *   const kpis = await window.AppBridge.callAsync(bridge, 'get_kpis', ['2025-08-28']);
+ */
+window.AppBridge.callAsync = function(bridge, method, args = [], channel = '') {
+  if (!bridge._asyncPending) {
+    bridge._asyncPending = {};
+    bridge._asyncEarly = {};
+    bridge.asyncResult.connect(function(requestId, name, status, payload) {
+      const pending = bridge._asyncPending[requestId];
+      if (!pending) {
+        // Résultat reçu avant la réponse de call_async
+        bridge._asyncEarly[requestId] = [status, payload];
+        return;
+      }
+      delete bridge._asyncPending[requestId];
+      settleAsync(pending, name, status, payload);
+    });
+  }
+
+  return new Promise(function(resolve, reject) {
+    bridge.call_async(method, JSON.stringify(args), channel, function(response) {
+      const info = JSON.parse(response);
+      if (!info.success) {
+        reject(new Error(info.message));
+        return;
+      }
+      const pending = { resolve: resolve, reject: reject };
+      const early = bridge._asyncEarly[info.request_id];
+      if (early) {
+        delete bridge._asyncEarly[info.request_id];
+        settleAsync(pending, method, early[0], early[1]);
+      } else {
+        bridge._asyncPending[info.request_id] = pending;
+      }
+    });
+  });
+};
+
 // ========== COMPATIBILITÉ ==========
 
 // Alias pour rétrocompatibilité (si ancien code utilise window.fmtCad)
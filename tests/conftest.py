@@ -0,0 +1,15 @@
+"""
+Configuration pytest: les modules de l'application s'importent depuis app/
+(services.*, config.*, scripts.*), comme lorsqu'on lance les scripts; la
+racine du dépôt reste importable pour les modules qui importent app.*.
+"""
+
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+APP_DIR = ROOT_DIR / "app"
+
+for directory in (ROOT_DIR, APP_DIR):
+    if str(directory) not in sys.path:
+        sys.path.insert(0, str(directory))
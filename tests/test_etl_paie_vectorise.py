@@ -0,0 +1,74 @@
+"""
+Parité des transformations vectorisées d'ETLPaie avec les parseurs scalaires
+
+Jeux aléatoires de scripts/verifier_parite_etl_vectorise.py (le script garde
+la mesure de performance sur gros volumes).
+"""
+
+import logging
+import random
+import sys
+
+import pandas as pd
+import pytest
+
+from scripts.verifier_parite_etl_vectorise import (
+    comparer,
+    generer_dataframe,
+    generer_dataframe_realiste,
+    montant_aleatoire,
+)
+from services import etl_paie
+from services.etl_paie import ESPACES, ETLPaie
+
+
+@pytest.fixture(scope="module")
+def etl():
+    # Les parseurs scalaires journalisent chaque valeur invalide
+    logging.getLogger("services.etl_paie").setLevel(logging.ERROR)
+    return ETLPaie.__new__(ETLPaie)  # pas de connexion ni de YAML nécessaires
+
+
+def ecarts(etl: ETLPaie, df: pd.DataFrame) -> list:
+    ref = etl.valider_dataframe(etl.transformer_dataframe(df))
+    vec = etl.valider_dataframe_vectorise(etl.transformer_dataframe_vectorise(df))
+    return comparer(ref, vec)
+
+
+def dataframe_texte(nb_lignes: int, seed: int) -> pd.DataFrame:
+    """Montants uniquement texte (colonne chaîne, comme un CSV lu par pandas)"""
+    rng = random.Random(seed)
+    montants = [montant_aleatoire(rng) for _ in range(nb_lignes)]
+    df = generer_dataframe(nb_lignes, seed)
+    df["montant"] = pd.Series(
+        [None if v is None or v != v else str(v) for v in montants], dtype="string"
+    )
+    return df
+
+
+@pytest.mark.parametrize("seed", range(42, 47))
+def test_parite_donnees_aleatoires(etl, seed):
+    assert ecarts(etl, generer_dataframe(2000, seed)) == []
+
+
+@pytest.mark.parametrize("seed", range(42, 45))
+def test_parite_montants_texte(etl, seed):
+    assert ecarts(etl, dataframe_texte(2000, seed)) == []
+
+
+@pytest.mark.parametrize("excel", [True, False])
+def test_parite_export_type(etl, excel):
+    assert ecarts(etl, generer_dataframe_realiste(5000, 7, excel=excel)) == []
+
+
+def test_parite_sans_pyarrow(etl, monkeypatch):
+    monkeypatch.setattr(etl_paie, "_DTYPE_TEXTE", object)
+    assert ecarts(etl, generer_dataframe(2000, 42)) == []
+    assert ecarts(etl, dataframe_texte(2000, 43)) == []
+
+
+def test_espaces_identiques_a_isspace():
+    attendus = "".join(
+        chr(c) for c in range(sys.maxunicode + 1) if chr(c).isspace()
+    )
+    assert ESPACES == attendus
@@ -0,0 +1,74 @@
+"""
+Parsing des fichiers d'import: CSV (read_csv_fast) et Excel par le même
+point d'entrée, avec le cache de fichiers parsés
+"""
+
+import openpyxl
+import pytest
+
+from services.import_service_complete import ImportServiceComplete
+from services.parsed_file_cache import ParsedFileCache
+
+CSV = (
+    "Matricule;Nom employé;Code de paie;Montant;Date de paie\n"
+    "2093;Abdou Diallo;101;1 234,50;2025-01-15\n"
+    "2094;Hélène Roy;102;-12,00;2025-01-15\n"
+)
+CHECKSUM = "0" * 64
+
+
+@pytest.fixture
+def cache():
+    cache = ParsedFileCache()
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def service(cache):
+    # Parsing seul: ni connexion ni service KPI
+    return ImportServiceComplete(None, None, parsed_cache=cache)
+
+
+def test_import_csv(service, cache, tmp_path, monkeypatch):
+    path = tmp_path / "paie.csv"
+    path.write_text(CSV, encoding="cp1252")
+
+    df = service.parse_excel_cached(str(path), CHECKSUM)
+
+    assert list(df.columns) == [
+        "Matricule",
+        "Nom employé",
+        "Code de paie",
+        "Montant",
+        "Date de paie",
+    ]
+    assert df["Nom employé"].tolist() == ["Abdou Diallo", "Hélène Roy"]
+    assert cache.stats()["entries"] == 1
+
+    # Confirmation: relu du cache, sans reparser
+    monkeypatch.setattr(
+        service, "_parse_excel_file", lambda _: pytest.fail("fichier reparsé")
+    )
+    assert service.parse_excel_cached(str(path), CHECKSUM).equals(df)
+
+
+def test_import_excel(service, tmp_path):
+    path = tmp_path / "paie.xlsx"
+    workbook = openpyxl.Workbook()
+    for ligne in CSV.splitlines():
+        workbook.active.append(ligne.split(";"))
+    workbook.save(path)
+
+    df = service.parse_excel_cached(str(path), CHECKSUM)
+
+    assert len(df) == 2
+    assert df["Matricule"].tolist() == ["2093", "2094"]
+
+
+def test_format_non_supporte(service, tmp_path):
+    path = tmp_path / "paie.txt"
+    path.write_text(CSV, encoding="utf-8")
+
+    with pytest.raises(ImportError, match="Format de fichier non supporté"):
+        service.parse_excel_cached(str(path), CHECKSUM)
@@ -0,0 +1,123 @@
+"""
+Pagination keyset: condition « après le curseur », curseurs opaques, pages
+
+La condition générée est exécutée sous SQLite (placeholders %(cursor_i)s::type
+remplacés par :cursor_i) et comparée au découpage Python de la liste triée.
+"""
+
+import base64
+import random
+import re
+import sqlite3
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from providers.pagination import (
+    KeysetKey,
+    decode_cursor,
+    encode_cursor,
+    keyset_condition,
+    order_by_sql,
+    split_page,
+)
+
+MIXTES = (
+    KeysetKey("a", "date", descending=True),
+    KeysetKey("b", "text"),
+    KeysetKey("c", "bigint"),
+)
+HOMOGENES = (KeysetKey("a", "date"), KeysetKey("b", "text"), KeysetKey("c", "bigint"))
+
+
+def lignes_apres(keys, lignes, curseur):
+    """Lignes strictement après le curseur, via la condition SQL générée."""
+    condition, params = keyset_condition(keys, curseur)
+    condition = re.sub(r"%\((cursor_\d+)\)s::\w+", r":\1", condition)
+
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE t (a TEXT, b TEXT, c INTEGER)")
+    db.executemany("INSERT INTO t VALUES (?, ?, ?)", lignes)
+    return db.execute(
+        f"SELECT a, b, c FROM t WHERE {condition} ORDER BY {order_by_sql(keys)}",
+        params,
+    ).fetchall()
+
+
+def trier(keys, lignes):
+    for position, key in reversed(list(enumerate(keys))):
+        lignes = sorted(lignes, key=lambda r: r[position], reverse=key.descending)
+    return lignes
+
+
+@pytest.mark.parametrize("keys", [MIXTES, HOMOGENES], ids=["mixtes", "homogenes"])
+def test_keyset_condition_equivaut_au_decoupage(keys):
+    rng = random.Random(16)
+    lignes = [
+        (f"2025-01-{rng.randint(1, 4):02d}", rng.choice("abc"), c) for c in range(60)
+    ]
+    triees = trier(keys, lignes)
+
+    for position in range(len(triees)):
+        curseur = list(triees[position])
+        assert lignes_apres(keys, lignes, curseur) == triees[position + 1 :]
+
+
+def test_keyset_condition_borne_de_tete_sens_mixtes():
+    condition, params = keyset_condition(MIXTES, ["2025-01-15", "2093", 7])
+
+    assert condition.startswith("(a <= %(cursor_0)s::date AND (")
+    assert params == {"cursor_0": "2025-01-15", "cursor_1": "2093", "cursor_2": 7}
+
+    ascendantes = (KeysetKey("a", "date"), KeysetKey("b", "text", descending=True))
+    condition, _ = keyset_condition(ascendantes, ["2025-01-15", "2093"])
+    assert condition.startswith("(a >= %(cursor_0)s::date AND (")
+
+
+def test_keyset_condition_sens_homogenes_tuple():
+    condition, _ = keyset_condition(HOMOGENES, ["2025-01-15", "x", 1])
+    assert condition == (
+        "(a, b, c) > (%(cursor_0)s::date, %(cursor_1)s::text, %(cursor_2)s::bigint)"
+    )
+
+
+def test_keyset_condition_premiere_page_et_curseur_incompatible():
+    assert keyset_condition(MIXTES, None) == ("TRUE", {})
+    with pytest.raises(ValueError):
+        keyset_condition(MIXTES, ["2025-01-15"])
+
+
+def test_curseur_aller_retour():
+    valeurs = [date(2025, 1, 15), "Hélène", 42, Decimal("12.50"), None]
+    curseur = encode_cursor(valeurs)
+
+    assert re.fullmatch(r"[A-Za-z0-9_=-]+", curseur)
+    assert decode_cursor(curseur) == ["2025-01-15", "Hélène", 42, "12.50", None]
+
+
+@pytest.mark.parametrize("curseur", ["pas du base64!", encode_cursor([1])[:-2] + "{"])
+def test_curseur_invalide(curseur):
+    with pytest.raises(ValueError):
+        decode_cursor(curseur)
+
+
+def test_curseur_non_liste():
+    with pytest.raises(ValueError):
+        decode_cursor(base64.urlsafe_b64encode(b'{"a": 1}').decode("ascii"))
+
+
+def test_curseur_absent():
+    assert decode_cursor(None) is None
+    assert decode_cursor("") is None
+
+
+def test_split_page():
+    lignes = [("x", date(2025, 1, d), d) for d in range(1, 5)]
+
+    page, suivant = split_page(lignes, 3, key_positions=(1, 2))
+    assert page == lignes[:3]
+    assert decode_cursor(suivant) == ["2025-01-03", 3]
+
+    assert split_page(lignes, 4, key_positions=(1, 2)) == (lignes, None)
+    assert split_page([], 3, key_positions=(1, 2)) == ([], None)
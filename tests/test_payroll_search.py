@@ -0,0 +1,131 @@
+"""
+Recherche de paie indexée (PayrollSearch)
+
+Stratégies et conditions générées sans base; vérification EXPLAIN des cas de
+scripts/verifier_index_recherche.py sur la base configurée (test ignoré si
+PostgreSQL est indisponible ou si la migration 014 n'est pas appliquée).
+"""
+
+from contextlib import contextmanager
+
+import pytest
+
+from scripts.verifier_index_recherche import CAS, TABLE
+from services.payroll_search import (
+    STRATEGY_PREFIX,
+    STRATEGY_SUBSTRING,
+    PayrollSearch,
+    choose_strategy,
+)
+
+
+@pytest.mark.parametrize(
+    "terme, attendue",
+    [
+        ("1", STRATEGY_PREFIX),
+        ("12", STRATEGY_PREFIX),
+        ("Lé", STRATEGY_PREFIX),
+        ("1234*", STRATEGY_PREFIX),
+        ("123", STRATEGY_SUBSTRING),
+        ("Hélène", STRATEGY_SUBSTRING),
+    ],
+)
+def test_choose_strategy(terme, attendue):
+    assert choose_strategy(terme) == attendue
+
+
+def test_conditions_prefixe_et_sous_chaine():
+    search = PayrollSearch(repo=None)
+    conditions, params = search.build_conditions(
+        {"matricule": "12*", "employe": " Hélène ", "code": None}
+    )
+
+    assert params == {"search_matricule": "12", "search_employe": "Hélène"}
+    assert len(conditions) == 1
+    sql = conditions[0]
+    assert sql.startswith("id IN (SELECT m.id FROM payroll.imported_payroll_master")
+    assert "m.matricule_norm >= lower(btrim(%(search_matricule)s))" in sql
+    assert "m.employe_norm LIKE '%%' ||" in sql
+
+
+def test_filtres_vides_ignores():
+    search = PayrollSearch(repo=None)
+    assert search.build_conditions({"matricule": " * ", "employe": ""}) == ([], {})
+    assert search.strategies({"matricule": "*", "code": "sal"}) == {
+        "code": STRATEGY_SUBSTRING
+    }
+
+
+class ConnexionFactice:
+    """Connexion en autocommit: note si chaque requête est dans une transaction"""
+
+    def __init__(self):
+        self.requetes = []
+        self.en_transaction = False
+        self.rollback_forcee = None
+
+    @contextmanager
+    def transaction(self, force_rollback=False):
+        self.en_transaction = True
+        try:
+            yield
+        finally:
+            self.en_transaction = False
+            self.rollback_forcee = force_rollback
+
+    def execute(self, sql, params=None):
+        self.requetes.append((sql, self.en_transaction))
+
+
+class RepoFactice:
+    def __init__(self):
+        self.conn = ConnexionFactice()
+
+    @contextmanager
+    def get_connection(self):
+        yield self.conn
+
+    def run_select(self, conn, sql, params=None):
+        conn.execute(sql, params)
+        plan = {"Node Type": "Index Scan", "Index Name": "idx_ipm_employe_norm_trgm"}
+        return [([{"Plan": plan}],)]
+
+
+def test_explain_seqscan_desactive_dans_une_transaction():
+    repo = RepoFactice()
+    resultat = PayrollSearch(repo).explain({"employe": "Hélène"})
+
+    assert repo.conn.requetes[0] == ("SET LOCAL enable_seqscan = off", True)
+    assert repo.conn.requetes[1][0].startswith("EXPLAIN (FORMAT JSON)")
+    assert repo.conn.requetes[1][1]
+    assert repo.conn.rollback_forcee
+    assert resultat["index_names"] == ["idx_ipm_employe_norm_trgm"]
+
+
+@pytest.fixture(scope="module")
+def search_db():
+    try:
+        from config.connection_standard import get_connection_pool
+
+        repo = get_connection_pool()
+        with repo.get_connection() as conn:
+            migree = repo.run_select(
+                conn,
+                "SELECT to_regclass('payroll.idx_ipm_matricule_norm_trgm')",
+            )[0][0]
+            conn.rollback()
+    except Exception as e:
+        pytest.skip(f"PostgreSQL indisponible: {e}")
+    if migree is None:
+        pytest.skip("Migration 014 (index de recherche) non appliquée")
+    return PayrollSearch(repo)
+
+
+@pytest.mark.parametrize("libelle, filtres, attendus", CAS, ids=[c[0] for c in CAS])
+def test_explain_utilise_les_index(search_db, libelle, filtres, attendus):
+    resultat = search_db.explain(filtres)
+
+    assert TABLE not in resultat["seq_scans"], resultat["plan"]
+    assert any(index in resultat["index_names"] for index in attendus), resultat[
+        "index_names"
+    ]
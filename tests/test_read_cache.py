@@ -0,0 +1,62 @@
+"""
+ReadCache: invalidation par date de paie et lectures concurrentes
+"""
+
+from providers.read_cache import ReadCache, cached_read
+
+
+class ProviderFactice:
+    def __init__(self):
+        self.cache = ReadCache(maxsize=8)
+        self.periodes = ["2025-01-15"]
+        self.pendant_lecture = None
+        self.lectures = 0
+
+    def _normalize_pay_date(self, pay_date):
+        return pay_date
+
+    @cached_read(scoped=False)
+    def get_periods(self):
+        self.lectures += 1
+        resultat = list(self.periodes)
+        if self.pendant_lecture:
+            self.pendant_lecture()
+        return resultat
+
+
+def test_invalidation_par_date():
+    cache = ReadCache()
+    cache.set(("kpis", "2025-01-15"), 1, "2025-01-15")
+    cache.set(("kpis", "2025-02-15"), 2, "2025-02-15")
+    cache.set(("periods",), 3)
+
+    assert cache.invalidate("2025-01-15") == 2
+    assert cache.get(("kpis", "2025-02-15")) == (True, 2)
+    assert cache.get(("periods",)) == (False, None)
+
+
+def test_set_ignore_une_generation_perimee():
+    cache = ReadCache()
+    generation = cache.generation()
+    cache.invalidate()
+
+    assert not cache.set(("periods",), ["périmé"], generation=generation)
+    assert cache.get(("periods",)) == (False, None)
+    assert cache.set(("periods",), ["frais"], generation=cache.generation())
+
+
+def test_lecture_concurrente_d_une_invalidation_non_mise_en_cache():
+    provider = ProviderFactice()
+
+    def ecriture_concurrente():
+        # Nouvelle période committée pendant la lecture, puis invalidation
+        provider.periodes.append("2025-02-15")
+        provider.cache.invalidate("2025-02-15")
+
+    provider.pendant_lecture = ecriture_concurrente
+    assert provider.get_periods() == ["2025-01-15"]
+
+    provider.pendant_lecture = None
+    assert provider.get_periods() == ["2025-01-15", "2025-02-15"]
+    assert provider.get_periods() == ["2025-01-15", "2025-02-15"]
+    assert provider.lectures == 2
@@ -0,0 +1,86 @@
+"""
+UploadStore: envois par blocs dans un répertoire de session privé
+"""
+
+import hashlib
+import os
+import stat
+import time
+
+import pytest
+
+from services.upload_store import STALE_UPLOAD_SECONDS, UploadStore
+
+
+def mode(path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.fixture
+def store():
+    store = UploadStore()
+    yield store
+    store.close()
+
+
+def test_envoi_prive_et_checksum(store):
+    upload_id = store.begin("paie.csv")
+    store.append(upload_id, b"matricule;montant\n")
+    store.append(upload_id, b"2093;12,50\n")
+    info = store.finish(upload_id)
+
+    path = store.path(upload_id)
+    assert path.read_bytes() == b"matricule;montant\n2093;12,50\n"
+    assert info["checksum"] == hashlib.sha256(path.read_bytes()).hexdigest()
+    assert mode(store.directory) == 0o700
+    assert mode(path.parent) == 0o700
+    assert mode(path) == 0o600
+
+
+def test_repertoires_de_session_distincts():
+    premier, second = UploadStore(), UploadStore()
+    try:
+        assert premier.directory != second.directory
+    finally:
+        premier.close()
+        second.close()
+
+
+def test_close_supprime_le_repertoire_de_session():
+    store = UploadStore()
+    upload_id = store.begin("paie.xlsx")
+    store.append(upload_id, b"x")
+    store.close()
+
+    assert not store.directory.exists()
+    with pytest.raises(KeyError):
+        store.path(upload_id)
+
+
+def test_release(store):
+    upload_id = store.begin("paie.xlsx")
+    store.finish(upload_id)
+    folder = store.path(upload_id).parent
+
+    store.release(upload_id)
+    assert not folder.exists()
+    with pytest.raises(KeyError):
+        store.path(upload_id)
+
+
+def test_purge_limitee_aux_envois_abandonnes(tmp_path):
+    ancien = time.time() - STALE_UPLOAD_SECONDS - 60
+    abandonne = tmp_path / ("a" * 32)
+    etranger = tmp_path / "autre_application"
+    for folder in (abandonne, etranger):
+        folder.mkdir()
+        os.utime(folder, (ancien, ancien))
+
+    store = UploadStore(tmp_path)
+    try:
+        assert not abandonne.exists()
+        assert etranger.exists()
+        assert mode(tmp_path) == 0o700
+    finally:
+        store.close()
+    assert tmp_path.exists()  # répertoire explicite conservé